@@ -0,0 +1,77 @@
+"""Shared result format for the benchmark scripts.
+
+Every run is saved as one JSON document::
+
+    {"suite": "kernels", "created": "...", "env": {...},
+     "results": {"<case>": {"median_ms": ..., "min_ms": ..., "runs": ..., ...}}}
+
+so that any two runs of the same suite can be diffed with ``bench/compare.py``.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import numpy
+
+    env = {"python": platform.python_version(), "platform": platform.platform(),
+           "numpy": numpy.__version__, "git": _git_revision()}
+    try:
+        import streamlit
+        env["streamlit"] = streamlit.__version__
+    except ImportError:
+        pass
+    return env
+
+
+def summarize(samples_s, **extra):
+    """Median/min/max in milliseconds for a list of timings in seconds."""
+    ms = [s * 1000 for s in samples_s]
+    out = {"median_ms": statistics.median(ms), "min_ms": min(ms), "max_ms": max(ms), "runs": len(ms)}
+    out.update(extra)
+    return out
+
+
+def time_call(fn, min_time=0.2, max_runs=50):
+    """Time ``fn()`` repeatedly until ``min_time`` seconds have been spent."""
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < max_runs and (len(samples) < 3 or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def save(suite, results, path=None):
+    doc = {"suite": suite, "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+           "env": environment(), "results": results}
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{suite}-{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    return path
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,55 @@
+"""Timing comparison: pre-trained decision tree vs vectorised IS rules.
+
+Classifies the same batches with the saved model (loaded once, outside the
+timed region) and with ``civil_lab.calc.soil_class.classify``, reports the
+time per batch and how often the two agree, and saves the results in the
+common format (see bench/_results.py).
+
+    python bench/classifier.py [--max-size 1000000] [--out FILE]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import _results  # noqa: E402
+from civil_lab import classifier  # noqa: E402
+from civil_lab.calc import soil_class  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-size", type=int, default=1_000_000)
+    parser.add_argument("--out", help="output JSON path (default: bench/results/classifier-<time>.json)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    bundle = classifier.load()
+    load_ms = (time.perf_counter() - t0) * 1000
+    if bundle is None:
+        sys.exit(f"No trained model at {classifier.MODEL_PATH}; run python -m civil_lab.classifier train")
+    print(f"Model load: {load_ms:.1f} ms (paid once per process)")
+
+    results = {"model.load": _results.summarize([load_ms / 1000])}
+    print(f"{'n':>10}{'tree (ms)':>12}{'rules (ms)':>12}{'agreement':>12}")
+    for n in (1, 100, 10_000, 1_000_000):
+        if n > args.max_size:
+            break
+        samples = classifier.synthetic_samples(n, seed=2)
+        tree = _results.time_call(lambda: classifier.predict(bundle, **samples))
+        rules = _results.time_call(lambda: soil_class.classify(**samples))
+        agreement = float(np.mean(classifier.predict(bundle, **samples) == soil_class.classify(**samples)))
+        results[f"tree[n={n}]"] = _results.summarize(tree, n=n, agreement=agreement)
+        results[f"rules[n={n}]"] = _results.summarize(rules, n=n)
+        print(f"{n:>10}{results[f'tree[n={n}]']['median_ms']:>12.3f}"
+              f"{results[f'rules[n={n}]']['median_ms']:>12.3f}{agreement:>12.2%}")
+
+    print(f"Saved {_results.save('classifier', results, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare two saved benchmark runs and flag regressions.
+
+    python bench/compare.py BASELINE.json CANDIDATE.json [--threshold 1.2]
+
+Cases whose median time grew by more than the threshold ratio are reported
+as regressions and make the script exit with status 1. ``--metric`` compares
+another per-case number instead, e.g. ``cpu_ms_per_analysis`` from the rerun
+suite.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import _results  # noqa: E402
+
+
+def compare(baseline, candidate, threshold, metric="median_ms"):
+    """Rows of ``(case, base, new, ratio, status)`` for cases in both runs."""
+    rows = []
+    for case, new in candidate["results"].items():
+        base = baseline["results"].get(case)
+        if base is None or metric not in base:
+            rows.append((case, None, new[metric], None, "new"))
+            continue
+        if base[metric]:
+            ratio = new[metric] / base[metric]
+        else:
+            ratio = 1.0 if not new[metric] else float("inf")
+        if ratio > threshold:
+            status = "REGRESSION"
+        elif ratio < 1 / threshold:
+            status = "faster"
+        else:
+            status = ""
+        rows.append((case, base[metric], new[metric], ratio, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="ratio of candidate/baseline median above which a case regressed")
+    parser.add_argument("--metric", default="median_ms", help="per-case result field to compare")
+    args = parser.parse_args()
+
+    baseline, candidate = _results.load(args.baseline), _results.load(args.candidate)
+    if baseline["suite"] != candidate["suite"]:
+        parser.error(f"cannot compare suite {baseline['suite']!r} with {candidate['suite']!r}")
+
+    rows = compare(baseline, candidate, args.threshold, args.metric)
+    print(f"{'Case':<44}{'base':>12}{'new':>12}{'ratio':>8}  status")
+    for case, base, new, ratio, status in rows:
+        base_s = f"{base:.3f}" if base is not None else "-"
+        ratio_s = f"{ratio:.2f}" if ratio is not None else "-"
+        print(f"{case:<44}{base_s:>12}{new:>12.3f}{ratio_s:>8}  {status}")
+
+    regressions = sum(1 for row in rows if row[4] == "REGRESSION")
+    print(f"{regressions} regression(s) at threshold {args.threshold}x")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
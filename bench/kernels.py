@@ -0,0 +1,105 @@
+"""Throughput benchmark for the numeric kernels in civil_lab.calc.
+
+Times each kernel at batch sizes from 1 to 1e6 and saves the results in the
+common format (see bench/_results.py). First checks that the streaming
+kernels give the same answers fed one item at a time and as one batch.
+
+    python bench/kernels.py [--max-size 1000000] [--out FILE]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import _results  # noqa: E402
+from civil_lab.calc import (area, bitumen, consistency, ctm_log, cube_qc, sieve, soil_class, strength,  # noqa: E402
+                            temperature_log, workability)
+
+SIEVES = np.array([4.75, 2.36, 1.18, 0.6, 0.3, 0.15, 0.075])
+
+
+def cases(n, rng):
+    """(name, callable) pairs for batch size ``n``."""
+    ctm = rng.uniform(20, 80, n)
+    dim = rng.uniform(100, 150, n)
+    retained = rng.dirichlet(np.ones(SIEVES.size + 1), n)[:, :-1] * 100
+    full_stack = rng.dirichlet(np.ones(sieve.SIEVE_SIZES.size + 1), n)[:, :-1] * 100
+    sizes_sorted, retained_sorted = sieve.sort_sieves(SIEVES, retained)
+    passing = sieve.cumulative_passing(retained_sorted)
+    ll = rng.uniform(30, 70, n)
+    pl = ll - rng.uniform(5, 30, n)
+    blows = rng.uniform(10, 40, (n, 4))
+    water = 60 - 20 * np.log10(blows) + rng.normal(0, 0.5, (n, 4))
+    # n traverse vertices, split into parcels of 1000.
+    angle = np.sort(rng.uniform(0, 2 * np.pi, n))
+    east, north = 5e5 + 30 * np.cos(angle), 1.2e6 + 30 * np.sin(angle)
+    parcel_starts = np.arange(0, n, 1000)
+    # A 1 Hz ring-and-ball log, one run per 600 samples.
+    seconds = np.arange(n) % 600
+    bath = 5 + seconds / 12
+    events = np.where(seconds == 500, "ball 1", np.where(seconds == 505, "ball 2", ""))
+
+    return [
+        ("strength.compressive", lambda: strength.compressive_strength(ctm, strength.specimen_area(dim, dim))),
+        ("strength.tensile", lambda: strength.tensile_strength(ctm, dim, 2 * dim)),
+        ("strength.transverse", lambda: strength.transverse_strength(ctm, dim, dim, dim, dim / 10)),
+        ("consistency.water_content", lambda: consistency.water_content(dim, dim + 40, dim + 30)),
+        ("consistency.flow_curve", lambda: consistency.flow_curve(water, blows)),
+        ("consistency.indices", lambda: consistency.indices(ll, pl, pl / 2, (ll + pl) / 2)),
+        ("sieve.cumulative_passing", lambda: sieve.cumulative_passing(retained_sorted)),
+        ("sieve.percentile_sizes", lambda: sieve.percentile_sizes(sizes_sorted, passing, (10, 30, 60))),
+        ("sieve.analyze", lambda: sieve.analyze(SIEVES, retained)),
+        ("sieve.analyze[56 sieves,pchip]", lambda: sieve.analyze(sieve.SIEVE_SIZES, full_stack, method="pchip")),
+        ("workability.classify", lambda: workability.classify("Slump Test", dim)),
+        ("bitumen.classify[flash]", lambda: bitumen.classify("Flash and Fire Point", 2 * dim, 2 * dim + 20)),
+        ("area.polygon_areas[vertices]", lambda: area.polygon_areas(east, north, parcel_starts)),
+        ("cube_qc.update_many", lambda: cube_qc.GradeQC("M25").update_many(ctm / 2)),
+        ("soil_class.plasticity_zone", lambda: soil_class.plasticity_zone(ll, ll - pl)),
+        ("temperature_log.update[samples]",
+         lambda: temperature_log.TemperatureLog("softening").update(seconds, bath, events)),
+        ("ctm_log.update[samples]", lambda: ctm_log.LoadLog().update(ctm * 10, dim / 100)),
+    ]
+
+
+def check_streaming(rng, n=1003):
+    """Fail if streaming kernels give different answers fed one item at a time and as one batch."""
+    values = rng.normal(30, 4.5, n)
+    for overlapping in (False, True):
+        batch, stream = cube_qc.GradeQC("M25", overlapping=overlapping), cube_qc.GradeQC("M25", overlapping=overlapping)
+        batch.update_many(values)
+        for i, value in enumerate(values):
+            stream.update(value, i)
+        got, want = stream.summary(), batch.summary()
+        same = all(np.isclose(got[k], want[k]) if isinstance(want[k], float) else got[k] == want[k] for k in want)
+        groups = [[(f["group"], f["first_id"], f["last_id"]) for f in qc.flags] for qc in (stream, batch)]
+        if not same or groups[0] != groups[1]:
+            mode = "rolling" if overlapping else "consecutive"
+            raise SystemExit(f"cube_qc ({mode} groups): streaming gives {got}, batch gives {want}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-size", type=int, default=1_000_000)
+    parser.add_argument("--out", help="output JSON path (default: bench/results/kernels-<time>.json)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    check_streaming(rng)
+    sizes = [n for n in (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000) if n <= args.max_size]
+    results = {}
+    print(f"{'Kernel':<30}{'n':>10}{'median (ms)':>14}{'rows/s':>14}")
+    for n in sizes:
+        for name, fn in cases(n, rng):
+            r = _results.summarize(_results.time_call(fn), n=n)
+            r["rows_per_s"] = n / (r["median_ms"] / 1000) if r["median_ms"] else None
+            results[f"{name}[n={n}]"] = r
+            print(f"{name:<30}{n:>10}{r['median_ms']:>14.3f}{r['rows_per_s'] or 0:>14.3g}")
+
+    print(f"Saved {_results.save('kernels', results, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Rerun latency benchmark for every module of app.py.
+
+Drives the app headlessly through Streamlit's AppTest harness. For each
+module/test-type combination it fills in typical inputs, presses the action
+button and times the rerun that produces the result.
+
+It also replays the inputs the way a browser sends them: a change to a
+widget outside a form triggers a rerun, a change inside a form waits for the
+submit button. ``reruns_per_analysis`` and ``cpu_ms_per_analysis`` count the
+reruns and server CPU time from opening the module to seeing the result.
+AppTest always executes the whole script, so fragment-scoped reruns are
+costed as full reruns here. Results are saved in the common format (see
+bench/_results.py); compare them with ``bench/compare.py --metric``.
+
+    python bench/reruns.py [--repeat 5] [--out FILE]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import _results  # noqa: E402
+
+APP = os.path.join(_results.ROOT, "app.py")
+
+# name -> (module, {selectbox label: option}, {number_input label: value}, button label)
+SCENARIOS = {
+    "Home": ("Home", {}, {}, None),
+    "Strength/Compressive": ("Strength of Materials", {"Select Type of Strength": "Compressive Strength"},
+                             {"Enter Length (mm)": 150.0, "Enter Breadth (mm)": 150.0,
+                              "Enter CTM Reading (Tonnes)": 50.0}, "Calculate Strength"),
+    "Strength/Tensile": ("Strength of Materials", {"Select Type of Strength": "Tensile Strength"},
+                         {"Enter Load from CTM (Tonnes)": 20.0, "Enter Diameter of Cylinder (mm)": 150.0,
+                          "Enter Length of Cylinder (mm)": 300.0}, "Calculate Strength"),
+    "Strength/Transverse": ("Strength of Materials", {"Select Type of Strength": "Transverse Strength of Tile"},
+                            {"Enter Breaking Load (kg)": 100.0, "Enter Length of Lever Arm (mm)": 100.0,
+                             "Enter Length of Specimen (mm)": 200.0, "Enter Breadth (mm)": 150.0,
+                             "Enter Thickness (mm)": 20.0}, "Calculate Strength"),
+    "Soil/Liquid Limit": ("Soil Classification", {"Choose Consistency Limit Type": "Liquid Limit"},
+                          {"Sample 1 - Mass of container (g)": 20.0,
+                           "Sample 1 - Mass of container + wet soil (g)": 50.0,
+                           "Sample 1 - Mass of container + dry soil (g)": 40.0,
+                           "Sample 1 - Number of blows": 30.0,
+                           "Sample 2 - Mass of container (g)": 20.0,
+                           "Sample 2 - Mass of container + wet soil (g)": 52.0,
+                           "Sample 2 - Mass of container + dry soil (g)": 41.0,
+                           "Sample 2 - Number of blows": 20.0}, "Calculate Liquid Limit"),
+    "Soil/Plastic Limit": ("Soil Classification", {"Choose Consistency Limit Type": "Plastic Limit"},
+                           {"Mass of container (g)": 20.0, "Mass of container + wet soil (g)": 40.0,
+                            "Mass of container + dry soil (g)": 36.0}, "Calculate Plastic Limit"),
+    "Soil/Shrinkage Limit": ("Soil Classification", {"Choose Consistency Limit Type": "Shrinkage Limit"},
+                             {"Mass of shrinkage dish (g)": 20.0, "Mass of shrinkage dish + wet soil (g)": 60.0,
+                              "Mass of shrinkage dish + dry soil (g)": 50.0,
+                              "Mass of dish filled with mercury (g)": 300.0,
+                              "Weight of mercury after displacement (g)": 295.0}, "Calculate Shrinkage Limit"),
+    "Soil/Indices": ("Soil Classification", {},
+                     {"Enter Liquid Limit (LL) (%)": 45.0, "Enter Plastic Limit (PL) (%)": 22.0,
+                      "Enter Shrinkage Limit (SL) (%)": 12.0, "Enter Natural Water Content (WC) (%)": 30.0},
+                     "Calculate Indices"),
+    "Specific Gravity": ("Specific Gravity of Cement", {"Select Medium": "Kerosene"},
+                         {"Weight of empty flask (g)": 30.0, "Weight of flask + cement (g)": 80.0,
+                          "Weight of flask + cement + medium (g)": 150.0, "Weight of flask + medium (g)": 110.0},
+                         "Calculate Specific Gravity"),
+    "Sieve/Soil": ("Sieve Analysis", {"Select Material Type": "Soil"}, {}, "Analyze"),
+    "Sieve/Aggregates": ("Sieve Analysis", {"Select Material Type": "Aggregates"}, {}, "Analyze"),
+    "Area/Rectangle": ("Area Converter", {"Select Shape": "Rectangle"},
+                       {"Enter Length (m)": 20.0, "Enter Width (m)": 10.0}, "Convert Area"),
+    "Area/Triangle": ("Area Converter", {"Select Shape": "Triangle"},
+                      {"Enter Base (m)": 20.0, "Enter Height (m)": 10.0}, "Convert Area"),
+    "Area/Circle": ("Area Converter", {"Select Shape": "Circle"}, {"Enter Radius (m)": 5.0}, "Convert Area"),
+}
+
+for test, value in [("Slump Test", 75.0), ("Compaction Factor", 0.9), ("Flow Table", 60.0), ("Vee Bee", 4.0)]:
+    label = {"Slump Test": "Enter Slump Value (mm)", "Compaction Factor": "Enter Compaction Factor",
+             "Flow Table": "Enter Flow Value (%)", "Vee Bee": "Enter Vee Bee Time (seconds)"}[test]
+    SCENARIOS[f"Workability/{test}"] = ("Workability", {"Select Workability Test": test}, {label: value}, "Analyze")
+
+for test, inputs in [("Ductility", {"Enter the Breaking Length (in cm):": 60.0}),
+                     ("Stripping Value", {"Enter Stripping Value (percentage):": 1.0}),
+                     ("Softness Test", {"Enter Softness Value (in °C):": 48.0}),
+                     ("Flash and Fire Point", {"Enter Flash Point (in °C):": 220.0,
+                                               "Enter Fire Point (in °C):": 240.0})]:
+    SCENARIOS[f"Bitumen/{test}"] = ("Bitumen Analysis", {"Select Test Conducted": test}, inputs, "Analyze")
+
+# Five-sieve sand sample used for both sieve scenarios.
+SIEVE_SAMPLE = [("4.75 mm", 5.0), ("2.36 mm", 20.0), ("600 µm", 30.0), ("150 µm", 25.0), ("75 µm", 15.0)]
+
+
+def _by_label(elements, label):
+    for el in elements:
+        if el.label == label:
+            return el
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _fill_sieves(at, change):
+    if not any(el.key == "sieve_0" for el in at.selectbox):
+        # Sieve grid: AppTest cannot type into a data editor, so preload it.
+        import pandas as pd
+
+        at.session_state["sieve_rows"] = pd.DataFrame(SIEVE_SAMPLE, columns=["Sieve", "% Retained"])
+        return
+    # Per-sieve widgets (trees before the grid), kept for before/after runs.
+    for i, (sieve, retained) in enumerate(SIEVE_SAMPLE):
+        change(at.selectbox(key=f"sieve_{i}"), sieve)
+        change(at.number_input(key=f"ret_{i}"), retained)
+
+
+def run_scenario(module, selects, numbers, button, repeat):
+    """First-run time, result-rerun samples and the cost of one analysis."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.session_state["module"] = module
+    t0 = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t0
+
+    cost = {"reruns": 0, "cpu_s": 0.0}
+
+    def rerun():
+        c0 = time.process_time()
+        at.run()
+        cost["reruns"] += 1
+        cost["cpu_s"] += time.process_time() - c0
+
+    def change(widget, value):
+        widget.set_value(value)
+        if not widget.proto.form_id:
+            rerun()
+
+    for label, option in selects.items():
+        change(_by_label(at.selectbox, label), option)
+    for label, value in numbers.items():
+        change(_by_label(at.number_input, label), value)
+    if module == "Sieve Analysis":
+        _fill_sieves(at, change)
+    if button:
+        _by_label(at.button, button).click()
+        rerun()
+    analysis = {"reruns_per_analysis": cost["reruns"], "cpu_ms_per_analysis": cost["cpu_s"] * 1000}
+
+    samples = []
+    for _ in range(repeat):
+        if button:
+            _by_label(at.button, button).click()
+        t0 = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t0)
+        if at.exception:
+            raise RuntimeError(f"{module}: {at.exception[0].value}")
+    return first, samples, analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--out", help="output JSON path (default: bench/results/reruns-<time>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'Scenario':<36}{'first run (ms)':>16}{'rerun median (ms)':>20}{'reruns':>8}{'CPU (ms)':>10}")
+    for name, (module, selects, numbers, button) in SCENARIOS.items():
+        if args.only and args.only not in name:
+            continue
+        first, samples, analysis = run_scenario(module, selects, numbers, button, args.repeat)
+        results[name] = _results.summarize(samples, first_run_ms=first * 1000, **analysis)
+        print(f"{name:<36}{first * 1000:>16.1f}{results[name]['median_ms']:>20.1f}"
+              f"{analysis['reruns_per_analysis']:>8}{analysis['cpu_ms_per_analysis']:>10.1f}")
+
+    print(f"Saved {_results.save('reruns', results, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Startup benchmark: import time and first-render time per module.
+
+Each module is measured in a fresh interpreter so that one module's imports
+do not warm the cache for the next one.
+
+    python bench/startup.py [--repeat N] [--json] [--out FILE]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import streamlit
+from civil_lab import registry
+
+name = {name!r}
+t0 = time.perf_counter()
+registry.load(name)
+import_s = time.perf_counter() - t0
+
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.session_state["module"] = name
+t0 = time.perf_counter()
+at.run()
+render_s = time.perf_counter() - t0
+print(json.dumps({{"import_s": import_s, "render_s": render_s,
+                  "errors": [str(e.value) for e in at.exception]}}))
+"""
+
+
+def measure(name):
+    code = _PROBE.format(root=ROOT, name=name, app=os.path.join(ROOT, "app.py"))
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    sys.path.insert(0, ROOT)
+    from bench import _results
+    from civil_lab import registry
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--out", help="output JSON path (default: bench/results/startup-<time>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    for name in registry.MODULES:
+        runs = [measure(name) for _ in range(args.repeat)]
+        results[name] = _results.summarize(
+            [r["render_s"] for r in runs],
+            import_ms=statistics.median(r["import_s"] for r in runs) * 1000,
+            errors=runs[-1]["errors"],
+        )
+        results[name]["first_render_ms"] = results[name]["median_ms"]
+    path = _results.save("startup", results, args.out)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'Module':<30}{'Import (ms)':>14}{'First render (ms)':>20}")
+    for name, r in results.items():
+        flag = "  !" if r["errors"] else ""
+        print(f"{name:<30}{r['import_ms']:>14.1f}{r['first_render_ms']:>20.1f}{flag}")
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
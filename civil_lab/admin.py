@@ -0,0 +1,69 @@
+"""Optional operator panel with per-rerun and process-wide timings and memory.
+
+Shown in the sidebar when the app is opened with ``?admin=1`` or the
+``CIVIL_LAB_ADMIN`` environment variable is set to ``1``.
+"""
+import json
+import os
+import time
+
+import streamlit as st
+
+from civil_lab import background, cache, memory, metrics
+
+
+def _mb(n):
+    return None if n is None else round(n / 2 ** 20, 1)
+
+
+def enabled():
+    return st.query_params.get("admin") == "1" or os.environ.get("CIVIL_LAB_ADMIN") == "1"
+
+
+def render_panel(run):
+    with st.sidebar.expander("⏱ Performance", expanded=True):
+        st.markdown("**This rerun**")
+        st.table([{"Section": name, "ms": round(seconds * 1000, 2)} for name, seconds in run])
+
+        totals = metrics.snapshot()
+        st.markdown("**Since server start**")
+        rows = sorted(totals.items(), key=lambda kv: kv[1]["sum_s"], reverse=True)
+        st.table([{"Section": name, "Count": t["count"], "Total (ms)": round(t["sum_s"] * 1000, 1),
+                   "Mean (ms)": round(t["sum_s"] * 1000 / t["count"], 2), "Max (ms)": round(t["max_s"] * 1000, 1)}
+                  for name, t in rows])
+
+        stats = cache.all_stats()
+        if stats:
+            st.markdown("**Caches**")
+            st.table([{"Cache": name.rsplit(".", 1)[-1], **s} for name, s in stats.items()])
+
+        mem = memory.snapshot()
+        st.markdown("**Memory**")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("RSS (MB)", _mb(mem["rss"]) or "n/a")
+        col2.metric("Peak RSS (MB)", _mb(mem["peak_rss"]) or "n/a")
+        col3.metric("Live figures", mem["live_figures"] + mem["pyplot_figures"])
+        workers = mem["workers"]
+        if workers["figures_created"] or workers["peak_rss"]:
+            st.caption(f"Background job workers: {workers['figures_created']} figures made, "
+                       f"{workers['figures_unreleased']} left unreleased, peak RSS {_mb(workers['peak_rss'])} MB.")
+        if mem["sessions"]:
+            now = time.time()
+            st.table([{"Session": s["session"], "Reruns": s["reruns"], "Last Δ (MB)": _mb(s["last_growth"]),
+                       "Max Δ (MB)": _mb(s["max_growth"]), "Peak RSS (MB)": _mb(s["peak_rss"]),
+                       "Live figures": s["live_figures"], "Figures made": s["figures_created"],
+                       "Job figures": s["job_figures"], "Job peak RSS (MB)": _mb(s["job_peak_rss"]) or None,
+                       "Idle (s)": round(now - s["last_seen"])}
+                      for s in mem["sessions"][:20]])
+
+        jobs = background.snapshot()
+        if jobs:
+            st.markdown("**Background jobs**")
+            st.table([{"Job": j["id"], "Function": j["name"].rsplit(".", 1)[-1], "State": j["state"],
+                       "Progress": f"{j['progress']:.0%}", "Elapsed (s)": round(j["elapsed"], 1),
+                       "Error": j["error"] or ""} for j in jobs[:20]])
+
+        st.download_button("Prometheus metrics", metrics.prometheus_text(),
+                           file_name="civil_lab_metrics.prom", mime="text/plain")
+        st.download_button("JSON snapshot", json.dumps({"sections": totals, "caches": stats, "memory": mem}, indent=2),
+                           file_name="civil_lab_metrics.json", mime="application/json")
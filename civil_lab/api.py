@@ -0,0 +1,299 @@
+"""Headless JSON API over the lab calculators.
+
+Runs next to the Streamlit UI and calls the same ``civil_lab.calc`` code, so
+both always agree. Every endpoint takes a POST with a JSON body and accepts
+batches: numeric inputs are column arrays (``{"data": {"w1": [...], ...}}``)
+and the response holds one value per row. NaN results are returned as
+``null``.
+
+    POST /strength          {"type": "Compressive Strength", "data": {...}}
+    POST /consistency       {"test": "Liquid Limit", "data": {...}}
+    POST /indices           {"data": {"ll": [...], "pl": [...], "sl": [...], "wc": [...]}}
+    POST /specific-gravity  {"medium": "Kerosene", "data": {"w1": [...], ...}}
+    POST /sieve             {"sizes": [...], "retained": [[...], ...], "percents": [10, 30, 60],
+                             "method": "linear" | "pchip"}
+    POST /workability       {"test": "Slump Test", "values": [...]}
+    POST /bitumen           {"test": "Ductility", "values": [...], "fire_points": [...]}
+    POST /soil-group        {"data": {"ll": [...], "pl": [...], "fines": [...], "passing_4_75": [...]}}
+    POST /area              {"unit": "Metres", "data": {"parcel": [...], "x": [...], "y": [...]}}
+    POST /results           {"records": [{"project": ..., "test": ..., "value": ..., ...}, ...]}
+    GET  /results?project=&test=&specimen=&since=&until=&limit=&cursor=
+    GET  /qc?project=       (cube acceptance statistics per project and grade)
+    GET  /trends?metric=strength|fm|ll|pi&period=week|month|quarter&since=&until=
+    GET  /health
+    GET  /metrics           (Prometheus text format)
+
+Large batches and sieve analyses run on a process pool so they neither hold
+the GIL nor block other requests.
+
+    python -m civil_lab.api --port 8600 --workers 4
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from civil_lab import classifier, jobs, metrics, qc, rollups, store
+from civil_lab.calc import area, bitumen, consistency, sieve, specific_gravity, strength, workability
+
+# Requests with more rows than this go to the worker pool.
+POOL_THRESHOLD = 5000
+POOL_ENDPOINTS = {"/sieve"}
+REQUEST_TIMEOUT = 120
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            return np.where(np.isnan(value), None, value).tolist()
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _columns(payload):
+    data = payload.get("data")
+    if not isinstance(data, dict) or not data:
+        raise ValueError("Expected a non-empty 'data' object of column arrays")
+    columns = {k: np.asarray(v, dtype=float).ravel() for k, v in data.items()}
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns in 'data' must have the same length")
+    return columns
+
+
+def strength_endpoint(payload):
+    return {"strength": strength.evaluate(payload.get("type"), _columns(payload))}
+
+
+def consistency_endpoint(payload):
+    return consistency.evaluate(payload.get("test"), _columns(payload))
+
+
+def indices_endpoint(payload):
+    return consistency.evaluate("Indices", _columns(payload))
+
+
+def specific_gravity_endpoint(payload):
+    return {"specific_gravity": specific_gravity.evaluate(_columns(payload), payload.get("medium", "Kerosene"))}
+
+
+def sieve_endpoint(payload):
+    result = sieve.analyze(payload["sizes"], payload["retained"], payload.get("percents", (10, 30, 60)),
+                           payload.get("method", "linear"))
+    result["d"] = {f"D{pct:g}": sizes for pct, sizes in result["d"].items()}
+    result["well_graded"] = sieve.is_well_graded(result["cu"], result["cc"])
+    return result
+
+
+def workability_endpoint(payload):
+    result = workability.classify(payload.get("test"), np.asarray(payload.get("values", []), dtype=float))
+    return {"label": result["label"], "kind": result["alert"], "message": result["message"]}
+
+
+def bitumen_endpoint(payload):
+    test = payload.get("test")
+    values = np.asarray(payload.get("values", []), dtype=float)
+    fire_points = payload.get("fire_points")
+    if fire_points is not None:
+        fire_points = np.asarray([np.nan if f is None else f for f in fire_points], dtype=float)
+        if fire_points.shape != values.shape:
+            raise ValueError("'fire_points' must have the same length as 'values'")
+    return bitumen.classify(test, values, fire_points)
+
+
+def soil_group_endpoint(payload):
+    return classifier.classify_columns(_columns(payload))
+
+
+def area_endpoint(payload):
+    data = payload.get("data")
+    if not isinstance(data, dict):
+        raise ValueError("Expected a 'data' object with x, y and optional parcel arrays")
+    columns = {k: np.asarray(v, dtype=float) for k, v in data.items() if k in ("x", "y")}
+    if "parcel" in data:
+        columns["parcel"] = np.asarray([str(p) for p in data["parcel"]])
+    return area.evaluate(columns, payload.get("unit", "Metres"))
+
+
+def results_endpoint(payload):
+    records = payload.get("records")
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("Expected a 'records' array of objects")
+    # One transaction for the whole request (its size is capped by MAX_BODY_BYTES):
+    # a bad record rejects the request without storing any of the others.
+    return {"stored": store.default_store().insert_many(records, batch_size=max(1, len(records)))}
+
+
+RESULT_FILTERS = ("project", "test", "specimen", "since", "until", "limit", "cursor")
+
+
+def query_results(query):
+    """One page of stored results for a ``GET /results`` query string."""
+    params = {k: v[-1] for k, v in parse_qs(query).items()}
+    unknown = set(params) - set(RESULT_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+    return store.default_store().query(**params)
+
+
+def query_qc(query):
+    """Cube acceptance statistics for a ``GET /qc`` query string, brought up to date first."""
+    params = {k: v[-1] for k, v in parse_qs(query).items()}
+    unknown = set(params) - {"project"}
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+    tracker = qc.QCTracker(store.default_store())
+    tracker.refresh()
+    rows, flags = tracker.summary(params.get("project"))
+    return {"grades": rows, "flags": flags}
+
+
+def query_trends(query):
+    """Rollup rows (with count, mean, sd, min and max) for a ``GET /trends`` query string."""
+    params = {k: v[-1] for k, v in parse_qs(query).items()}
+    unknown = set(params) - {"metric", "period", "since", "until"}
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+    if "metric" not in params:
+        raise ValueError(f"Give a metric: {', '.join(rollups.METRICS)}")
+    rows = store.default_store().rollup(**params)
+    return {"rows": [{"bucket": r["bucket"], "dimension": r["dimension"], **rollups.stats(r)} for r in rows]}
+
+
+ENDPOINTS = {
+    "/strength": strength_endpoint,
+    "/consistency": consistency_endpoint,
+    "/indices": indices_endpoint,
+    "/specific-gravity": specific_gravity_endpoint,
+    "/sieve": sieve_endpoint,
+    "/workability": workability_endpoint,
+    "/bitumen": bitumen_endpoint,
+    "/soil-group": soil_group_endpoint,
+    "/area": area_endpoint,
+    "/results": results_endpoint,
+}
+# Endpoints that touch the local database stay in the server process.
+LOCAL_ENDPOINTS = {"/results"}
+QUERIES = {"/results": query_results, "/qc": query_qc, "/trends": query_trends}
+
+
+def handle(path, payload):
+    """Run one request and return its JSON-ready response body.
+
+    Top-level so it can be shipped to a worker process.
+    """
+    return _jsonable(ENDPOINTS[path](payload))
+
+
+def _row_count(payload):
+    if isinstance(payload.get("data"), dict):
+        return max((len(v) for v in payload["data"].values() if isinstance(v, list)), default=0)
+    for key in ("retained", "values"):
+        if isinstance(payload.get(key), list):
+            return len(payload[key])
+    return 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    pool = None
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in QUERIES:
+            try:
+                with metrics.timed(f"api{url.path}.query"):
+                    body = _jsonable(QUERIES[url.path](url.query))
+            except (ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(200, body)
+        elif url.path == "/health":
+            self._send(200, {"status": "ok", "endpoints": sorted(ENDPOINTS)})
+        elif url.path == "/metrics":
+            data = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send(404, {"error": f"Unknown endpoint {url.path}"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path not in ENDPOINTS:
+            self._send(404, {"error": f"Unknown endpoint {path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, {"error": "Request body too large"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Request body must be a JSON object")
+            with metrics.timed(f"api{path}"):
+                if self.pool is not None and path not in LOCAL_ENDPOINTS and (
+                        path in POOL_ENDPOINTS or _row_count(payload) > POOL_THRESHOLD):
+                    body = self.pool.submit(handle, path, payload).result(timeout=REQUEST_TIMEOUT)
+                else:
+                    body = handle(path, payload)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        except TimeoutError:
+            self._send(504, {"error": f"Request did not finish within {REQUEST_TIMEOUT} s"})
+            return
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, body)
+
+
+def serve(host="127.0.0.1", port=8600, workers=None):
+    workers = workers or os.cpu_count() or 1
+    # The pool starts its workers lazily, from request threads: not by fork.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=jobs.pool_context()) as pool:
+        Handler.pool = pool
+        server = ThreadingHTTPServer((host, port), Handler)
+        print(f"Civil Lab API listening on http://{host}:{port} ({workers} workers)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Civil Lab Assistant JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Streamlit side of the background jobs in ``civil_lab.jobs``.
+
+A page submits its heavy work with ``submit(name, fn, ...)``; the job id is
+kept in the session under ``name``, so the result survives reruns. On every
+rerun the page calls ``result(name)``: it waits briefly (quick jobs come
+back on the same run), otherwise shows a progress bar that polls the job
+and reruns the app once it is done.
+"""
+import streamlit as st
+
+from civil_lab import jobs
+
+QUICK_WAIT = 0.5  # seconds a rerun waits for a job before showing progress
+POLL_INTERVAL = 0.5  # seconds between progress bar refreshes
+
+
+@st.cache_resource
+def executor():
+    return jobs.default_executor()
+
+
+def snapshot():
+    """Every known job, newest first; empty, without starting the executor, if nothing has used it yet."""
+    started = jobs.started_executor()
+    return [] if started is None else started.snapshot()
+
+
+def _key(name):
+    return f"job_{name}"
+
+
+def submit(name, fn, *args, **kwargs):
+    """Start ``fn(*args, **kwargs)`` as this session's ``name`` job; returns the job, or ``None`` if the queue is full."""
+    try:
+        job = executor().submit(fn, *args, **kwargs)
+    except jobs.QueueFull:
+        st.error("The server is busy with other analyses. Try again in a moment.")
+        return None
+    st.session_state[_key(name)] = job.id
+    return job
+
+
+def current(name):
+    """This session's latest ``name`` job, or ``None``."""
+    job_id = st.session_state.get(_key(name))
+    return None if job_id is None else executor().get(job_id)
+
+
+def forget(name):
+    st.session_state.pop(_key(name), None)
+
+
+def result(name, label="Working..."):
+    """Value of this session's ``name`` job once it is done.
+
+    While it runs, shows its progress (with a Cancel button) and returns
+    ``None``; if it failed, shows why and returns ``None``.
+    """
+    job = current(name)
+    if job is None:
+        return None
+    if not job.wait(QUICK_WAIT):
+        _progress(job.id, label)
+        return None
+    if job.state != jobs.DONE:
+        st.error(job.error if job.state != jobs.CANCELLED else "Cancelled.")
+        return None
+    return job.result()
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _progress(job_id, label):
+    job = executor().get(job_id)
+    if job is None or job.done():
+        st.rerun()
+    status = "waiting for a worker" if job.state == jobs.QUEUED else job.message
+    st.progress(job.progress, text=f"{label} {status}".strip())
+    st.button("Cancel", key=f"cancel_{job_id}", on_click=executor().cancel, args=(job_id,))
@@ -0,0 +1,49 @@
+"""Reading bitumen apparatus temperature logs for the Bitumen Analysis page.
+
+``analyze`` streams a ring-and-ball or Cleveland open cup log through
+``calc.temperature_log.TemperatureLog`` ``logs.CHUNK_ROWS`` rows at a time
+and classifies every run's softening point, or flash and fire points, in one
+batch through the same threshold tables as a typed reading. It runs as a
+background job (``civil_lab.jobs``) and reports its progress.
+"""
+import numpy as np
+
+from civil_lab import jobs, logs, metrics
+from civil_lab.calc import bitumen
+from civil_lab.calc import temperature_log as engine
+
+# Bitumen test -> log kind.
+KINDS = {"Softness Test": engine.SOFTENING, "Flash and Fire Point": engine.FLASH}
+TIME_UNITS = {"s": 1.0, "min": 60.0}
+
+
+def analyze(content, test, time_column, temperature_column, event_column, run_column=None, time_unit="s"):
+    """Summary of every run in the log, with its classification ``label`` and ``message``."""
+    if test not in KINDS:
+        raise ValueError(f"{test} has no apparatus log")
+    to_s = TIME_UNITS[time_unit]
+    wanted = [c for c in (time_column, temperature_column, event_column, run_column) if c]
+    total_rows, rows = logs.total_rows(content), 0
+    log = engine.TemperatureLog(KINDS[test])
+    runs = []
+    with metrics.timed("bitumen_log.read"):
+        for chunk in logs.read_chunks(content, wanted):
+            events = chunk[event_column].fillna("").astype(str).str.strip().to_numpy(dtype=str)
+            ids = chunk[run_column].astype(str).to_numpy() if run_column else None
+            runs += log.update(logs.numbers(chunk, time_column) * to_s, logs.numbers(chunk, temperature_column),
+                               events, ids)
+            rows += len(chunk)
+            jobs.report_progress(rows / total_rows, f"{rows:,} rows, {log.runs} runs")
+        runs += log.finish()
+    if not runs:
+        raise ValueError("The log has no temperature readings")
+
+    with metrics.timed("bitumen_log.classify"):
+        if test == "Flash and Fire Point":
+            result = bitumen.classify(test, np.array([r["flash_point"] for r in runs]),
+                                      np.array([r["fire_point"] for r in runs]))
+        else:
+            result = bitumen.classify(test, np.array([r["softening_point"] for r in runs]))
+    for run, label, message in zip(runs, result["label"], result["message"]):
+        run["label"], run["message"] = label, message
+    return runs
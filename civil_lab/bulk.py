@@ -0,0 +1,404 @@
+"""Streaming bulk processor for lab registers.
+
+Reads a CSV, ``.xlsx`` or legacy ``.xls`` sheet row by row, routes each row
+to its calculator and appends the results to a CSV or ``.xlsx`` file as it
+goes. Rows are evaluated in fixed-size chunks with the vectorised kernels, so
+memory use depends on the chunk size, not on the length of the register.
+
+The first row of the sheet is the header. The test for each row comes from a
+``test`` column, or from ``--test`` for single-test registers. Column names
+follow the batch columns of each calculator (see ``python -m civil_lab.bulk
+--list``); sieve rows give % retained in columns named ``ret_<size in mm>``,
+e.g. ``ret_4.75``.
+
+A row is only evaluated when every input its test needs is filled in and
+every input cell holds a number; otherwise its ``error`` cell says which
+column is missing or not numeric, and it gets no result.
+
+    python -m civil_lab.bulk register.xlsx -o results.csv
+    python -m civil_lab.bulk cubes.csv -o cubes_out.xlsx --test "Compressive Strength"
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+
+import numpy as np
+
+from civil_lab import classifier
+from civil_lab.calc import bitumen, consistency, sieve, specific_gravity, strength, workability
+
+CHUNK_SIZE = 5000
+SIEVE_PREFIX = "ret_"
+# Liquid limit trials beyond the second: m_container_3, m_wet_3, m_dry_3, blows_3, ...
+EXTRA_TRIAL = re.compile(r"(m_container|m_wet|m_dry|blows)_\d+$")
+
+
+def _strength_route(test):
+    def run(columns):
+        return {"strength": strength.evaluate(test, columns)}
+    return run
+
+
+def _consistency_route(test):
+    def run(columns):
+        return consistency.evaluate(test, columns)
+    return run
+
+
+def _threshold_route(calc, test):
+    def run(columns):
+        result = calc.evaluate(test, columns)
+        return {"rating": result["label"], "inference": result["message"]}
+    return run
+
+
+def _medium(value):
+    """Canonical medium name of a ``medium`` cell (blank: kerosene)."""
+    return "Kerosene" if value is None or str(value).strip() == "" else str(value).strip().title()
+
+
+def _specific_gravity(columns):
+    medium = columns.get("medium")
+    if medium is None:
+        sg_medium = specific_gravity.MEDIUM_SG["Kerosene"]
+    else:
+        sg_medium = np.array([specific_gravity.MEDIUM_SG.get(_medium(m), np.nan) for m in medium])
+    return {"specific_gravity": specific_gravity.specific_gravity(
+        columns["w1"], columns["w2"], columns["w3"], columns["w4"], sg_medium)}
+
+
+def _sieve(columns):
+    names = [c for c in columns if c.startswith(SIEVE_PREFIX)]
+    if len(names) < 2:
+        raise ValueError(f"Sieve rows need at least two '{SIEVE_PREFIX}<size>' columns")
+    sizes = [float(c[len(SIEVE_PREFIX):]) for c in names]
+    retained = np.column_stack([columns[c] for c in names])
+    result = sieve.analyze(sizes, retained)
+    return {
+        "D10": result["d"][10], "D30": result["d"][30], "D60": result["d"][60],
+        "Cu": result["cu"], "Cc": result["cc"], "FM": result["fm"],
+        "zone": result["zone"], "passing_4_75": result["passing_4_75"],
+    }
+
+
+# test name -> (result columns, calculator over a dict of column arrays)
+ROUTES = {test: (["strength"], _strength_route(test)) for test in strength.BATCH_COLUMNS}
+ROUTES["Liquid Limit"] = (["liquid_limit", "flow_index", "trials"], _consistency_route("Liquid Limit"))
+ROUTES["Plastic Limit"] = (["plastic_limit"], _consistency_route("Plastic Limit"))
+ROUTES["Shrinkage Limit"] = (["shrinkage_limit"], _consistency_route("Shrinkage Limit"))
+ROUTES["Indices"] = (["pi", "li", "ci", "si"], _consistency_route("Indices"))
+ROUTES["Specific Gravity"] = (["specific_gravity"], _specific_gravity)
+ROUTES["Sieve Analysis"] = (["D10", "D30", "D60", "Cu", "Cc", "FM", "zone", "passing_4_75"], _sieve)
+ROUTES["Soil Group"] = (["rule_group", "model_group"], classifier.classify_columns)
+for _calc in (workability, bitumen):
+    for _test in _calc.TESTS:
+        ROUTES[_test] = (["rating", "inference"], _threshold_route(_calc, _test))
+
+# test -> numeric input columns it reads (sieve and extra liquid limit trial
+# columns are found in the header).
+INPUTS = dict(strength.BATCH_COLUMNS)
+INPUTS.update(consistency.BATCH_COLUMNS)
+INPUTS["Specific Gravity"] = specific_gravity.BATCH_COLUMNS
+INPUTS["Sieve Analysis"] = []
+INPUTS["Soil Group"] = classifier.BATCH_COLUMNS
+INPUTS.update(workability.BATCH_COLUMNS)
+INPUTS.update(bitumen.BATCH_COLUMNS)
+
+# test -> inputs every row must fill in. Each entry lists alternative groups
+# of columns; one of them must be complete. Tests not listed need all of
+# their ``INPUTS``.
+REQUIRED = {
+    "Compressive Strength": [[("ctm_tonnes",)], [("length_mm", "breadth_mm"), ("radius_mm",)]],
+    "Indices": [[("ll",)], [("pl",)]],
+    "Soil Group": [[(c,)] for c in classifier.BATCH_COLUMNS[:4]],
+}
+
+
+# ---------------- Readers ----------------
+
+def _iter_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+
+def _iter_xlsx(path, sheet=None):
+    from openpyxl import load_workbook
+
+    # read_only streams rows from the zip instead of building the whole sheet.
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.active
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _iter_xls(path, sheet=None):
+    import xlrd
+
+    # xlrd cannot stream cells, but on_demand loads only the requested sheet.
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        ws = book.sheet_by_name(sheet) if sheet else book.sheet_by_index(0)
+        for i in range(ws.nrows):
+            yield ws.row_values(i)
+    finally:
+        book.release_resources()
+
+
+def iter_rows(path, sheet=None):
+    """Yield the header and then each row of a sheet as a list of cell values."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return _iter_csv(path)
+    if ext in (".xlsx", ".xlsm"):
+        return _iter_xlsx(path, sheet)
+    if ext == ".xls":
+        return _iter_xls(path, sheet)
+    raise ValueError(f"Unsupported input format: {ext}")
+
+
+# ---------------- Writers ----------------
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._w = csv.writer(self._f)
+
+    def write(self, row):
+        self._w.writerow(row)
+
+    def close(self):
+        self._f.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        # write_only flushes rows to disk instead of keeping cell objects.
+        self._path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("Results")
+
+    def write(self, row):
+        self._ws.append(row)
+
+    def close(self):
+        self._wb.save(self._path)
+
+
+def open_writer(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return _CsvWriter(path)
+    if ext == ".xlsx":
+        return _XlsxWriter(path)
+    raise ValueError(f"Unsupported output format: {ext}")
+
+
+# ---------------- Processing ----------------
+
+def _to_float(value):
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _cell(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _numeric_inputs(test, header):
+    """Input columns of ``test`` that must hold numbers."""
+    if test == "Sieve Analysis":
+        return [c for c in header if c.startswith(SIEVE_PREFIX)]
+    extra = [c for c in header if test == "Liquid Limit" and EXTRA_TRIAL.match(c)]
+    return list(dict.fromkeys(INPUTS[test] + extra))
+
+
+def _required(test, header):
+    if test in REQUIRED:
+        return REQUIRED[test]
+    names = _numeric_inputs(test, header) if test == "Sieve Analysis" else INPUTS[test]
+    return [[(c,)] for c in names]
+
+
+def _row_errors(test, header, columns, raw):
+    """Error message for each row (``None`` when it can be evaluated)."""
+    n = len(next(iter(raw.values())))
+    errors = [None] * n
+    # A cell that is filled in but is not a number.
+    for name in _numeric_inputs(test, header):
+        if name not in columns:
+            continue
+        bad = np.isnan(columns[name]) & np.array([v is not None and str(v).strip() != "" for v in raw[name]])
+        for k in np.flatnonzero(bad):
+            errors[k] = errors[k] or f"non-numeric value in column {name}"
+    if test == "Specific Gravity" and "medium" in raw:
+        for k, value in enumerate(raw["medium"]):
+            if _medium(value) not in specific_gravity.MEDIUM_SG:
+                errors[k] = errors[k] or (f"unknown medium {value!r}; expected one of "
+                                          f"{', '.join(specific_gravity.MEDIUM_SG)}")
+    # Required inputs left blank (or absent from the sheet).
+    for alternatives in _required(test, header):
+        filled = np.zeros(n, dtype=bool)
+        for group in alternatives:
+            filled |= np.all([np.isfinite(columns[c]) if c in columns else np.zeros(n, dtype=bool)
+                              for c in group], axis=0)
+        for k in np.flatnonzero(~filled):
+            if errors[k]:
+                continue
+            # Name the blanks of the alternative that is closest to complete.
+            blanks = min(([c for c in group if c not in columns or not np.isfinite(columns[c][k])]
+                          for group in alternatives), key=len)
+            errors[k] = "missing " + ", ".join(c if c in columns else f"column {c!r}" for c in blanks)
+    return errors
+
+
+def _evaluate_chunk(header, rows, tests, result_columns):
+    """Result cells for each row of a chunk, in row order."""
+    out = [[None] * len(result_columns) for _ in rows]
+    errors = [None] * len(rows)
+    by_test = {}
+    for i, test in enumerate(tests):
+        by_test.setdefault(test, []).append(i)
+
+    for test, idx in by_test.items():
+        if test not in ROUTES:
+            for i in idx:
+                errors[i] = f"Unknown test {test!r}"
+            continue
+        names, run = ROUTES[test]
+        raw, columns = {}, {}
+        for j, name in enumerate(header):
+            raw[name] = [rows[i][j] if j < len(rows[i]) else None for i in idx]
+            if name != "medium":
+                columns[name] = np.array([_to_float(v) for v in raw[name]])
+        row_errors = _row_errors(test, header, columns, raw)
+        for k, i in enumerate(idx):
+            errors[i] = row_errors[k]
+        ok = [k for k, error in enumerate(row_errors) if error is None]
+        if not ok:
+            continue
+        if len(ok) < len(idx):
+            idx = [idx[k] for k in ok]
+            columns = {name: values[ok] for name, values in columns.items()}
+            raw = {name: [values[k] for k in ok] for name, values in raw.items()}
+        if "medium" in raw:
+            columns["medium"] = raw["medium"]
+        try:
+            result = run(columns)
+        except KeyError as e:
+            for i in idx:
+                errors[i] = f"missing column {e.args[0]!r}"
+            continue
+        except ValueError as e:
+            for i in idx:
+                errors[i] = str(e)
+            continue
+        for name in names:
+            col = result_columns.index(name)
+            for k, i in enumerate(idx):
+                out[i][col] = _cell(result[name][k])
+    return out, errors
+
+
+def process(input_path, output_path, test=None, sheet=None, chunk_size=CHUNK_SIZE):
+    """Stream ``input_path`` through the calculators into ``output_path``.
+
+    Returns the number of data rows processed.
+    """
+    if test is not None and test not in ROUTES:
+        raise ValueError(f"Unknown test {test!r}; expected one of {', '.join(ROUTES)}")
+
+    rows = iter_rows(input_path, sheet)
+    try:
+        header = [str(h).strip() if h is not None else "" for h in next(rows)]
+    except StopIteration:
+        raise ValueError(f"{input_path} is empty")
+    test_col = header.index("test") if "test" in header else None
+    if test is None and test_col is None:
+        raise ValueError("No 'test' column in the sheet; pass --test for single-test registers")
+
+    routes = [test] if test else list(ROUTES)
+    result_columns = []
+    for name in routes:
+        for col in ROUTES[name][0]:
+            if col not in result_columns:
+                result_columns.append(col)
+
+    writer = open_writer(output_path)
+    count = 0
+    try:
+        writer.write(header + result_columns + ["error"])
+        chunk, tests = [], []
+
+        def flush():
+            results, errors = _evaluate_chunk(header, chunk, tests, result_columns)
+            for row, res, err in zip(chunk, results, errors):
+                writer.write([_cell(v) for v in row] + res + [err])
+            chunk.clear()
+            tests.clear()
+
+        for row in rows:
+            row = list(row)
+            if not any(v not in (None, "") for v in row):
+                continue
+            row_test = row[test_col] if test_col is not None and test_col < len(row) else None
+            tests.append(str(row_test).strip() if row_test not in (None, "") else test)
+            chunk.append(row)
+            count += 1
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    finally:
+        writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a lab register through the Civil Lab calculators.")
+    parser.add_argument("input", nargs="?", help="CSV, .xlsx or .xls register")
+    parser.add_argument("-o", "--output", help="results file (.csv or .xlsx)")
+    parser.add_argument("--test", help="test for every row when the sheet has no 'test' column")
+    parser.add_argument("--sheet", help="worksheet name (default: first sheet)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--list", action="store_true", help="list tests and their input columns")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        inputs = dict(strength.BATCH_COLUMNS)
+        inputs.update(consistency.BATCH_COLUMNS)
+        inputs["Specific Gravity"] = specific_gravity.BATCH_COLUMNS + ["medium"]
+        inputs["Sieve Analysis"] = [f"{SIEVE_PREFIX}<size mm>", "..."]
+        inputs["Soil Group"] = classifier.BATCH_COLUMNS
+        inputs.update(workability.BATCH_COLUMNS)
+        inputs.update(bitumen.BATCH_COLUMNS)
+        for name in ROUTES:
+            print(f"{name}: {', '.join(inputs[name])}")
+        return 0
+
+    if not args.input or not args.output:
+        parser.error("input and --output are required")
+    try:
+        n = process(args.input, args.output, args.test, args.sheet, args.chunk_size)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"Processed {n} rows -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
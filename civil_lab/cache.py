@@ -0,0 +1,109 @@
+"""Process-wide memoisation keyed on a hash of normalised inputs.
+
+Caches live at module level, so every Streamlit session served by the same
+process shares them. Each cache is bounded and evicts the least recently used
+entry. Cached values are shared between callers and must not be mutated.
+"""
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+_FLOAT_DIGITS = 9
+_registry = {}
+_MISSING = object()
+
+
+def _normalize(value):
+    if isinstance(value, np.ndarray):
+        return _normalize(value.tolist())
+    if isinstance(value, (bytes, bytearray)):
+        return "bytes:" + hashlib.blake2b(value, digest_size=16).hexdigest()
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    # 5 and 5.0 are the same reading, so integers hash like floats.
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        value = float(value)
+        return None if value != value else round(value, _FLOAT_DIGITS)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    return value
+
+
+def make_key(*parts):
+    """Stable hex digest for any mix of scalars, sequences, dicts and arrays."""
+    payload = json.dumps(_normalize(parts), separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, maxsize=256, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        if name:
+            _registry[name] = self
+
+    def lookup(self, key, default=None):
+        """Cached value for ``key`` (counted as a hit), else ``default`` (counted as a miss)."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def store(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.lookup(key, _MISSING)
+        if value is _MISSING:
+            # Compute outside the lock so a slow miss does not block other sessions.
+            value = compute()
+            self.store(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._data), "maxsize": self.maxsize}
+
+
+def memoize(maxsize=256):
+    """Decorator caching a function's result on the hash of its arguments."""
+    def decorator(fn):
+        cache = LRUCache(maxsize, name=f"{fn.__module__}.{fn.__qualname__}")
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            return cache.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+        wrapper.cache = cache
+        wrapper.key = lambda *args, **kwargs: make_key(args, kwargs)
+        return wrapper
+    return decorator
+
+
+def all_stats():
+    """Hit/miss counters for every named cache in this process."""
+    return {name: cache.stats() for name, cache in _registry.items()}
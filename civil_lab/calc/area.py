@@ -0,0 +1,118 @@
+"""Plot areas from survey coordinates, vectorised over parcels.
+
+Parcels are stored flat: every vertex of every parcel in one ``x``/``y``
+array, with ``starts`` giving the index of each parcel's first vertex. The
+shoelace sum for all parcels is then one pass over the vertex arrays, so the
+cost grows linearly with the total vertex count.
+"""
+import numpy as np
+
+M2_PER_CENT = 40.47
+FT2_PER_M2 = 10.7639
+M2_PER_ACRE = 4046.8564224
+M2_PER_HECTARE = 10000.0
+COORDINATE_UNITS = {"Metres": 1.0, "Feet": 0.3048}
+
+
+def convert(area_m2):
+    """The area in every unit the converter reports."""
+    area_m2 = np.asarray(area_m2, dtype=float)
+    return {
+        "area_m2": area_m2,
+        "cents": area_m2 / M2_PER_CENT,
+        "sq_feet": area_m2 * FT2_PER_M2,
+        "acres": area_m2 / M2_PER_ACRE,
+        "hectares": area_m2 / M2_PER_HECTARE,
+    }
+
+
+def polygon_areas(x, y, starts=(0,)):
+    """Area enclosed by each parcel's traverse (shoelace formula).
+
+    Vertices may run clockwise or anticlockwise and the closing vertex may
+    be repeated or left out. Parcels with fewer than three vertices give
+    NaN. Each parcel is shifted to its first vertex before summing, so large
+    grid coordinates (eastings of 500 000 m) do not swamp small plots.
+    """
+    x, y = np.asarray(x, dtype=float).ravel(), np.asarray(y, dtype=float).ravel()
+    if x.shape != y.shape:
+        raise ValueError("x and y must have the same number of vertices")
+    starts = np.asarray(starts, dtype=np.intp)
+    n = len(x)
+    if n == 0:
+        raise ValueError("No vertices given")
+    if len(starts) == 0 or starts[0] != 0 or np.any(np.diff(starts) <= 0) or starts[-1] >= n:
+        raise ValueError("Parcel starts must begin at 0 and increase within the vertex list")
+    counts = np.diff(np.append(starts, n))
+    parcel = np.repeat(np.arange(len(starts)), counts)
+    dx = x - x[starts][parcel]
+    dy = y - y[starts][parcel]
+
+    # The next vertex of each parcel's last vertex is its first one.
+    nxt = np.arange(1, n + 1)
+    nxt[starts[1:] - 1] = starts[:-1]
+    nxt[-1] = starts[-1]
+    cross = dx * dy[nxt] - dx[nxt] * dy
+    area = np.abs(np.add.reduceat(cross, starts)) / 2
+    return np.where(counts >= 3, area, np.nan)
+
+
+def parcel_runs(ids):
+    """``(labels, starts)`` for vertices listed parcel by parcel.
+
+    Each parcel's vertices must be consecutive and in traverse order.
+    """
+    ids = np.asarray(ids).ravel()
+    if len(ids) == 0:
+        raise ValueError("No vertices given")
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    labels = ids[starts]
+    unique, counts = np.unique(labels, return_counts=True)
+    if (counts > 1).any():
+        repeated = ", ".join(str(label) for label in unique[counts > 1][:5])
+        raise ValueError(f"The vertices of each parcel must be consecutive; {repeated} appear in more than one block")
+    return labels, starts
+
+
+def parse_coordinates(text):
+    """``(x, y)`` arrays from ``x, y`` pairs, one vertex per line.
+
+    Commas, semicolons, tabs and spaces all separate values.
+    """
+    for sep in ",;\t":
+        text = text.replace(sep, " ")
+    try:
+        values = np.array(text.split(), dtype=float)
+    except ValueError:
+        raise ValueError("Coordinates must be numbers")
+    if len(values) % 2:
+        raise ValueError("Each vertex needs both an x and a y coordinate")
+    return values[0::2], values[1::2]
+
+
+BATCH_COLUMNS = ["parcel", "x", "y"]
+
+
+def evaluate(columns, unit="Metres"):
+    """Areas of every parcel in a mapping of ``parcel``, ``x``, ``y`` -> array.
+
+    ``x``/``y`` are in ``unit`` (see ``COORDINATE_UNITS``). Without a
+    ``parcel`` column all vertices form one parcel.
+    """
+    missing = [c for c in ("x", "y") if c not in columns]
+    if missing:
+        raise ValueError(f"Parcel coordinates are missing columns: {', '.join(missing)}")
+    if unit not in COORDINATE_UNITS:
+        raise ValueError(f"Unknown coordinate unit {unit!r}; expected one of {', '.join(COORDINATE_UNITS)}")
+    x = np.asarray(columns["x"], dtype=float).ravel()
+    y = np.asarray(columns["y"], dtype=float).ravel()
+    if not np.isfinite(x).all() or not np.isfinite(y).all():
+        raise ValueError("Every vertex needs numeric x and y coordinates")
+    ids = columns.get("parcel")
+    if ids is not None and len(ids) != len(x):
+        raise ValueError("parcel, x and y must have the same length")
+    labels, starts = parcel_runs(ids) if ids is not None else (np.array(["1"]), np.array([0]))
+    scale = COORDINATE_UNITS[unit]
+    result = {"parcel": labels, "vertices": np.diff(np.append(starts, len(x)))}
+    result.update(convert(polygon_areas(x, y, starts) * scale ** 2))
+    return result
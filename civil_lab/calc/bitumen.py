@@ -0,0 +1,96 @@
+"""Bitumen test inference.
+
+Each test is a declarative threshold table (see ``civil_lab.calc.thresholds``);
+Flash and Fire Point is judged on both temperatures through a grid.
+``infer`` classifies one reading for the UI; ``classify`` takes whole arrays.
+"""
+import numpy as np
+
+from civil_lab.calc.thresholds import Outcome, ThresholdGrid, ThresholdTable
+
+_FLASH_FIRE_OUTCOMES = [
+    Outcome("low", "🔴 The bitumen has a low flash and fire point, posing a risk of fire hazard during handling.", "write"),
+    Outcome("moderate", "🟡 The bitumen has moderate flash and fire points. It may not be suitable for extreme temperature conditions.", "write"),
+    Outcome("high", "🟢 The bitumen has a high flash and fire point, making it safe for high-temperature operations.", "write"),
+]
+
+TABLES = {
+    # Ductility Analysis based on IS Classification
+    "Ductility": ThresholdTable(
+        edges=[(40, "above"), (80, "below")],
+        outcomes=[
+            Outcome("low", "🔴 The bitumen is classified as **Low Ductility**. The bitumen has low flexibility and is prone to cracking under low temperatures.", "write"),
+            Outcome("medium", "🟡 The bitumen is classified as **Medium Ductility**. This bitumen has moderate flexibility and performs well in moderate temperature conditions.", "write"),
+            Outcome("high", "🟢 The bitumen is classified as **High Ductility**. It has high flexibility, making it suitable for low-temperature applications without cracking.", "write"),
+        ],
+    ),
+    "Stripping Value": ThresholdTable(
+        edges=[(0.5, "above"), (2.0, "below")],
+        outcomes=[
+            Outcome("acceptable", "🟢 The stripping value is within acceptable limits. The bitumen has good adhesion to aggregates.", "write"),
+            Outcome("borderline", "🟡 The stripping value is on the borderline. A slight increase in the stripping value can affect the durability of the mixture.", "write"),
+            Outcome("too high", "🔴 The stripping value is too high, indicating poor adhesion of bitumen to aggregates. This can lead to premature failure of the pavement.", "write"),
+        ],
+    ),
+    "Softness Test": ThresholdTable(
+        edges=[(40, "above"), (55, "below")],
+        outcomes=[
+            Outcome("good", "🟢 The bitumen shows good resistance to softening at higher temperatures. It is suitable for high-temperature applications.", "write"),
+            Outcome("moderate", "🟡 The bitumen has moderate resistance to softening. It can perform well in average temperature conditions.", "write"),
+            Outcome("poor", "🔴 The bitumen is prone to excessive softening at higher temperatures, which may cause deformation of the pavement.", "write"),
+        ],
+    ),
+    # Flash point bands (<180, 180-230, >230) x fire point bands (<200, 200-250, >250).
+    # Moderate needs both readings in their middle band, high needs both above it.
+    "Flash and Fire Point": ThresholdGrid(
+        x_edges=[(180, "above"), (230, "below")],
+        y_edges=[(200, "above"), (250, "below")],
+        grid=[[0, 0, 0],
+              [0, 1, 0],
+              [0, 0, 2]],
+        outcomes=_FLASH_FIRE_OUTCOMES,
+    ),
+}
+
+TESTS = list(TABLES)
+
+
+def _table(test_conducted):
+    if test_conducted not in TABLES:
+        raise ValueError(f"Unknown bitumen test: {test_conducted}")
+    return TABLES[test_conducted]
+
+
+def _readings(test_conducted, value, fire_point):
+    if test_conducted == "Flash and Fire Point":
+        if fire_point is None:
+            raise ValueError("Flash and Fire Point needs a fire point reading")
+        return value, fire_point
+    return (value,)
+
+
+def infer(test_conducted, value, fire_point=None):
+    """Message for one reading (flash point and fire point for that test)."""
+    outcome = _table(test_conducted).classify_one(*_readings(test_conducted, value, fire_point))
+    if outcome is None:
+        raise ValueError("Reading must be a number")
+    return outcome.message
+
+
+def classify(test_conducted, values, fire_points=None):
+    """Batch classification: dict of ``label`` and ``message`` arrays."""
+    readings = [np.asarray(r, dtype=float) for r in _readings(test_conducted, values, fire_points)]
+    result = _table(test_conducted).classify(*readings)
+    del result["alert"]  # bitumen messages are always plain text
+    return result
+
+
+BATCH_COLUMNS = {test: ["value"] for test in TESTS}
+BATCH_COLUMNS["Flash and Fire Point"] = ["flash_point", "fire_point"]
+
+
+def evaluate(test_conducted, columns):
+    """Batch path: classify a mapping of column -> array (see ``BATCH_COLUMNS``)."""
+    if test_conducted == "Flash and Fire Point":
+        return classify(test_conducted, columns["flash_point"], columns["fire_point"])
+    return classify(test_conducted, columns["value"])
@@ -0,0 +1,137 @@
+"""Consistency limits and indices of soil, vectorised over specimens.
+
+Inputs may be scalars or arrays. Results that would need a division by zero
+(or a log of a non-positive ratio) come back as NaN.
+"""
+import numpy as np
+
+
+def _arr(x):
+    return np.asarray(x, dtype=float)
+
+
+def _safe_divide(num, den):
+    num, den = np.broadcast_arrays(_arr(num), _arr(den))
+    out = np.full(num.shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def water_content(m_container, m_wet, m_dry):
+    """Water content (%) from container, container + wet soil and container + dry soil masses."""
+    m1, m2, m3 = _arr(m_container), _arr(m_wet), _arr(m_dry)
+    return _safe_divide((m2 - m1) - (m3 - m1), m3 - m1) * 100
+
+
+def pad_trials(rows):
+    """Stack ragged per-specimen trial lists into a NaN-padded 2-D array."""
+    width = max((len(r) for r in rows), default=0)
+    out = np.full((len(rows), width), np.nan)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+
+def flow_curve(water_content, blows, at_blows=25):
+    """Least-squares flow curve ``w = a + b log10(N)`` for each specimen.
+
+    ``water_content`` and ``blows`` are ``(specimens, trials)`` arrays (or 1-D
+    for a single specimen); NaN entries and non-positive blow counts are
+    ignored, so specimens may have different numbers of trials. Returns
+    ``(liquid_limit, flow_index, trials)`` where the liquid limit is the
+    fitted water content at ``at_blows`` blows and the flow index is the drop
+    in water content per log cycle of blows. Specimens with fewer than two
+    usable trials, or all trials at one blow count, give NaN.
+    """
+    w = np.atleast_2d(_arr(water_content))
+    n = np.atleast_2d(_arr(blows))
+    w, n = np.broadcast_arrays(w, n)
+    valid = np.isfinite(w) & np.isfinite(n) & (n > 0)
+    x = np.log10(np.where(valid, n, 1.0))
+    y = np.where(valid, w, 0.0)
+    x = np.where(valid, x, 0.0)
+
+    # Centred sums keep the fit stable when blow counts are close together.
+    k = valid.sum(axis=1)
+    mean_x = _safe_divide(x.sum(axis=1), k)
+    mean_y = _safe_divide(y.sum(axis=1), k)
+    dx = np.where(valid, x - mean_x[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    slope = _safe_divide((dx * y).sum(axis=1), np.where((k >= 2) & (sxx > 1e-12), sxx, 0.0))
+    intercept = mean_y - slope * mean_x
+
+    liquid_limit = intercept + slope * np.log10(at_blows)
+    return liquid_limit, -slope, k
+
+
+def plastic_limit(m_container, m_wet, m_dry):
+    return water_content(m_container, m_wet, m_dry)
+
+
+def shrinkage_limit(m_dish, m_wet, m_dry, mercury_dish, mercury_displaced):
+    """Shrinkage limit (%) from dish masses and the mercury displacement readings."""
+    mass_water = _arr(m_wet) - _arr(m_dry)
+    mass_dry = _arr(m_dry) - _arr(m_dish)
+    volume_dry = _arr(mercury_dish) - _arr(mercury_displaced)
+    return _safe_divide(mass_water - volume_dry, mass_dry) * 100
+
+
+def indices(ll, pl, sl, wc):
+    """Plasticity, liquidity, consistency and shrinkage indices.
+
+    Returns a dict of arrays ``pi``, ``li``, ``ci`` and ``si``. Rows where the
+    liquid limit does not exceed the plastic limit are NaN throughout.
+    """
+    ll, pl, sl, wc = np.broadcast_arrays(_arr(ll), _arr(pl), _arr(sl), _arr(wc))
+    valid = ll > pl
+    pi = np.where(valid, ll - pl, np.nan)
+    li = np.where(valid, _safe_divide(wc - pl, pi), np.nan)
+    ci = np.where(valid, _safe_divide(ll - wc, pi), np.nan)
+    si = np.where(valid, ll - sl, np.nan)
+    return {"pi": pi, "li": li, "ci": ci, "si": si}
+
+
+# Column names expected by batch callers (API payloads, bulk sheets).
+# Liquid limit takes any number of trials: add m_container_3, m_wet_3, ... for more.
+BATCH_COLUMNS = {
+    "Liquid Limit": ["m_container_1", "m_wet_1", "m_dry_1", "blows_1",
+                     "m_container_2", "m_wet_2", "m_dry_2", "blows_2"],
+    "Plastic Limit": ["m_container", "m_wet", "m_dry"],
+    "Shrinkage Limit": ["m_dish", "m_wet", "m_dry", "mercury_dish", "mercury_displaced"],
+    "Indices": ["ll", "pl", "sl", "wc"],
+}
+
+
+def evaluate(test, columns):
+    """Batch results for ``test`` given a mapping of column name -> array.
+
+    Returns a dict of result name -> array.
+    """
+    if test not in BATCH_COLUMNS:
+        raise ValueError(f"Unknown test {test!r}; expected one of {', '.join(BATCH_COLUMNS)}")
+    missing = [c for c in BATCH_COLUMNS[test] if c not in columns]
+    if missing:
+        raise ValueError(f"{test} is missing columns: {', '.join(missing)}")
+    c = {name: _arr(columns[name]) for name in BATCH_COLUMNS[test]}
+
+    if test == "Liquid Limit":
+        trials = 1
+        while f"blows_{trials + 1}" in columns:
+            trials += 1
+        out, water, blows = {}, [], []
+        for i in range(1, trials + 1):
+            names = [f"m_container_{i}", f"m_wet_{i}", f"m_dry_{i}", f"blows_{i}"]
+            if any(name not in columns for name in names):
+                raise ValueError(f"Liquid Limit trial {i} is missing columns")
+            out[f"water_content_{i}"] = water_content(*(_arr(columns[name]) for name in names[:3]))
+            water.append(out[f"water_content_{i}"])
+            blows.append(_arr(columns[names[3]]))
+        ll, flow_index, used = flow_curve(np.column_stack(water), np.column_stack(blows))
+        out.update({"liquid_limit": ll, "flow_index": flow_index, "trials": used})
+        return out
+    if test == "Plastic Limit":
+        return {"plastic_limit": plastic_limit(c["m_container"], c["m_wet"], c["m_dry"])}
+    if test == "Shrinkage Limit":
+        return {"shrinkage_limit": shrinkage_limit(c["m_dish"], c["m_wet"], c["m_dry"],
+                                                   c["mercury_dish"], c["mercury_displaced"])}
+    return indices(c["ll"], c["pl"], c["sl"], c["wc"])
@@ -0,0 +1,197 @@
+"""Streaming analysis of compression-machine load-displacement logs.
+
+Digital CTMs log load and platen displacement many times a second, so one
+test can run to hundreds of thousands of samples. ``LoadLog`` takes the log
+in chunks (arrays) and keeps only a fixed amount of state:
+
+* the peak load and where it occurred;
+* failure: the first sample after the peak whose load falls more than
+  ``failure_drop`` below it (reset whenever a higher peak comes along);
+* a min/max decimated copy of the curve (``MinMaxDecimator``) for plotting
+  and for reading the pre-peak branch, whose size does not depend on the
+  length of the log.
+
+Loads are in any consistent unit; ``stress``, ``strain`` and
+``secant_modulus`` convert kN and mm to N/mm².
+"""
+import numpy as np
+
+FAILURE_DROP = 0.3  # failure once the load falls 30% below the peak
+MAX_POINTS = 2000  # buckets kept by the decimator (two points each)
+SECANT_FRACTION = 0.4  # secant modulus from the origin to 40% of the peak stress
+
+
+class MinMaxDecimator:
+    """Keeps the lowest and highest sample of each of at most ``max_points`` equal runs of samples.
+
+    Runs start at one sample each and double in length (merging pairs of
+    runs) whenever the log outgrows ``max_points``, so drawing the kept
+    points shows every spike of the full log at a constant cost.
+    """
+
+    def __init__(self, max_points=MAX_POINTS):
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2")
+        self.max_points = max_points
+        self.width = 1  # samples per run
+        self.samples = 0
+        # Per run: sample index, x and y of its minimum and of its maximum.
+        self._lo = (np.empty(0, np.int64), np.empty(0), np.empty(0))
+        self._hi = (np.empty(0, np.int64), np.empty(0), np.empty(0))
+
+    def _coarsen(self):
+        """Double the run length, merging runs pairwise."""
+        self.width *= 2
+        self._lo = self._pairwise(self._lo, np.less_equal)
+        self._hi = self._pairwise(self._hi, np.greater_equal)
+
+    @staticmethod
+    def _pairwise(runs, keep_first):
+        index, x, y = runs
+        n = len(y)
+        if n < 2:
+            return runs
+        first, second = np.arange(0, n - 1, 2), np.arange(1, n, 2)
+        pick = np.where(keep_first(y[first], y[second]), first, second)
+        if n % 2:
+            pick = np.append(pick, n - 1)
+        return index[pick], x[pick], y[pick]
+
+    def update(self, x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        if not len(y):
+            return
+        while (self.samples + len(y)) > self.max_points * self.width:
+            self._coarsen()
+        index = np.arange(self.samples, self.samples + len(y))
+        run = index // self.width
+        starts = np.flatnonzero(np.r_[True, run[1:] != run[:-1]])
+        lo = self._extremes(index, x, y, starts, np.minimum)
+        hi = self._extremes(index, x, y, starts, np.maximum)
+        if self.samples % self.width:  # the first run continues the last stored one
+            lo = self._join(self._lo, lo, np.less_equal)
+            hi = self._join(self._hi, hi, np.greater_equal)
+        else:
+            lo = tuple(np.concatenate(p) for p in zip(self._lo, lo))
+            hi = tuple(np.concatenate(p) for p in zip(self._hi, hi))
+        self._lo, self._hi = lo, hi
+        self.samples += len(y)
+
+    @staticmethod
+    def _extremes(index, x, y, starts, reduce):
+        value = reduce.reduceat(y, starts)
+        counts = np.diff(np.r_[starts, len(y)])
+        hits = np.flatnonzero(y == np.repeat(value, counts))
+        at = hits[np.searchsorted(hits, starts)]  # first sample reaching each run's extreme
+        return index[at], x[at], value
+
+    @staticmethod
+    def _join(stored, new, keep_stored):
+        if not len(stored[2]):
+            return new
+        keep = keep_stored(stored[2][-1], new[2][0])
+        first = tuple(s[-1:] if keep else n[:1] for s, n in zip(stored, new))
+        return tuple(np.concatenate([s[:-1], f, n[1:]]) for s, f, n in zip(stored, first, new))
+
+    def series(self):
+        """``(index, x, y)`` of the kept points in sample order."""
+        index = np.concatenate([self._lo[0], self._hi[0]])
+        order = np.argsort(index, kind="stable")
+        index, unique = np.unique(index[order], return_index=True)
+        x = np.concatenate([self._lo[1], self._hi[1]])[order][unique]
+        y = np.concatenate([self._lo[2], self._hi[2]])[order][unique]
+        return index, x, y
+
+
+class LoadLog:
+    """Peak, failure and a decimated curve of one test, fed chunk by chunk."""
+
+    def __init__(self, failure_drop=FAILURE_DROP, max_points=MAX_POINTS):
+        if not 0 < failure_drop < 1:
+            raise ValueError("failure_drop must be between 0 and 1")
+        self.failure_drop = failure_drop
+        self.samples = 0
+        self.origin = None  # displacement of the first sample
+        self.peak_load = -np.inf
+        self.peak_index = None
+        self.peak_displacement = None
+        self.failure_index = None
+        self.failure_load = None
+        self.failure_displacement = None
+        self.curve = MinMaxDecimator(max_points)
+
+    def update(self, load, displacement):
+        """Fold in the next chunk; rows with a missing load or displacement are skipped."""
+        load, displacement = np.asarray(load, dtype=float), np.asarray(displacement, dtype=float)
+        ok = np.isfinite(load) & np.isfinite(displacement)
+        if not ok.all():
+            load, displacement = load[ok], displacement[ok]
+        if not len(load):
+            return
+        if self.origin is None:
+            self.origin = float(displacement[0])
+        displacement = displacement - self.origin
+        index = self.samples + np.arange(len(load))
+
+        threshold = (1 - self.failure_drop) * self.peak_load
+        at = int(np.argmax(load))
+        if load[at] > self.peak_load:
+            # A new peak (its first sample): failure can only come after it.
+            self.peak_load = float(load[at])
+            self.peak_index = int(index[at])
+            self.peak_displacement = float(displacement[at])
+            self.failure_index = None
+            threshold = (1 - self.failure_drop) * self.peak_load
+            after = at + 1
+        else:
+            after = 0
+        if self.failure_index is None:
+            drops = np.flatnonzero(load[after:] < threshold)
+            if len(drops):
+                i = after + drops[0]
+                self.failure_index = int(index[i])
+                self.failure_load = float(load[i])
+                self.failure_displacement = float(displacement[i])
+
+        self.curve.update(displacement, load)
+        self.samples += len(load)
+
+    def summary(self):
+        if self.peak_index is None:
+            raise ValueError("The log has no load readings")
+        return {"samples": self.samples, "peak_load": self.peak_load, "peak_index": self.peak_index,
+                "peak_displacement": self.peak_displacement, "failure_index": self.failure_index,
+                "failure_load": self.failure_load, "failure_displacement": self.failure_displacement}
+
+
+def stress(load_kn, area_mm2):
+    """Stress (N/mm²) from load (kN) over area (mm²); NaN for a non-positive area."""
+    area = np.asarray(area_mm2, dtype=float)
+    return np.asarray(load_kn, dtype=float) * 1000 / np.where(area > 0, area, np.nan)
+
+
+def strain(displacement_mm, gauge_length_mm):
+    """Engineering strain from shortening (mm) over the gauge length (mm)."""
+    gauge = np.asarray(gauge_length_mm, dtype=float)
+    return np.asarray(displacement_mm, dtype=float) / np.where(gauge > 0, gauge, np.nan)
+
+
+def secant_modulus(strains, stresses, peak_stress, fraction=SECANT_FRACTION):
+    """Secant modulus (N/mm²) from the origin to ``fraction`` of the peak stress.
+
+    The strain at that stress is interpolated on the rising branch (samples
+    in order, up to the first one reaching it). NaN if it is never reached
+    or the strain there is not positive.
+    """
+    strains, stresses = np.asarray(strains, dtype=float), np.asarray(stresses, dtype=float)
+    target = fraction * peak_stress
+    reached = np.flatnonzero(stresses >= target)
+    if not len(reached) or not target > 0:
+        return float("nan")
+    i = reached[0]
+    if i == 0:
+        at = strains[0]
+    else:
+        s0, s1 = stresses[i - 1], stresses[i]
+        at = strains[i - 1] + (strains[i] - strains[i - 1]) * (target - s0) / (s1 - s0)
+    return float(target / at) if at > 0 else float("nan")
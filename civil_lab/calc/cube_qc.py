@@ -0,0 +1,218 @@
+"""Streaming acceptance statistics for concrete cube results (IS 456, clause 16).
+
+``GradeQC`` keeps the running count, mean and sum of squared deviations
+(Welford) of one grade's test results together with the few results of the
+group still being filled, so its state is a handful of numbers however long
+the history is. Results can be folded in one at a time or as arrays; arrays
+are processed with prefix sums instead of a Python loop, so years of history
+are absorbed in one pass and new results only cost their own update.
+
+A test result is the mean strength of one sample (usually three cubes, see
+``sample_strength``). Each group of ``group_size`` consecutive results is
+accepted when
+
+* its mean is at least ``fck + max(0.825 s, 3 or 4 N/mm²)`` and
+* every result is at least ``fck - 3 or 4 N/mm²``
+
+(3 N/mm² for M15 and below, 4 N/mm² from M20). ``s`` is the established
+standard deviation once ``ESTABLISHED_AFTER`` results are in, rounded to
+0.5 N/mm², and the assumed value of IS 456 Table 8 before that.
+"""
+from collections import deque
+
+import numpy as np
+
+GRADES = ["M10", "M15", "M20", "M25", "M30", "M35", "M40", "M45", "M50", "M55", "M60"]
+GROUP_SIZE = 4
+CUBES_PER_SAMPLE = 3  # IS 456 16.3: a sample is three specimens
+ESTABLISHED_AFTER = 30
+CUBE_TOLERANCE = 0.15  # individual cubes within ±15% of the sample mean
+MAX_FLAGS = 50
+
+
+def grade_strength(grade):
+    """Characteristic strength ``fck`` (N/mm²) of a grade such as ``"M25"``."""
+    text = str(grade).strip().upper()
+    try:
+        fck = float(text[1:]) if text.startswith("M") else float("nan")
+    except ValueError:
+        fck = float("nan")
+    if not 0 < fck < 200:
+        raise ValueError(f"Unknown concrete grade {grade!r}; expected e.g. M20")
+    return fck
+
+
+def parse_grade(label):
+    """Canonical grade name (``"m 25"`` -> ``"M25"``); raises ValueError if it is not one."""
+    return f"M{grade_strength(label):g}"
+
+
+def assumed_sd(fck):
+    """Assumed standard deviation (IS 456 Table 8) for a grade's ``fck``."""
+    return 3.5 if fck <= 15 else 4.0 if fck <= 25 else 5.0
+
+
+def margins(fck):
+    """``(mean margin, individual margin)`` in N/mm² from IS 456 Table 11."""
+    return (3.0, 3.0) if fck <= 15 else (4.0, 4.0)
+
+
+def sample_strength(cubes):
+    """Mean strength of each sample and whether its cubes agree.
+
+    ``cubes`` is ``(samples, cubes)`` with NaN for missing cubes. A sample is
+    valid when every cube is within ±15% of the sample mean.
+    """
+    cubes = np.atleast_2d(np.asarray(cubes, dtype=float))
+    count = np.isfinite(cubes).sum(axis=1)
+    mean = np.full(len(cubes), np.nan)
+    np.divide(np.nansum(cubes, axis=1), count, out=mean, where=count > 0)
+    spread = np.nanmax(np.abs(cubes - mean[:, None]), axis=1, initial=0.0, where=np.isfinite(cubes))
+    return mean, (count > 0) & (spread <= CUBE_TOLERANCE * mean + 1e-9)
+
+
+class GradeQC:
+    """Running statistics and group acceptance for one grade."""
+
+    def __init__(self, grade, group_size=GROUP_SIZE, overlapping=False):
+        self.grade = grade
+        self.fck = grade_strength(grade)
+        self.group_size = int(group_size)
+        self.overlapping = bool(overlapping)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.groups = 0
+        self.failed_groups = 0
+        self.pending = deque()  # (value, id) of the group being filled
+        self.flags = deque(maxlen=MAX_FLAGS)  # latest non-conforming groups
+
+    @property
+    def sd(self):
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+    @property
+    def characteristic_strength(self):
+        """Estimated characteristic strength ``mean - 1.65 s``."""
+        return float(self.mean - 1.65 * self._criterion_sd(self.count, self.sd)) if self.count else np.nan
+
+    def _criterion_sd(self, n, sd):
+        sd = np.where(np.asarray(n) >= ESTABLISHED_AFTER, sd, assumed_sd(self.fck))
+        return np.round(sd * 2) / 2
+
+    def update(self, value, result_id=None):
+        """Fold in one test result; returns the non-conforming groups it completed."""
+        return self.update_many([value], None if result_id is None else [result_id])
+
+    def update_many(self, values, ids=None):
+        """Fold in test results in arrival order.
+
+        Returns the non-conforming groups they completed, the latest
+        ``MAX_FLAGS`` at most (``failed_groups`` counts them all). NaN results
+        are skipped.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        ids = np.arange(self.count, self.count + len(values)) if ids is None else np.asarray(ids).ravel()
+        keep = np.isfinite(values)
+        values, ids = values[keep], ids[keep]
+        n_new = len(values)
+        if n_new == 0:
+            return []
+
+        # Running mean and M2 after each new result, from prefix sums of the
+        # deviations from the current mean (or the first new value).
+        shift = self.mean if self.count else values[0]
+        d = values - shift
+        n = self.count + np.arange(1, n_new + 1)
+        s1 = np.cumsum(d) + self.count * (self.mean - shift)
+        s2 = np.cumsum(d * d) + self.m2 + self.count * (self.mean - shift) ** 2
+        means = shift + s1 / n
+        m2 = np.maximum(s2 - s1 * s1 / n, 0.0)
+        sds = np.sqrt(m2 / np.maximum(n - 1, 1))
+
+        # Groups completed by these results; ``end`` indexes the new result
+        # that closes each group.
+        size, held = self.group_size, len(self.pending)
+        seq = np.concatenate([np.fromiter((v for v, _ in self.pending), float, held), values])
+        seq_ids = ids
+        if held:
+            # Held ids may be of another type than the new ones (row ids, sample names).
+            seq_ids = np.concatenate([np.array([i for _, i in self.pending], dtype=object), ids.astype(object)])
+        if self.overlapping:
+            starts = np.arange(max(0, size - 1 - held), n_new) + held - (size - 1)
+            starts = starts[starts >= 0]
+        else:
+            starts = np.arange(0, (len(seq) // size) * size, size)
+        flagged = []
+        if len(starts):
+            window = seq[starts[:, None] + np.arange(size)]
+            end = starts + size - 1 - held
+            sd = self._criterion_sd(n[end], sds[end])
+            mean_margin, individual_margin = margins(self.fck)
+            need_mean = self.fck + np.maximum(0.825 * sd, mean_margin)
+            need_min = self.fck - individual_margin
+            group_mean, group_min = window.mean(axis=1), window.min(axis=1)
+            bad = (group_mean < need_mean) | (group_min < need_min)
+            for k in np.flatnonzero(bad)[-MAX_FLAGS:]:
+                flag = {"grade": self.grade, "group": self.groups + int(k) + 1,
+                        "first_id": _plain(seq_ids[starts[k]]), "last_id": _plain(seq_ids[starts[k] + size - 1]),
+                        "mean": float(group_mean[k]), "min": float(group_min[k]),
+                        "required_mean": float(need_mean[k]), "required_min": float(need_min),
+                        "mean_ok": bool(group_mean[k] >= need_mean[k]), "individual_ok": bool(group_min[k] >= need_min)}
+                self.flags.append(flag)
+                flagged.append(flag)
+            self.groups += len(starts)
+            self.failed_groups += int(bad.sum())
+
+        # Results of the group still being filled: the last ``size - 1`` when
+        # groups overlap (fewer while the history is shorter than that).
+        tail = size - 1 if self.overlapping else len(seq) - (len(seq) // size) * size
+        first = max(0, len(seq) - tail)
+        self.pending = deque(zip(seq[first:].tolist(), seq_ids[first:].tolist()))
+        self.count, self.mean, self.m2 = int(n[-1]), float(means[-1]), float(m2[-1])
+        self.min, self.max = min(self.min, float(values.min())), max(self.max, float(values.max()))
+        return flagged
+
+    def merge(self, other):
+        """Combine the running statistics of another engine (Chan et al.).
+
+        Group acceptance is not merged: it depends on arrival order.
+        """
+        if other.count == 0:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.mean += delta * other.count / n
+        self.count = n
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+
+    def summary(self):
+        return {"grade": self.grade, "results": self.count, "mean": self.mean if self.count else np.nan,
+                "sd": self.sd, "characteristic": self.characteristic_strength,
+                "min": self.min if self.count else np.nan, "max": self.max if self.count else np.nan,
+                "groups": self.groups, "failed_groups": self.failed_groups}
+
+    def to_dict(self):
+        return {"grade": self.grade, "group_size": self.group_size, "overlapping": self.overlapping,
+                "count": self.count, "mean": self.mean, "m2": self.m2,
+                "min": None if self.count == 0 else self.min, "max": None if self.count == 0 else self.max,
+                "groups": self.groups, "failed_groups": self.failed_groups,
+                "pending": [list(p) for p in self.pending], "flags": list(self.flags)}
+
+    @classmethod
+    def from_dict(cls, state):
+        qc = cls(state["grade"], state["group_size"], state["overlapping"])
+        qc.count, qc.mean, qc.m2 = state["count"], state["mean"], state["m2"]
+        if qc.count:
+            qc.min, qc.max = state["min"], state["max"]
+        qc.groups, qc.failed_groups = state["groups"], state["failed_groups"]
+        qc.pending = deque(tuple(p) for p in state["pending"])
+        qc.flags.extend(state["flags"])
+        return qc
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
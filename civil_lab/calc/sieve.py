@@ -0,0 +1,290 @@
+"""Vectorised particle size distribution (PSD) engine.
+
+Samples are held as a 2-D matrix of % retained with one row per sample and one
+column per sieve; every sample in a batch shares the same sieve stack. All
+quantities are computed for the whole matrix at once.
+
+Dxx sizes are interpolated in log10(size), which is how PSD curves are
+drawn: linearly between sieves by default, or with a monotone cubic (PCHIP)
+for long curves such as a full stack merged with hydrometer readings. A
+percentile outside the range covered by the curve gives NaN rather than an
+extrapolated (and often negative) size. Every step is linear in the number
+of points on the curve.
+"""
+import numpy as np
+
+FM_ZONES = np.array(["Zone I", "Zone II", "Zone III", "Zone IV"])
+
+# IS 460 / IS 383 and ASTM E11 test sieves: (aperture in mm, ASTM designation).
+_CATALOGUE = [
+    (125, '5"'), (106, '4.24"'), (100, '4"'), (90, '3-1/2"'), (80, ""), (75, '3"'), (63, '2-1/2"'),
+    (53, '2.12"'), (50, '2"'), (45, '1-3/4"'), (40, ""), (37.5, '1-1/2"'), (31.5, '1-1/4"'),
+    (26.5, '1.06"'), (25, '1"'), (22.4, '7/8"'), (20, ""), (19, '3/4"'), (16, '5/8"'), (13.2, '0.530"'),
+    (12.5, '1/2"'), (11.2, '7/16"'), (10, ""), (9.5, '3/8"'), (8, '5/16"'), (6.7, '0.265"'),
+    (6.3, '1/4"'), (5.6, "No. 3-1/2"), (4.75, "No. 4"), (4, "No. 5"), (3.35, "No. 6"), (2.8, "No. 7"),
+    (2.36, "No. 8"), (2, "No. 10"), (1.7, "No. 12"), (1.4, "No. 14"), (1.18, "No. 16"), (1, "No. 18"),
+    (0.85, "No. 20"), (0.71, "No. 25"), (0.6, "No. 30"), (0.5, "No. 35"), (0.425, "No. 40"),
+    (0.355, "No. 45"), (0.3, "No. 50"), (0.25, "No. 60"), (0.212, "No. 70"), (0.18, "No. 80"),
+    (0.15, "No. 100"), (0.125, "No. 120"), (0.106, "No. 140"), (0.09, "No. 170"), (0.075, "No. 200"),
+    (0.063, "No. 230"), (0.053, "No. 270"), (0.045, "No. 325"),
+]
+
+
+def sieve_label(size):
+    """Display label for an aperture in mm, e.g. ``"4.75 mm"`` or ``"600 µm"``."""
+    size = float(size)
+    return f"{size:g} mm" if size >= 1 else f"{size * 1000:g} µm"
+
+
+# Coarse to fine; labels and sizes are computed once here, not per rerun.
+SIEVE_SIZES = np.array([size for size, _ in _CATALOGUE], dtype=float)
+SIEVE_LABELS = [sieve_label(size) for size in SIEVE_SIZES]
+ASTM_DESIGNATIONS = {label: astm for label, (_, astm) in zip(SIEVE_LABELS, _CATALOGUE) if astm}
+# Label -> size, also accepting ASTM designations ("No. 200").
+SIEVE_BY_LABEL = {**{astm: float(size) for size, astm in _CATALOGUE if astm},
+                  **dict(zip(SIEVE_LABELS, SIEVE_SIZES.tolist()))}
+
+
+def sort_sieves(sizes, retained):
+    """Order sieves from coarsest to finest; returns ``(sizes, retained)``."""
+    sizes = np.asarray(sizes, dtype=float)
+    retained = np.atleast_2d(np.asarray(retained, dtype=float))
+    if retained.shape[1] != sizes.shape[0]:
+        raise ValueError(f"Got {sizes.shape[0]} sieve sizes but {retained.shape[1]} retained columns")
+    if np.any(~(sizes > 0)):
+        raise ValueError("Sieve sizes must be positive")
+    order = np.argsort(-sizes, kind="stable")
+    return sizes[order], retained[:, order]
+
+
+def cumulative_passing(retained):
+    """% passing for retained columns ordered coarse to fine.
+
+    Negative readings or totals above 100 would make a curve rise again;
+    the running minimum keeps every row non-increasing and within 0-100.
+    """
+    passing = 100.0 - np.cumsum(np.nan_to_num(retained), axis=1)
+    passing = np.minimum.accumulate(np.clip(passing, 0.0, 100.0), axis=1)
+    return passing
+
+
+def pchip_slopes(x, y):
+    """Fritsch-Carlson slopes for a monotone cubic through each row of ``y``.
+
+    ``x`` is 1-D and strictly increasing; ``y`` has one row per curve. The
+    slopes keep every segment as monotone as its end points, so a PSD curve
+    never overshoots between readings.
+    """
+    h = np.diff(x)
+    delta = np.diff(y, axis=1) / h
+    m = np.zeros_like(y)
+    if x.size == 2:
+        m[:] = delta
+        return m
+
+    # Interior: weighted harmonic mean, zero at local extrema and flat runs.
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    d0, d1 = delta[:, :-1], delta[:, 1:]
+    same_sign = d0 * d1 > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        harmonic = (w1 + w2) / (w1 / d0 + w2 / d1)
+    m[:, 1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    # End points: three-point estimate, limited to stay shape preserving.
+    for end, (ha, hb, da, db) in ((0, (h[0], h[1], delta[:, 0], delta[:, 1])),
+                                  (-1, (h[-1], h[-2], delta[:, -1], delta[:, -2]))):
+        d = ((2 * ha + hb) * da - ha * db) / (ha + hb)
+        d = np.where(np.sign(d) != np.sign(da), 0.0, d)
+        d = np.where((np.sign(da) != np.sign(db)) & (np.abs(d) > 3 * np.abs(da)), 3 * da, d)
+        m[:, end] = d
+    return m
+
+
+def _hermite(y0, y1, m0, m1, h, t):
+    t2, t3 = t * t, t * t * t
+    return ((2 * t3 - 3 * t2 + 1) * y0 + (t3 - 2 * t2 + t) * h * m0
+            + (-2 * t3 + 3 * t2) * y1 + (t3 - t2) * h * m1)
+
+
+def interpolate_passing(sizes, passing, query, method="linear"):
+    """% passing at arbitrary sizes (mm) along each sample's curve.
+
+    ``sizes`` sorted coarse to fine, ``passing`` 2-D as from
+    :func:`cumulative_passing`. Sizes outside the curve give NaN.
+    """
+    log_d = np.log10(sizes[::-1])
+    p = passing[:, ::-1]
+    q = np.log10(np.atleast_1d(np.asarray(query, dtype=float)))
+    k = np.clip(np.searchsorted(log_d, q, side="right") - 1, 0, log_d.size - 2)
+    h = log_d[k + 1] - log_d[k]
+    t = (q - log_d[k]) / h
+    if method == "linear":
+        out = p[:, k] + t * (p[:, k + 1] - p[:, k])
+    elif method == "pchip":
+        m = pchip_slopes(log_d, p)
+        out = _hermite(p[:, k], p[:, k + 1], m[:, k], m[:, k + 1], h, t)
+    else:
+        raise ValueError(f"Unknown interpolation method: {method}")
+    return np.where((q >= log_d[0]) & (q <= log_d[-1]), out, np.nan)
+
+
+def percentile_sizes(sizes, passing, percents, method="linear"):
+    """Size (mm) at which each sample reaches each percent passing.
+
+    ``sizes`` must be sorted coarse to fine and ``passing`` come from
+    :func:`cumulative_passing`. ``method`` is ``"linear"`` or ``"pchip"``
+    (both in log10 size). Returns an array of shape
+    ``(n_samples, len(percents))``.
+    """
+    if method not in ("linear", "pchip"):
+        raise ValueError(f"Unknown interpolation method: {method}")
+    # Work fine -> coarse so both size and passing are non-decreasing.
+    log_d = np.log10(sizes[::-1])
+    p = passing[:, ::-1]
+    n_samples, n_sieves = p.shape
+    rows = np.arange(n_samples)
+    percents = np.atleast_1d(np.asarray(percents, dtype=float))
+    lo, hi_c, t, valid = (np.empty((n_samples, percents.size), dtype=dt) for dt in (int, int, float, bool))
+
+    for j, pct in enumerate(percents):
+        # First sieve with passing >= pct; the one before it is strictly below,
+        # so flat runs from empty sieves never give a zero-width segment.
+        hi = (p < pct).sum(axis=1)
+        lo[:, j] = np.maximum(hi - 1, 0)
+        hi_c[:, j] = np.minimum(hi, n_sieves - 1)
+        p_lo, p_hi = p[rows, lo[:, j]], p[rows, hi_c[:, j]]
+        inside = (hi > 0) & (hi < n_sieves)
+        t[:, j] = 1.0
+        np.divide(pct - p_lo, p_hi - p_lo, out=t[:, j], where=inside)
+        valid[:, j] = inside | ((hi == 0) & (p[:, 0] == pct))
+
+    if method == "pchip" and n_sieves > 1:
+        t = _invert_segments(log_d, p, pchip_slopes(log_d, p), lo, hi_c, t, percents)
+    log_size = log_d[lo] + t * (log_d[hi_c] - log_d[lo])
+    return np.where(valid, 10 ** log_size, np.nan)
+
+
+def _invert_segments(log_d, p, m, lo, hi, t, percents, tol=1e-10, max_iter=50):
+    """Position ``t`` in [0, 1] where each segment's cubic reaches its percent.
+
+    Safeguarded Newton from the linear estimate: the cubic is monotone on the
+    segment, so the root stays bracketed and a step leaving the bracket falls
+    back to bisection. All samples and percents are solved together.
+    """
+    rows = np.arange(p.shape[0])[:, None]
+    y0, y1 = p[rows, lo], p[rows, hi]
+    h = log_d[hi] - log_d[lo]
+    hm0, hm1 = h * m[rows, lo], h * m[rows, hi]
+    # y(t) = c0 + c1 t + c2 t^2 + c3 t^3 on the segment
+    c0, c1 = y0 - percents, hm0
+    c2 = 3 * (y1 - y0) - 2 * hm0 - hm1
+    c3 = 2 * (y0 - y1) + hm0 + hm1
+    shape = t.shape
+    c0, c1, c2, c3 = (np.ravel(c) for c in (c0, c1, c2, c3))
+    t = np.clip(t.ravel(), 0.0, 1.0)
+    a, b = np.zeros_like(t), np.ones_like(t)
+    active = np.arange(t.size)  # entries still iterating; converged ones drop out
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iter):
+            ti = t[active]
+            k0, k1, k2, k3 = c0[active], c1[active], c2[active], c3[active]
+            f = ((k3 * ti + k2) * ti + k1) * ti + k0
+            below = f < 0
+            ai = np.where(below, ti, a[active])
+            bi = np.where(below, b[active], ti)
+            step = ti - f / ((3 * k3 * ti + 2 * k2) * ti + k1)
+            done = (np.abs(f) < tol) | (bi - ai < tol)
+            t[active] = np.where(done, ti, np.where((step > ai) & (step < bi), step, (ai + bi) / 2))
+            a[active], b[active] = ai, bi
+            active = active[~done]
+            if active.size == 0:
+                break
+    return t.reshape(shape)
+
+
+def passing_at(sizes, passing, size):
+    """% passing on the sieve of the given size, or NaN if it is not in the stack."""
+    match = np.flatnonzero(np.isclose(sizes, size))
+    if match.size == 0:
+        return np.full(passing.shape[0], np.nan)
+    return passing[:, match[0]]
+
+
+def fineness_modulus(passing):
+    return passing.sum(axis=1) / 100
+
+
+def fm_zone(fm):
+    """Aggregate zone for each fineness modulus (same bands as the Sieve Analysis page)."""
+    fm = np.asarray(fm, dtype=float)
+    idx = np.select([fm < 2.5, fm <= 3.0, fm <= 3.5], [0, 1, 2], default=3)
+    return FM_ZONES[idx]
+
+
+def gradation_coefficients(d10, d30, d60):
+    """Uniformity (Cu) and curvature (Cc) coefficients; NaN where undefined."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cu = d60 / d10
+        cc = d30 ** 2 / (d10 * d60)
+    return cu, cc
+
+
+def is_well_graded(cu, cc):
+    return (cu >= 4) & (cc >= 1) & (cc <= 3)
+
+
+def combine(sieve_sizes, sieve_passing, hydrometer_sizes, hydrometer_finer, basis="total"):
+    """Merge a sieve curve and hydrometer readings into one PSD curve.
+
+    Takes one sample: sieve sizes with their % passing, and hydrometer
+    particle diameters (mm) with % finer. ``basis="fines"`` means the
+    hydrometer % finer is relative to the soil passing the finest sieve, as
+    when only that fraction is tested; it is rescaled to the whole sample.
+    Hydrometer points no finer than the finest sieve are dropped (sieving
+    wins where the two overlap). Returns ``(sizes, passing)`` coarse to fine
+    with ``passing`` of shape ``(1, n)``, ready for :func:`grading`.
+    """
+    sizes, passing = sort_sieves(sieve_sizes, np.atleast_2d(np.asarray(sieve_passing, dtype=float)))
+    h_sizes, h_finer = sort_sieves(hydrometer_sizes, np.atleast_2d(np.asarray(hydrometer_finer, dtype=float)))
+    if basis == "fines":
+        h_finer = h_finer * passing[:, -1:] / 100
+    elif basis != "total":
+        raise ValueError(f"Hydrometer basis must be 'total' or 'fines', not {basis!r}")
+    keep = h_sizes < sizes[-1]
+    sizes = np.concatenate([sizes, h_sizes[keep]])
+    passing = np.concatenate([passing, h_finer[:, keep]], axis=1)
+    # Readings are noisy at the join; keep the curve non-increasing within 0-100.
+    passing = np.minimum.accumulate(np.clip(passing, 0.0, 100.0), axis=1)
+    return sizes, passing
+
+
+def grading(sizes, passing, percents=(10, 30, 60), method="linear"):
+    """Dxx sizes and Cu/Cc for curves given as % passing (coarse to fine)."""
+    percents = tuple(percents)
+    keys = sorted(set(percents) | {10, 30, 60})
+    d = dict(zip(keys, percentile_sizes(sizes, passing, keys, method).T))
+    cu, cc = gradation_coefficients(d[10], d[30], d[60])
+    return {"d": {pct: d[pct] for pct in percents}, "cu": cu, "cc": cc}
+
+
+def analyze(sizes, retained, percents=(10, 30, 60), method="linear"):
+    """Full PSD analysis for a batch of samples.
+
+    Returns a dict of arrays: ``sizes``, ``retained``, ``cumulative_retained``
+    and ``passing`` (coarse to fine), ``d`` (``{percent: sizes}``), ``cu``,
+    ``cc``, ``fm``, ``zone`` and ``passing_4_75``.
+    """
+    sizes, retained = sort_sieves(sizes, retained)
+    passing = cumulative_passing(retained)
+    fm = fineness_modulus(passing)
+    return {
+        "sizes": sizes,
+        "retained": retained,
+        "cumulative_retained": np.cumsum(np.nan_to_num(retained), axis=1),
+        "passing": passing,
+        **grading(sizes, passing, percents, method),
+        "fm": fm,
+        "zone": fm_zone(fm),
+        "passing_4_75": passing_at(sizes, passing, 4.75),
+    }
@@ -0,0 +1,85 @@
+"""Rule-based IS soil classification (IS 1498), vectorised over samples.
+
+Inputs are the consistency limits (LL, PL), the % passing the 75 µm and
+4.75 mm sieves, and optionally the uniformity and curvature coefficients for
+clean coarse soils. Organic soils and peat cannot be told apart from these
+inputs and are not returned.
+"""
+import numpy as np
+
+FEATURES = ["ll", "pl", "pi", "fines", "passing_4_75", "cu", "cc"]
+
+
+def _arr(x):
+    return np.asarray(x, dtype=float)
+
+
+def a_line(ll):
+    """PI on the Casagrande A-line for the given liquid limit."""
+    return 0.73 * (_arr(ll) - 20)
+
+
+def u_line(ll):
+    """PI on the Casagrande U-line, the upper limit of natural soils."""
+    return 0.9 * (_arr(ll) - 8)
+
+
+def plasticity_symbol(ll, pi):
+    """'C', 'M' or 'CM' (the hatched CL-ML band) from the plasticity chart."""
+    ll, pi = _arr(ll), _arr(pi)
+    above = pi >= a_line(ll)
+    return np.select([above & (pi > 7), above & (pi >= 4)], ["C", "CM"], default="M")
+
+
+def compressibility_symbol(ll):
+    """'L' (LL < 35), 'I' (35-50) or 'H' (LL > 50)."""
+    ll = _arr(ll)
+    return np.select([ll < 35, ll <= 50], ["L", "I"], default="H")
+
+
+def plasticity_zone(ll, pi):
+    """Fine-soil group read off the plasticity chart (``"CI"``, ``"MH"``, ``"CL-ML"``, ...) for each sample."""
+    ll, pi = np.broadcast_arrays(_arr(ll), _arr(pi))
+    plastic = plasticity_symbol(ll, pi)
+    zone = np.char.add(np.where(plastic == "C", "C", "M"), compressibility_symbol(ll))
+    return np.where(plastic == "CM", "CL-ML", zone)
+
+
+def above_u_line(ll, pi):
+    """Samples plotting above the U-line (usually a testing or recording error)."""
+    return _arr(pi) > u_line(ll)
+
+
+def classify(ll, pl, fines, passing_4_75, cu=np.nan, cc=np.nan):
+    """IS soil group symbol (e.g. ``"CI"``, ``"SW-SM"``) for each sample.
+
+    ``fines`` is % passing 75 µm and ``passing_4_75`` % passing 4.75 mm.
+    Clean coarse soils without a usable Cu/Cc are classed as poorly graded.
+    """
+    ll, pl, fines, p475, cu, cc = np.broadcast_arrays(
+        _arr(ll), _arr(pl), _arr(fines), _arr(passing_4_75), _arr(cu), _arr(cc))
+    pi = np.maximum(ll - pl, 0.0)
+    plastic = plasticity_symbol(ll, pi)
+
+    # Fine-grained: more than half passes 75 µm.
+    fine = plasticity_zone(ll, pi)
+
+    # Coarse-grained: gravel when more than half the coarse fraction stays on 4.75 mm.
+    gravel = (100 - p475) > (100 - fines) / 2
+    prefix = np.where(gravel, "G", "S")
+    well = (cu >= np.where(gravel, 4.0, 6.0)) & (cc >= 1) & (cc <= 3)
+    clean = np.char.add(prefix, np.where(well, "W", "P"))
+    with_fines = np.char.add(prefix, np.where(plastic == "C", "C", "M"))
+    silty_clayey = np.char.add(np.char.add(prefix, "M-"), np.char.add(prefix, "C"))
+    dirty = np.where(plastic == "CM", silty_clayey, with_fines)
+    dual = np.char.add(np.char.add(clean, "-"), with_fines)
+    coarse = np.where(fines < 5, clean, np.where(fines > 12, dirty, dual))
+
+    return np.where(fines > 50, fine, coarse)
+
+
+def feature_matrix(ll, pl, fines, passing_4_75, cu=np.nan, cc=np.nan):
+    """Model features in ``FEATURES`` order; missing Cu/Cc become 0."""
+    ll, pl, fines, p475, cu, cc = np.broadcast_arrays(
+        _arr(ll), _arr(pl), _arr(fines), _arr(passing_4_75), _arr(cu), _arr(cc))
+    return np.column_stack([ll, pl, ll - pl, fines, p475, np.nan_to_num(cu), np.nan_to_num(cc)])
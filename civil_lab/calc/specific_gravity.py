@@ -0,0 +1,32 @@
+"""Specific gravity of cement by the Le Chatelier flask method."""
+import numpy as np
+
+MEDIUM_SG = {"Kerosene": 0.79, "Diesel": 0.83}
+
+
+def specific_gravity(w1, w2, w3, w4, sg_medium):
+    """Specific gravity (g/cc) from the four flask weighings (g).
+
+    ``w1`` empty flask, ``w2`` flask + cement, ``w3`` flask + cement + medium,
+    ``w4`` flask + medium. NaN where the denominator is zero.
+    """
+    w1, w2, w3, w4 = (np.asarray(w, dtype=float) for w in (w1, w2, w3, w4))
+    cement = w2 - w1
+    den = cement - (w3 - w4)
+    num, den = np.broadcast_arrays(cement * np.asarray(sg_medium, dtype=float), den)
+    out = np.full(num.shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+BATCH_COLUMNS = ["w1", "w2", "w3", "w4"]
+
+
+def evaluate(columns, medium="Kerosene"):
+    """Batch specific gravity from a mapping of ``w1``..``w4`` -> array."""
+    missing = [c for c in BATCH_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"Specific gravity is missing columns: {', '.join(missing)}")
+    if medium not in MEDIUM_SG:
+        raise ValueError(f"Unknown medium {medium!r}; expected one of {', '.join(MEDIUM_SG)}")
+    return specific_gravity(*(columns[c] for c in BATCH_COLUMNS), MEDIUM_SG[medium])
@@ -0,0 +1,99 @@
+"""Vectorised strength-of-materials kernels.
+
+Every function accepts scalars or arrays (broadcast against each other) and
+returns a float ndarray. Specimens with a non-positive area or dimension give
+NaN instead of raising, so one bad row does not sink a whole batch.
+"""
+import numpy as np
+
+G = 9.81  # m/s²
+
+
+def _arr(x):
+    return np.asarray(x, dtype=float)
+
+
+def tonnes_to_newtons(tonnes):
+    return _arr(tonnes) * 1000 * G
+
+
+def kg_to_newtons(kg):
+    return _arr(kg) * G
+
+
+def rectangle_area(length, breadth):
+    return _arr(length) * _arr(breadth)
+
+
+def circle_area(radius):
+    radius = _arr(radius)
+    return np.pi * radius * radius
+
+
+def specimen_area(length=np.nan, breadth=np.nan, radius=np.nan):
+    """Cross-section area (mm²): circular where a radius is given, else rectangular."""
+    radius = _arr(radius)
+    use_circle = np.isfinite(radius) & (radius > 0)
+    return np.where(use_circle, circle_area(np.where(use_circle, radius, 0.0)),
+                    rectangle_area(length, breadth))
+
+
+def _safe_divide(num, den):
+    num, den = np.broadcast_arrays(_arr(num), _arr(den))
+    out = np.full(num.shape, np.nan)
+    ok = den > 0
+    np.divide(num, den, out=out, where=ok)
+    return out
+
+
+def compressive_strength(ctm_tonnes, area_mm2):
+    """Compressive strength (N/mm²) from CTM reading (t) and loaded area (mm²)."""
+    return _safe_divide(tonnes_to_newtons(ctm_tonnes), area_mm2)
+
+
+def tensile_strength(load_tonnes, diameter_mm, length_mm):
+    """Split tensile strength (N/mm²) of a cylinder: 2P / (π d l)."""
+    d, l = _arr(diameter_mm), _arr(length_mm)
+    den = np.where((d > 0) & (l > 0), np.pi * d * l, 0.0)
+    return _safe_divide(2 * tonnes_to_newtons(load_tonnes), den)
+
+
+def transverse_strength(load_kg, lever_arm_mm, length_mm, breadth_mm, thickness_mm):
+    """Transverse strength of tile (N/mm²): 3 P f l / (2 b t²)."""
+    b, t = _arr(breadth_mm), _arr(thickness_mm)
+    den = np.where((b > 0) & (t > 0), 2 * b * t * t, 0.0)
+    return _safe_divide(3 * kg_to_newtons(load_kg) * _arr(lever_arm_mm) * _arr(length_mm), den)
+
+
+# Column names expected by batch callers (uploaded sheets, API payloads).
+# For compressive strength either ``radius_mm`` or ``length_mm`` and
+# ``breadth_mm`` may be given per row.
+BATCH_COLUMNS = {
+    "Compressive Strength": ["ctm_tonnes", "length_mm", "breadth_mm", "radius_mm"],
+    "Tensile Strength": ["load_tonnes", "diameter_mm", "length_mm"],
+    "Transverse Strength of Tile": ["load_kg", "lever_arm_mm", "length_mm", "breadth_mm", "thickness_mm"],
+}
+
+
+def evaluate(strength_type, columns):
+    """Strengths for a batch given a mapping of column name -> array.
+
+    Missing optional columns are treated as NaN; rows that cannot be
+    evaluated come back as NaN.
+    """
+    if strength_type not in BATCH_COLUMNS:
+        raise ValueError(f"Unknown test {strength_type!r}; expected one of {', '.join(BATCH_COLUMNS)}")
+    names = BATCH_COLUMNS[strength_type]
+    present = [columns[name] for name in names if name in columns]
+    if not present:
+        raise ValueError(f"No {strength_type} columns found; expected {', '.join(names)}")
+    n = len(np.atleast_1d(present[0]))
+    col = {name: _arr(columns[name]) if name in columns else np.full(n, np.nan) for name in names}
+
+    if strength_type == "Compressive Strength":
+        area = specimen_area(col["length_mm"], col["breadth_mm"], col["radius_mm"])
+        return compressive_strength(col["ctm_tonnes"], area)
+    if strength_type == "Tensile Strength":
+        return tensile_strength(col["load_tonnes"], col["diameter_mm"], col["length_mm"])
+    return transverse_strength(col["load_kg"], col["lever_arm_mm"], col["length_mm"],
+                               col["breadth_mm"], col["thickness_mm"])
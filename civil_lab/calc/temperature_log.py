@@ -0,0 +1,212 @@
+"""Streaming analysis of bitumen apparatus temperature logs.
+
+Automated ring-and-ball (softening point, IS 1205) and Cleveland open cup
+(flash and fire point, IS 1209) apparatus log time, bath or cup temperature
+and events such as a ball touching the base plate or a flash being seen.
+``TemperatureLog`` takes such a log in chunks of arrays and returns one
+summary per run. A file may hold many runs, one after another: a new run
+starts when the run id changes or the clock goes back. Only the current
+run's state is kept (its latest minute mark, rate statistics, events and a
+short, thinned temperature history), so memory does not grow with the
+length of the file.
+
+Events are the apparatus' labels (``""`` for none), recognised by
+``event_codes``; an event counts once when its label first appears, however
+many rows repeat it.
+
+Softening point runs: the softening point is the mean of the temperatures
+at which the two balls drop. The bath should heat at 5 ± 0.5 °C/min after
+the first ``SETTLE_MINUTES``; the rate is measured minute by minute up to
+the second drop, and the two drops should be within ``BALL_SPREAD``.
+
+Flash point runs: the flash and fire points are the temperatures of the
+first flash and of the first fire (sustained burning) event. Over the last
+``FLASH_WINDOW`` °C before the flash the cup should heat at 5-6 °C/min.
+"""
+from collections import deque
+
+import numpy as np
+
+SOFTENING, FLASH = "softening", "flash"
+NONE, BALL, FLASH_EVENT, FIRE = 0, 1, 2, 3
+
+SOFTENING_RATE = (4.5, 5.5)  # °C/min
+SETTLE_MINUTES = 3  # minutes before the softening rate is judged
+BALL_SPREAD = 1.0  # °C between the two ball drops
+FLASH_RATE = (5.0, 6.0)  # °C/min
+FLASH_WINDOW = 28.0  # °C below the flash over which the rate is judged
+HISTORY_STEP = 5.0  # seconds between kept history points
+HISTORY_POINTS = 360  # 30 minutes of history at HISTORY_STEP
+
+
+def event_codes(labels):
+    """Event code of each label: fire, flash, ball (or drop) by substring, else ``NONE``."""
+    labels = np.asarray(labels, dtype=str)
+    codes = np.full(labels.shape, NONE, dtype=np.int64)
+    # Most rows carry no event; only look inside the labels of the rest.
+    at = np.flatnonzero(labels != "")
+    found = {word: np.char.find(np.char.lower(labels[at]), word) >= 0 for word in ("fire", "flash", "ball", "drop")}
+    codes[at] = np.select([found["fire"], found["flash"], found["ball"] | found["drop"]], [FIRE, FLASH_EVENT, BALL],
+                          NONE)
+    return codes
+
+
+class _Run:
+    def __init__(self, run, t, temperature):
+        self.run = run
+        self.start, self.start_temperature = t, temperature
+        self.samples = 0
+        self.last_time, self.last_label = t, ""
+        self.mark = (0, t, temperature)  # (minute, time, temperature) of the latest minute mark
+        self.minutes = self.off = 0
+        self.min_rate, self.max_rate = np.inf, -np.inf
+        self.balls = []  # (time, temperature), first two drops
+        self.flash = self.fire = None
+        self.closed_at = None  # time after which the rate is no longer judged
+        self.history = deque(maxlen=HISTORY_POINTS)  # (time, temperature), one per HISTORY_STEP
+        self.window_rate = np.nan
+
+    def update(self, kind, t, temperature, labels):
+        n = len(t)
+        # Events: count each one where its label first appears.
+        previous = np.concatenate([[self.last_label], labels[:-1]])
+        starts = np.flatnonzero((labels != "") & (labels != previous))
+        codes = np.full(n, NONE)
+        codes[starts] = event_codes(labels[starts])
+        for i in starts:
+            event = (float(t[i]), float(temperature[i]))
+            if codes[i] == BALL and len(self.balls) < 2:
+                self.balls.append(event)
+                if len(self.balls) == 2 and kind == SOFTENING:
+                    self.closed_at = event[0]
+            elif codes[i] == FLASH_EVENT and self.flash is None:
+                self._history(t[:i + 1], temperature[:i + 1])
+                self.flash = event
+                self.window_rate = self._window_rate(event)
+                if kind == FLASH:
+                    self.closed_at = event[0]
+            elif codes[i] == FIRE and self.fire is None:
+                self.fire = event
+        if self.flash is None:
+            self._history(t, temperature)
+        self._minutes(kind, t, temperature)
+        self.samples += n
+        self.last_time, self.last_label = float(t[-1]), labels[-1]
+
+    def _history(self, t, temperature):
+        step = np.floor((t - self.start) / HISTORY_STEP)
+        last = np.floor((self.history[-1][0] - self.start) / HISTORY_STEP) if self.history else -1
+        new = np.flatnonzero(np.r_[step[:1] > last, step[1:] > step[:-1]])
+        self.history.extend(zip(t[new].tolist(), temperature[new].tolist()))
+
+    def _window_rate(self, flash):
+        """Mean heating rate (°C/min) over the last ``FLASH_WINDOW`` °C before the flash (NaN if not logged)."""
+        if not self.history:
+            return np.nan
+        times, temps = np.array(self.history).T
+        target = flash[1] - FLASH_WINDOW
+        below = np.flatnonzero(temps <= target)
+        if not len(below):
+            return np.nan
+        i = below[-1]
+        if i + 1 < len(temps) and temps[i + 1] > temps[i]:
+            at = times[i] + (times[i + 1] - times[i]) * (target - temps[i]) / (temps[i + 1] - temps[i])
+        else:
+            at = times[i]
+        return float(FLASH_WINDOW / (flash[0] - at) * 60) if flash[0] > at else np.nan
+
+    def _minutes(self, kind, t, temperature):
+        """Heating rate between the first samples of consecutive minutes."""
+        minute = np.floor((t - self.start) / 60).astype(np.int64)
+        new = np.flatnonzero(np.r_[minute[:1] > self.mark[0], minute[1:] > minute[:-1]])
+        if not len(new):
+            return
+        m = np.r_[self.mark[0], minute[new]]
+        times, temps = np.r_[self.mark[1], t[new]], np.r_[self.mark[2], temperature[new]]
+        self.mark = (int(m[-1]), float(times[-1]), float(temps[-1]))
+        rates = np.diff(temps) / np.diff(times) * 60
+        judged = m[:-1] >= (SETTLE_MINUTES if kind == SOFTENING else 0)
+        if self.closed_at is not None:
+            judged &= times[1:] <= self.closed_at
+        rates = rates[judged & np.isfinite(rates)]
+        if not len(rates):
+            return
+        low, high = SOFTENING_RATE if kind == SOFTENING else (-np.inf, np.inf)
+        self.minutes += len(rates)
+        self.off += int(np.count_nonzero((rates < low) | (rates > high)))
+        self.min_rate = min(self.min_rate, float(rates.min()))
+        self.max_rate = max(self.max_rate, float(rates.max()))
+
+    def summary(self, kind):
+        out = {"run": self.run, "samples": self.samples, "start_temperature": self.start_temperature,
+               "minutes": (self.last_time - self.start) / 60,
+               "min_rate": self.min_rate if self.minutes else np.nan,
+               "max_rate": self.max_rate if self.minutes else np.nan}
+        if kind == SOFTENING:
+            temps = [temperature for _, temperature in self.balls]
+            out.update({
+                "ball_1": temps[0] if temps else np.nan,
+                "ball_2": temps[1] if len(temps) > 1 else np.nan,
+                "softening_point": float(np.mean(temps)) if len(temps) == 2 else np.nan,
+                "rate_ok": self.off == 0 if self.minutes else None,
+                "off_minutes": self.off,
+                "spread_ok": len(temps) == 2 and abs(temps[0] - temps[1]) <= BALL_SPREAD,
+            })
+        else:
+            out.update({
+                "flash_point": self.flash[1] if self.flash else np.nan,
+                "fire_point": self.fire[1] if self.fire else np.nan,
+                "window_rate": self.window_rate,
+                "rate_ok": (bool(FLASH_RATE[0] <= self.window_rate <= FLASH_RATE[1])
+                            if self.window_rate == self.window_rate else None),
+            })
+        return out
+
+
+class TemperatureLog:
+    """Per-run summaries of a ``SOFTENING`` or ``FLASH`` log, fed chunk by chunk."""
+
+    def __init__(self, kind):
+        if kind not in (SOFTENING, FLASH):
+            raise ValueError(f"Unknown log kind {kind!r}; expected {SOFTENING!r} or {FLASH!r}")
+        self.kind = kind
+        self.runs = 0
+        self._run = None
+
+    def update(self, time_s, temperature, events, runs=None):
+        """Fold in the next chunk; returns the summaries of runs it completed.
+
+        ``events`` are event labels (``""`` for none); ``runs`` are optional run
+        ids (numbers or strings); without them runs are numbered from 1.
+        Rows without a time or temperature are skipped.
+        """
+        t, temperature = np.asarray(time_s, dtype=float), np.asarray(temperature, dtype=float)
+        labels = np.asarray(events, dtype=str)
+        ids = np.zeros(len(t), dtype=np.int64) if runs is None else np.asarray(runs)
+        ok = np.isfinite(t) & np.isfinite(temperature)
+        if not ok.all():
+            t, temperature, labels, ids = t[ok], temperature[ok], labels[ok], ids[ok]
+        if not len(t):
+            return []
+        # Run boundaries: a new id, or the clock going back.
+        boundary = np.r_[False, (ids[1:] != ids[:-1]) | (t[1:] < t[:-1])]
+        if self._run is not None:
+            boundary[0] = (runs is not None and ids[0] != self._run.run) or t[0] < self._run.last_time
+        starts = np.flatnonzero(np.r_[True, boundary[1:]])
+        done = []
+        for a, b in zip(starts, np.r_[starts[1:], len(t)]):
+            if self._run is None or boundary[a]:
+                if self._run is not None:
+                    done.append(self._run.summary(self.kind))
+                self.runs += 1
+                run = ids[a] if runs is not None else self.runs
+                self._run = _Run(run.item() if isinstance(run, np.generic) else run, float(t[a]), float(temperature[a]))
+            self._run.update(self.kind, t[a:b], temperature[a:b], labels[a:b])
+        return done
+
+    def finish(self):
+        """Summaries of the run still open (at most one)."""
+        if self._run is None:
+            return []
+        run, self._run = self._run, None
+        return [run.summary(self.kind)]
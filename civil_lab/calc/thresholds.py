@@ -0,0 +1,103 @@
+"""Declarative threshold tables and the engine that evaluates them.
+
+A ``ThresholdTable`` splits a reading into bands at a list of edges. Each
+edge says which band a reading exactly on it belongs to: ``"above"`` (the
+band starting at the edge, ``x >= edge``) or ``"below"`` (the band ending at
+it, ``x <= edge``). Every band maps to an ``Outcome``.
+
+A ``ThresholdGrid`` does the same for tests judged on two readings at once
+(flash and fire point): each reading is banded on its own axis and the pair
+of band indices looks up the outcome.
+
+Whole arrays are classified with one ``np.searchsorted`` per axis; the
+single-reading UI goes through the same code, so both always agree on the
+boundaries. NaN readings give ``None``.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Outcome(NamedTuple):
+    label: str
+    message: str
+    alert: str = "success"  # Streamlit call used to show the message
+
+
+def _edges(edges):
+    """Edge values adjusted so ``searchsorted(side="right")`` gives the band."""
+    out = []
+    for value, owner in edges:
+        if owner not in ("above", "below"):
+            raise ValueError(f"Edge owner must be 'above' or 'below', not {owner!r}")
+        # A reading equal to a "below" edge must stay in the lower band, so
+        # move that edge up by one ulp.
+        out.append(float(value) if owner == "above" else np.nextafter(float(value), np.inf))
+    out = np.array(out)
+    if np.any(np.diff(out) <= 0):
+        raise ValueError("Threshold edges must be strictly increasing")
+    return out
+
+
+def band_index(edges, values):
+    """Band number for each reading (``-1`` for NaN)."""
+    values = np.asarray(values, dtype=float)
+    idx = np.searchsorted(edges, values, side="right")
+    return np.where(np.isnan(values), -1, idx)
+
+
+class _Lookup:
+    outcomes = ()
+
+    def _pick(self, idx, field):
+        table = np.array([getattr(o, field) for o in self.outcomes] + [None], dtype=object)
+        return table[idx]
+
+    def labels(self, *values):
+        return self._pick(self.outcome_index(*values), "label")
+
+    def messages(self, *values):
+        return self._pick(self.outcome_index(*values), "message")
+
+    def alerts(self, *values):
+        return self._pick(self.outcome_index(*values), "alert")
+
+    def classify(self, *values):
+        """``label``, ``alert`` and ``message`` arrays from a single band lookup."""
+        idx = self.outcome_index(*values)
+        return {field: self._pick(idx, field) for field in ("label", "alert", "message")}
+
+    def classify_one(self, *values):
+        """``Outcome`` for a single reading (or pair of readings), or ``None``."""
+        idx = int(np.asarray(self.outcome_index(*values)).ravel()[0])
+        return None if idx == len(self.outcomes) else self.outcomes[idx]
+
+
+class ThresholdTable(_Lookup):
+    def __init__(self, edges, outcomes):
+        self.edges = _edges(edges)
+        self.outcomes = tuple(outcomes)
+        if len(self.outcomes) != len(self.edges) + 1:
+            raise ValueError(f"{len(self.edges)} edges need {len(self.edges) + 1} outcomes")
+
+    def outcome_index(self, values):
+        """Outcome number for each reading; ``len(outcomes)`` marks NaN."""
+        idx = band_index(self.edges, values)
+        return np.where(idx < 0, len(self.outcomes), idx)
+
+
+class ThresholdGrid(_Lookup):
+    def __init__(self, x_edges, y_edges, grid, outcomes):
+        self.x_edges = _edges(x_edges)
+        self.y_edges = _edges(y_edges)
+        self.grid = np.asarray(grid, dtype=int)
+        self.outcomes = tuple(outcomes)
+        if self.grid.shape != (len(self.x_edges) + 1, len(self.y_edges) + 1):
+            raise ValueError("Grid shape must be (x bands, y bands)")
+
+    def outcome_index(self, x, y):
+        xi = band_index(self.x_edges, x)
+        yi = band_index(self.y_edges, y)
+        missing = (xi < 0) | (yi < 0)
+        idx = self.grid[np.where(missing, 0, xi), np.where(missing, 0, yi)]
+        return np.where(missing, len(self.outcomes), idx)
@@ -0,0 +1,78 @@
+"""Workability inference for fresh concrete tests.
+
+Each test is a declarative threshold table (see ``civil_lab.calc.thresholds``).
+``infer`` classifies one reading for the UI; ``classify`` takes whole arrays.
+"""
+import numpy as np
+
+from civil_lab.calc.thresholds import Outcome, ThresholdTable
+
+TABLES = {
+    "Slump Test": ThresholdTable(
+        edges=[(25, "above"), (50, "above"), (100, "above"), (175, "below")],
+        outcomes=[
+            Outcome("very low", "Inference: The concrete shows **very low workability**, which is typically suitable for road construction or applications requiring very stiff mixes."),
+            Outcome("low", "Inference: The concrete has **low workability**, commonly used in mass concreting where vibration is employed."),
+            Outcome("medium", "Inference: The concrete exhibits **medium workability**, appropriate for normal reinforced concrete placed with light compaction."),
+            Outcome("high", "Inference: The concrete has **high workability**, suitable for sections with heavy reinforcement or complex formwork."),
+            Outcome("check input", "Inference: The slump value entered is unusually high. Please check for input errors or very high fluidity mixes.", "warning"),
+        ],
+    ),
+    "Compaction Factor": ThresholdTable(
+        edges=[(0.75, "above"), (0.85, "above"), (0.95, "above")],
+        outcomes=[
+            Outcome("very low", "Inference: The concrete has **very low workability** and would require intensive compaction. Suitable for dry mixes."),
+            Outcome("low", "Inference: The mix has **low workability** and is best used where mechanical vibration is provided during placing."),
+            Outcome("medium", "Inference: The concrete has **medium workability**, generally workable with hand compaction."),
+            Outcome("high", "Inference: The concrete has **high workability**, ideal for heavily reinforced structures and areas with limited access."),
+        ],
+    ),
+    "Flow Table": ThresholdTable(
+        edges=[(25, "above"), (50, "above"), (100, "above")],
+        outcomes=[
+            Outcome("very low", "Inference: The flow value indicates **very low workability**, suitable only where vibration is possible."),
+            Outcome("low", "Inference: The mix has **low workability**, commonly used for precast sections with controlled compaction."),
+            Outcome("medium", "Inference: The concrete has **medium workability**, applicable for normal structural work."),
+            Outcome("high", "Inference: The concrete shows **high workability**, beneficial in areas with congested reinforcement or complex molds."),
+        ],
+    ),
+    # Vee Bee time falls as workability rises, so the bands run high -> very low.
+    "Vee Bee": ThresholdTable(
+        edges=[(2, "above"), (5, "above"), (10, "below")],
+        outcomes=[
+            Outcome("high", "Inference: The concrete exhibits **high workability**, indicating a fluid mix that flows easily and requires little effort to compact."),
+            Outcome("medium", "Inference: The mix has **medium workability**, usable in reinforced concrete work with moderate reinforcement."),
+            Outcome("low", "Inference: The concrete has **low workability**, where mechanical vibration may be necessary for full compaction."),
+            Outcome("very low", "Inference: The concrete has **very low workability**, typically seen in dry mixes used for pavements or roads."),
+        ],
+    ),
+}
+
+TESTS = list(TABLES)
+
+
+def _table(test_type):
+    if test_type not in TABLES:
+        raise ValueError(f"Unknown workability test: {test_type}")
+    return TABLES[test_type]
+
+
+def infer(test_type, value):
+    """``(alert, message)`` for one reading, as shown on the Workability page."""
+    outcome = _table(test_type).classify_one(value)
+    if outcome is None:
+        raise ValueError("Reading must be a number")
+    return outcome.alert, outcome.message
+
+
+def classify(test_type, values):
+    """Batch classification: dict of ``label``, ``alert`` and ``message`` arrays."""
+    return _table(test_type).classify(np.asarray(values, dtype=float))
+
+
+BATCH_COLUMNS = {test: ["value"] for test in TESTS}
+
+
+def evaluate(test_type, columns):
+    """Batch path: classify a mapping of column -> array (see ``BATCH_COLUMNS``)."""
+    return classify(test_type, columns["value"])
@@ -0,0 +1,225 @@
+"""Chart drawing shared by the Streamlit pages and the batch report.
+
+Charts are drawn on explicit ``Figure`` objects and never touch pyplot:
+pyplot keeps every figure it creates in a process-wide registry until it is
+closed, which in a long-running server means unbounded memory growth (and
+the "more than 20 figures" warning). Create figures with ``new_figure`` and
+hand them to ``to_png`` (or ``release``) when done; both are tracked in
+``civil_lab.memory`` so leaks show up on the operator panel.
+"""
+import functools
+import io
+
+import numpy as np
+from matplotlib import image
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from civil_lab import memory
+from civil_lab.calc import sieve as psd
+from civil_lab.calc import soil_class
+
+HEXBIN_ABOVE = 5000  # plasticity charts with more points are drawn binned
+STAR = dict(marker='*', markersize=14, color='tab:red', linestyle='none')  # highlighted sample
+
+
+def new_figure(**kwargs):
+    """A tracked ``Figure`` (takes the same arguments as ``Figure``)."""
+    fig = Figure(**kwargs)
+    memory.track_figure(fig)
+    return fig
+
+
+def release(fig):
+    """Free a figure's artists and renderer now instead of at the next GC pass."""
+    memory.release_figure(fig)
+    fig.clear()
+    # Drop the Agg canvas (and its pixel buffer) that drawing attached.
+    FigureCanvasBase(fig)
+
+
+def to_png(fig, **kwargs):
+    """Serialise ``fig`` to PNG bytes and release it."""
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format="png", **kwargs)
+    finally:
+        release(fig)
+    return buf.getvalue()
+
+
+def to_layer(fig, ax):
+    """Render ``fig`` once so points can be stamped on it later; releases it.
+
+    Returns ``(pixels, transform, clip, dpi)``: the RGB image, ``ax``'s data
+    to pixel transform, its pixel extent and the resolution. Give the figure a fixed layout
+    (e.g. ``layout="tight"``), as the image is not cropped afterwards.
+    """
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    pixels = np.array(canvas.buffer_rgba())[:, :, :3]
+    layer = pixels, ax.transData.frozen(), ax.bbox.frozen(), fig.dpi
+    release(fig)
+    return layer
+
+
+def layer_png(layer, point=None):
+    """PNG of a ``to_layer`` image, with the ``STAR`` marker at data ``point`` if given and inside the axes.
+
+    Only the marker is composited and the image encoded, so a large chart
+    is not redrawn for every highlighted sample.
+    """
+    pixels, transform, clip, dpi = layer
+    if point is not None:
+        x, y = transform.transform(np.asarray(point, dtype=float))
+        if clip.x0 <= x <= clip.x1 and clip.y0 <= y <= clip.y1:
+            pixels = pixels.copy()
+            sprite = _star(dpi)
+            half = len(sprite) // 2
+            row, col = int(round(len(pixels) - y)) - half, int(round(x)) - half
+            rows = slice(max(row, 0), min(row + len(sprite), len(pixels)))
+            cols = slice(max(col, 0), min(col + len(sprite), pixels.shape[1]))
+            patch = sprite[rows.start - row:rows.stop - row, cols.start - col:cols.stop - col]
+            alpha = patch[:, :, 3:] / 255
+            pixels[rows, cols] = (patch[:, :, :3] * alpha + pixels[rows, cols] * (1 - alpha)).astype(np.uint8)
+    buf = io.BytesIO()
+    image.imsave(buf, pixels, format="png")
+    return buf.getvalue()
+
+
+@functools.lru_cache(maxsize=4)
+def _star(dpi):
+    """RGBA image of the ``STAR`` marker at ``dpi``, on a transparent square."""
+    size = int(STAR["markersize"] * dpi / 72) // 2 * 2 + 5
+    fig = new_figure(figsize=(size / dpi, size / dpi), dpi=dpi)
+    fig.patch.set_alpha(0)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+    ax.set_xlim(-1, 1)
+    ax.set_ylim(-1, 1)
+    ax.plot(0, 0, **STAR)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    sprite = np.array(canvas.buffer_rgba())
+    release(fig)
+    return sprite
+
+
+def psd_curve(ax, sizes, passing, n_sieves=None):
+    """Particle size distribution curve for one sample, coarsest size first.
+
+    When the curve continues below the sieves with hydrometer readings, pass
+    the number of sieve points as ``n_sieves``: the points are then marked by
+    source and joined by a monotone (PCHIP) curve.
+    """
+    sizes, passing = np.asarray(sizes, dtype=float), np.asarray(passing, dtype=float)
+    if n_sieves is None or n_sieves >= len(sizes):
+        ax.plot(sizes, passing, marker='o', linestyle='-')
+    else:
+        # Smooth monotone curve through the merged points.
+        grid = np.geomspace(sizes[-1], sizes[0], 400)
+        ax.plot(grid, psd.interpolate_passing(sizes, passing[None, :], grid, "pchip")[0], linestyle='-')
+        ax.plot(sizes[:n_sieves], passing[:n_sieves], marker='o', linestyle='', label="Sieve")
+        ax.plot(sizes[n_sieves:], passing[n_sieves:], marker='s', linestyle='', label="Hydrometer")
+        ax.legend()
+    ax.set_xscale('log')
+    ax.invert_xaxis()
+    ax.set_xlabel("Sieve Size (mm, log scale)")
+    ax.set_ylabel("% Passing")
+    ax.set_title("Particle Size Distribution Curve")
+    ax.grid(True, which='both')
+
+
+def flow_curve(ax, blows, water_content, liquid_limit, flow_index, at_blows=25):
+    """Casagrande flow curve: trials, the fitted line and the liquid limit at ``at_blows``."""
+    blows, water_content = np.asarray(blows, dtype=float), np.asarray(water_content, dtype=float)
+    ax.plot(blows, water_content, marker='o', linestyle='', label="Trials")
+    valid = blows[blows > 0]
+    if valid.size and np.isfinite([liquid_limit, flow_index]).all():
+        lo, hi = min(valid.min(), at_blows) / 1.5, max(valid.max(), at_blows) * 1.5
+        line = np.geomspace(lo, hi, 50)
+        ax.plot(line, liquid_limit - flow_index * np.log10(line / at_blows), linestyle='-', label="Flow curve")
+        ax.axvline(at_blows, color="grey", linestyle=':')
+        ax.axhline(liquid_limit, color="grey", linestyle=':')
+        ax.annotate(f"LL = {liquid_limit:.2f}%", (at_blows, liquid_limit), xytext=(6, 6),
+                    textcoords="offset points")
+    ax.set_xscale('log')
+    ax.set_xlabel("Number of blows (log scale)")
+    ax.set_ylabel("Water content (%)")
+    ax.set_title("Flow Curve")
+    ax.grid(True, which='both')
+    ax.legend()
+
+
+def trend_lines(ax, series, ylabel, title):
+    """Mean per time bucket for each series, with a band (e.g. ± s.d.) shaded.
+
+    ``series`` maps a legend label to ``(bucket dates, mean, band low, band high)``.
+    """
+    for name, (when, mean, low, high) in series.items():
+        line, = ax.plot(when, mean, marker='o', markersize=3, label=name)
+        ax.fill_between(when, low, high, color=line.get_color(), alpha=0.15, linewidth=0)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=30)
+    ax.grid(True)
+    ax.legend()
+
+
+def load_curve(ax, x, y, peak, failure=None, xlabel="Displacement (mm)", ylabel="Load (kN)", title=None):
+    """A logged test curve (already decimated) with its peak and failure points marked."""
+    ax.plot(x, y, linewidth=1, label="Test")
+    ax.plot(*peak, 'o', color='tab:red', label=f"Peak ({peak[1]:.4g})")
+    if failure is not None:
+        ax.plot(*failure, 'x', color='black', markersize=8, label="Failure")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    if title:
+        ax.set_title(title)
+    ax.grid(True)
+    ax.legend()
+
+
+def plasticity_chart(ax, ll, pi, highlight=None, hexbin_above=HEXBIN_ABOVE, star_legend=False):
+    """Casagrande plasticity chart (IS 1498) with the samples' LL and PI.
+
+    Up to ``hexbin_above`` samples are drawn as points; more are binned into
+    hexagons shaded by count, so the drawing cost and the image size stay
+    flat however many samples there are. ``highlight`` is one ``(LL, PI)``
+    marked on top; ``star_legend`` lists the marker in the legend without
+    drawing it (for a sample stamped on later with ``layer_png``).
+    """
+    ll, pi = np.asarray(ll, dtype=float), np.asarray(pi, dtype=float)
+    top_ll = max(100.0, float(np.nanmax(ll)) if ll.size else 0.0)
+    top_pi = max(60.0, float(np.nanmax(pi)) if pi.size else 0.0)
+    if ll.size > hexbin_above:
+        bins = ax.hexbin(ll, pi, gridsize=50, bins='log', mincnt=1, cmap='viridis',
+                         extent=(0, top_ll, 0, top_pi), linewidths=0)
+        ax.figure.colorbar(bins, ax=ax, label=f"Samples per cell ({ll.size:,} in all)")
+    elif ll.size:
+        ax.scatter(ll, pi, s=8, alpha=0.6, color='tab:blue', linewidths=0, label=f"Samples ({ll.size})")
+
+    x = np.linspace(20, top_ll, 2)
+    ax.plot(x, soil_class.a_line(x), color='black', linewidth=1.2, label="A-line: PI = 0.73 (LL − 20)")
+    x = np.linspace(4 / 0.9 + 8, top_ll, 2)
+    ax.plot(x, soil_class.u_line(x), color='black', linestyle='--', linewidth=1, label="U-line: PI = 0.9 (LL − 8)")
+    # CL-ML band: PI 4 to 7, between the U-line and the A-line.
+    ax.fill_betweenx([4, 7], [4 / 0.9 + 8, 7 / 0.9 + 8], [4 / 0.73 + 20, 7 / 0.73 + 20],
+                     color='grey', alpha=0.3, linewidth=0)
+    for limit in (35, 50):
+        ax.axvline(limit, color='grey', linewidth=0.8, linestyle=':')
+    for text, at in (("CL", (27, 14)), ("CI", (42, 22)), ("CH", (70, 45)), ("ML", (27, 2)),
+                     ("MI", (42, 6)), ("MH", (70, 18))):
+        if at[0] < top_ll and at[1] < top_pi:
+            ax.text(*at, text, fontsize=10, fontweight='bold', color='dimgrey', ha='center',
+                    bbox=dict(facecolor='white', alpha=0.6, linewidth=0))
+    if highlight is not None or star_legend:
+        ax.plot(*(([], []) if highlight is None else highlight), **STAR, label="This sample")
+    ax.set_xlim(0, top_ll)
+    ax.set_ylim(0, top_pi)
+    ax.set_xlabel("Liquid limit, LL (%)")
+    ax.set_ylabel("Plasticity index, PI (%)")
+    ax.set_title("Plasticity Chart")
+    ax.grid(True, alpha=0.4)
+    ax.legend(loc='upper left', fontsize=8)
@@ -0,0 +1,145 @@
+"""Pre-trained IS soil group classifier.
+
+A decision tree over LL, PL, PI, % passing 75 µm and 4.75 mm, Cu and Cc is
+trained offline and pickled to ``models/soil_group_tree.joblib``. The app and
+the API only ever load it; loading happens once per process.
+
+By default the training set is synthesised by labelling random samples with
+the IS 1498 rules in ``civil_lab.calc.soil_class``; pass ``--csv`` to train
+on a register of lab-classified samples instead (columns ``ll``, ``pl``,
+``fines``, ``passing_4_75``, optional ``cu``/``cc`` and ``group``).
+
+    python -m civil_lab.classifier train [--samples 200000] [--csv FILE]
+"""
+import argparse
+import functools
+import os
+import sys
+
+import numpy as np
+
+from civil_lab.calc import soil_class
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "models", "soil_group_tree.joblib")
+
+
+def synthetic_samples(n, seed=0):
+    """Random but physically plausible samples covering every IS group."""
+    rng = np.random.default_rng(seed)
+    ll = rng.uniform(15, 90, n)
+    pi = np.clip(rng.normal(0.73 * (ll - 20), 10), 0, None)
+    pi = np.minimum(pi, 0.9 * (ll - 8))  # stay left of the U-line
+    pl = ll - np.clip(pi, 0, None)
+    fines = rng.uniform(0, 100, n)
+    passing_4_75 = rng.uniform(fines, 100)
+    cu = np.where(rng.random(n) < 0.2, np.nan, rng.lognormal(1.6, 0.6, n))
+    cc = np.where(np.isnan(cu), np.nan, rng.lognormal(0.5, 0.5, n))
+    return {"ll": ll, "pl": pl, "fines": fines, "passing_4_75": passing_4_75, "cu": cu, "cc": cc}
+
+
+def train(samples, labels=None, max_depth=None, seed=0):
+    """Fit the tree; labels default to the rule-based classification."""
+    from sklearn.preprocessing import LabelEncoder
+    from sklearn.tree import DecisionTreeClassifier
+
+    if labels is None:
+        labels = soil_class.classify(**samples)
+    X = soil_class.feature_matrix(**samples)
+    encoder = LabelEncoder().fit(labels)
+    model = DecisionTreeClassifier(max_depth=max_depth, min_samples_leaf=2, random_state=seed)
+    model.fit(X, encoder.transform(labels))
+    return {"model": model, "encoder": encoder, "features": soil_class.FEATURES}
+
+
+def save(bundle, path=MODEL_PATH):
+    import joblib
+    import sklearn
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump({**bundle, "sklearn_version": sklearn.__version__}, path, compress=3)
+
+
+def load(path=MODEL_PATH):
+    """Load a saved bundle, or ``None`` if it is missing or unreadable."""
+    import joblib
+
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def default_model():
+    """The bundle at ``MODEL_PATH``, loaded once per process."""
+    return load()
+
+
+def predict(bundle, ll, pl, fines, passing_4_75, cu=np.nan, cc=np.nan):
+    """Predicted IS group symbol for each sample."""
+    X = soil_class.feature_matrix(ll, pl, fines, passing_4_75, cu, cc)
+    return bundle["encoder"].inverse_transform(bundle["model"].predict(X))
+
+
+BATCH_COLUMNS = ["ll", "pl", "fines", "passing_4_75", "cu", "cc"]
+
+
+def classify_columns(columns):
+    """Batch path: rule-based and model groups from a mapping of column -> array.
+
+    ``cu`` and ``cc`` are optional. ``model_group`` is ``None`` per row when
+    no trained model is available.
+    """
+    missing = [c for c in BATCH_COLUMNS[:4] if c not in columns]
+    if missing:
+        raise ValueError(f"Soil group is missing columns: {', '.join(missing)}")
+    args = [np.asarray(columns[c], dtype=float) for c in BATCH_COLUMNS[:4]]
+    args += [np.asarray(columns.get(c, np.nan), dtype=float) for c in BATCH_COLUMNS[4:]]
+    result = {"rule_group": soil_class.classify(*args)}
+    bundle = default_model()
+    if bundle is None:
+        result["model_group"] = np.full(result["rule_group"].shape, None)
+    else:
+        result["model_group"] = predict(bundle, *args)
+    return result
+
+
+def _read_csv(path):
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    samples = {c: df[c].to_numpy(dtype=float) for c in ("ll", "pl", "fines", "passing_4_75")}
+    for c in ("cu", "cc"):
+        samples[c] = df[c].to_numpy(dtype=float) if c in df else np.full(len(df), np.nan)
+    return samples, df["group"].astype(str).to_numpy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the IS soil group classifier.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="train and save the model")
+    p_train.add_argument("--samples", type=int, default=200_000, help="synthetic training samples")
+    p_train.add_argument("--csv", help="train on labelled lab data instead of synthetic samples")
+    p_train.add_argument("--max-depth", type=int, default=None)
+    p_train.add_argument("--out", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    if args.csv:
+        samples, labels = _read_csv(args.csv)
+    else:
+        samples, labels = synthetic_samples(args.samples), None
+    bundle = train(samples, labels, max_depth=args.max_depth)
+    save(bundle, args.out)
+
+    holdout = synthetic_samples(50_000, seed=1)
+    agreement = np.mean(predict(bundle, **holdout) == soil_class.classify(**holdout))
+    print(f"Saved {args.out} ({bundle['model'].get_n_leaves()} leaves, "
+          f"{len(bundle['encoder'].classes_)} groups); agreement with IS rules on hold-out: {agreement:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
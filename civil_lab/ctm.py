@@ -0,0 +1,65 @@
+"""Reading compression-machine (CTM) logs for the strength calculators.
+
+``analyze`` streams a delimited text log (CSV, TSV or semicolon separated)
+through ``calc.ctm_log.LoadLog`` ``logs.CHUNK_ROWS`` rows at a time, so memory
+use does not grow with the length of the log, and returns the peak, failure,
+stress-strain figures and a chart drawn from the decimated curve. It runs as
+a background job (``civil_lab.jobs``) and reports its progress.
+"""
+import numpy as np
+
+from civil_lab import charts, jobs, logs, metrics
+from civil_lab.calc import ctm_log
+from civil_lab.calc import strength as kernels
+
+# Load unit -> kN per unit.
+LOAD_UNITS = {"kN": 1.0, "N": 0.001, "Tonnes": kernels.G}
+DISPLACEMENT_UNITS = {"mm": 1.0, "µm": 0.001}
+
+
+def analyze(content, load_column, displacement_column, load_unit="kN", displacement_unit="mm",
+            area_mm2=None, gauge_length_mm=None, failure_drop=ctm_log.FAILURE_DROP):
+    """Peak, failure and curve of one logged test.
+
+    Loads are converted to kN and displacements to mm. With the loaded area
+    and gauge length the curve is drawn as stress-strain and the secant
+    modulus is included. Returns a dict of plain values plus ``chart`` (PNG).
+    """
+    to_kn, to_mm = LOAD_UNITS[load_unit], DISPLACEMENT_UNITS[displacement_unit]
+    total_rows = logs.total_rows(content)
+    log = ctm_log.LoadLog(failure_drop)
+    with metrics.timed("ctm.read"):
+        for chunk in logs.read_chunks(content, (load_column, displacement_column)):
+            log.update(logs.numbers(chunk, load_column) * to_kn, logs.numbers(chunk, displacement_column) * to_mm)
+            jobs.report_progress(log.samples / total_rows, f"{log.samples:,} samples")
+    out = log.summary()  # ValueError if there were no readings
+    out["peak_tonnes"] = out["peak_load"] / kernels.G
+    index, displacement, load = log.curve.series()
+
+    stress_strain = bool(area_mm2 and gauge_length_mm)
+    if stress_strain:
+        strains, stresses = ctm_log.strain(displacement, gauge_length_mm), ctm_log.stress(load, area_mm2)
+        peak_stress = float(ctm_log.stress(out["peak_load"], area_mm2))
+        # The rising branch: kept points up to the peak sample.
+        rising = np.searchsorted(index, out["peak_index"], side="right")
+        out["peak_stress"] = peak_stress
+        out["strain_at_peak"] = float(ctm_log.strain(out["peak_displacement"], gauge_length_mm))
+        out["secant_modulus"] = ctm_log.secant_modulus(strains[:rising], stresses[:rising], peak_stress)
+
+    with metrics.timed("ctm.chart"):
+        fig = charts.new_figure()
+        ax = fig.subplots()
+        failure = None
+        if out["failure_index"] is not None:
+            failure = (out["failure_displacement"], out["failure_load"])
+        if stress_strain:
+            failure = failure and (float(ctm_log.strain(failure[0], gauge_length_mm)),
+                                   float(ctm_log.stress(failure[1], area_mm2)))
+            charts.load_curve(ax, strains, stresses, (out["strain_at_peak"], out["peak_stress"]), failure,
+                              "Strain", "Stress (N/mm²)", "Stress-Strain Curve")
+        else:
+            charts.load_curve(ax, displacement, load, (out["peak_displacement"], out["peak_load"]), failure,
+                              "Displacement (mm)", "Load (kN)", "Load-Displacement Curve")
+        out["chart"] = charts.to_png(fig, bbox_inches="tight")
+    out["points"] = len(load)
+    return out
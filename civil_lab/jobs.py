@@ -0,0 +1,486 @@
+"""Background jobs on a bounded process pool.
+
+Heavy analyses (sieve curves, chart rendering, batch reports) are submitted
+to a ``JobExecutor`` instead of running on the Streamlit script thread.
+``submit`` returns a ``Job`` handle straight away; the page polls its state
+and progress and picks up the result when it is done.
+
+* The pool has a fixed number of worker processes, and at most
+  ``max_pending`` jobs wait for one; beyond that ``submit`` raises
+  ``QueueFull``.
+* Submitting a function with the same arguments as a job that is still
+  queued or running returns that job's handle instead of starting another.
+* Each job has a time limit (SIGALRM in the worker, then a hard kill of the
+  worker after ``KILL_GRACE`` seconds if it does not stop) and a memory
+  limit (the worker's address space may grow by at most ``memory_mb``).
+  Jobs that lose their worker to another job's kill are re-queued.
+* Job functions report progress with ``report_progress``. Sections they
+  time with ``metrics.timed`` are sent back with the result and recorded in
+  this process, so they show up in the operator panel and ``/metrics``;
+  so are the figures they made and their worker's RSS, counted against the
+  session that submitted them (``memory.record_job``).
+* A ``cache.memoize``d function is looked up in this process's cache first:
+  a hit comes back as an already finished job, and only misses go to the
+  pool, their results being stored back in the cache.
+
+Job functions and their arguments must be picklable: top-level functions
+taking plain values. Workers are started through a fork server (see
+``pool_context``), so they import the functions' modules afresh.
+"""
+import atexit
+import functools
+import hashlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from civil_lab import memory, metrics
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_TIMEOUT = 300.0  # seconds
+DEFAULT_MEMORY_MB = 1024
+KILL_GRACE = 5.0  # seconds past the time limit before the worker is killed
+MAX_FINISHED = 64  # finished jobs kept for their results
+MAX_ATTEMPTS = 2  # runs of a job whose worker died under it
+PROGRESS_INTERVAL = 0.1  # seconds between progress messages from a worker
+
+_MISSING = object()
+
+QUEUED, RUNNING, DONE, FAILED, TIMEOUT, CANCELLED = "queued", "running", "done", "failed", "timeout", "cancelled"
+FINAL = (DONE, FAILED, TIMEOUT, CANCELLED)
+
+
+class JobError(Exception):
+    """A job did not produce a result."""
+
+
+class JobTimeout(JobError):
+    pass
+
+
+class JobMemoryError(JobError):
+    pass
+
+
+class QueueFull(JobError):
+    pass
+
+
+class Job:
+    """Handle to one submitted job; safe to share between threads and sessions."""
+
+    def __init__(self, job_id, key, name, timeout, memory_mb):
+        self.id = job_id
+        self.key = key
+        self.name = name
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.pid = None
+        self.attempts = 0
+        self._value = None
+        self._future = None
+        self._memo = None  # (cache, key) to store the result under
+        self._session = None  # Streamlit session that submitted it, for memory accounting
+        self._done = threading.Event()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes or ``timeout`` seconds pass; returns ``done()``."""
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        """The job's return value; raises ``JobError`` if it failed, timed out or was cancelled."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Job {self.id} is still {self.state}")
+        if self.state != DONE:
+            raise JobTimeout(self.error) if self.state == TIMEOUT else JobError(self.error)
+        return self._value
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "state": self.state, "progress": self.progress,
+                "message": self.message, "error": self.error, "submitted": self.submitted,
+                "elapsed": self.elapsed, "attempts": self.attempts}
+
+
+def pool_context():
+    """Multiprocessing context for worker pools: forkserver where available, else spawn.
+
+    Pools are started from a Streamlit script thread while other sessions'
+    threads run. A plain fork would copy any lock one of them holds at that
+    moment (``metrics._lock``, ``memory._lock``) into the worker, locked for
+    good, and every later job on that worker would hang on it.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        # Workers are forked from a server that has already imported these.
+        context.set_forkserver_preload(["civil_lab.jobs", "civil_lab.charts", "pandas"])
+    return context
+
+
+# ---------------- Worker side ----------------
+
+_events = None  # queue to the parent, set in each worker
+_current = None  # id of the job running in this worker
+_last_progress = 0.0
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the parent
+
+
+def report_progress(fraction, message=""):
+    """Report a running job's progress (0-1). Does nothing outside a job."""
+    global _last_progress
+    if _current is None:
+        return
+    now = time.monotonic()
+    if now - _last_progress < PROGRESS_INTERVAL and fraction < 1:
+        return
+    _last_progress = now
+    _events.put(("progress", _current, min(max(float(fraction), 0.0), 1.0), str(message)))
+
+
+def _address_space():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _limit_memory(extra_bytes):
+    """Let this worker's address space grow by ``extra_bytes``; returns the limit to restore."""
+    if resource is None or not extra_bytes:
+        return None
+    used = _address_space()
+    if used is None:
+        return None
+    previous = resource.getrlimit(resource.RLIMIT_AS)
+    soft = used + extra_bytes
+    if previous[1] != resource.RLIM_INFINITY:
+        soft = min(soft, previous[1])
+    resource.setrlimit(resource.RLIMIT_AS, (soft, previous[1]))
+    return previous
+
+
+def _on_alarm(signum, frame):
+    raise JobTimeout("Job exceeded its time limit")
+
+
+def _run(job_id, fn, args, kwargs, timeout, memory_mb):
+    global _current, _last_progress
+    _current, _last_progress = job_id, 0.0
+    _events.put(("start", job_id, os.getpid(), time.time()))
+    limit = _limit_memory(memory_mb * 2 ** 20 if memory_mb else None)
+    alarm = timeout and hasattr(signal, "setitimer")
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with metrics.collect() as timings, memory.collect() as usage:
+            value = fn(*args, **kwargs)
+        return value, timings, usage
+    except MemoryError:
+        raise JobMemoryError(f"Job exceeded its memory limit of {memory_mb} MB")
+    except JobTimeout:
+        raise JobTimeout(f"Job exceeded its time limit of {timeout:g} s")
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, limit)
+        _current = None
+
+
+# ---------------- Parent side ----------------
+
+def _kill_worker(pid):
+    try:
+        os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    except ProcessLookupError:
+        pass
+
+
+def _job_key(fn, args, kwargs):
+    payload = pickle.dumps((fn.__module__, fn.__qualname__, args, sorted(kwargs.items())), protocol=4)
+    return hashlib.sha1(payload).hexdigest()
+
+
+class JobExecutor:
+    def __init__(self, workers=None, max_pending=None, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._lock = threading.RLock()
+        self._pool = None
+        self._generation = 0  # bumped whenever a pool is started
+        self._jobs = OrderedDict()  # id -> Job, oldest first
+        self._inflight = {}  # key -> unfinished Job
+        self._calls = {}  # id -> (fn, args, kwargs) of unfinished jobs
+        # Jobs wait here rather than in the pool, so the pool only ever holds
+        # as many jobs as it has workers and a waiting job can simply be dropped.
+        self._waiting = deque()
+        self._dispatched = set()  # ids of jobs handed to the pool
+        self._doomed = set()  # ids of jobs stopped before their worker reported in; killed on "start"
+        self._ids = itertools.count(1)
+        self._context = pool_context()
+        self._closed = False
+        threading.Thread(target=self._watch, name="jobs-watch", daemon=True).start()
+
+    def submit(self, fn, *args, timeout=None, memory_mb=None, **kwargs):
+        """Queue ``fn(*args, **kwargs)``; returns its ``Job`` (or the identical one already in flight)."""
+        key = _job_key(fn, args, kwargs)
+        with self._lock:
+            if self._closed:
+                raise JobError("Job executor is shut down")
+            job = self._inflight.get(key)
+            if job is not None:
+                return job
+            memo = getattr(fn, "cache", None)
+            if memo is not None:
+                memo = (memo, fn.key(*args, **kwargs))
+                value = memo[0].lookup(memo[1], _MISSING)
+                if value is not _MISSING:
+                    job = self._new_job(key, fn, timeout, memory_mb)
+                    self._finish(job, DONE, value=value)
+                    self._trim()
+                    return job
+            if len(self._waiting) >= self.max_pending:
+                raise QueueFull("Too many jobs are waiting; try again shortly")
+            job = self._new_job(key, fn, timeout, memory_mb)
+            job._memo = memo
+            job._session = memory.current_session()
+            self._inflight[key] = job
+            self._calls[job.id] = (fn, args, kwargs)
+            self._waiting.append(job)
+            self._dispatch()
+            self._trim()
+        return job
+
+    def get(self, job_id):
+        """The job with this id, or ``None`` once it has been forgotten."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a waiting or running job; returns whether it was still unfinished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.done():
+                return False
+            if job in self._waiting:
+                self._waiting.remove(job)
+                self._finish(job, CANCELLED, error="Job was cancelled")
+            else:
+                self._kill(job, CANCELLED, "Job was cancelled")
+            return True
+
+    def snapshot(self):
+        """State of every known job, newest first."""
+        with self._lock:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            self._waiting.clear()
+            for job in list(self._inflight.values()):
+                self._finish(job, CANCELLED, error="Job executor shut down")
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---- internals ----
+
+    def _new_job(self, key, fn, timeout, memory_mb):
+        job = Job(f"{next(self._ids):06d}-{key[:8]}", key, f"{fn.__module__}.{fn.__qualname__}",
+                  self.timeout if timeout is None else timeout,
+                  self.memory_mb if memory_mb is None else memory_mb)
+        self._jobs[job.id] = job
+        return job
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            # Each pool gets its own event queue: a worker killed while sending
+            # an event leaves the queue's lock held, so the queue is dropped
+            # together with the pool that kill breaks.
+            events = self._context.Queue()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context,
+                                             initializer=_init_worker, initargs=(events,))
+            self._generation += 1
+            threading.Thread(target=self._drain_events, args=(events, self._generation),
+                             name=f"jobs-events-{self._generation}", daemon=True).start()
+        return self._pool
+
+    def _replace_pool(self, generation):
+        """Drop the pool of ``generation`` if it is still the current one (it broke)."""
+        if generation == self._generation and self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False)
+
+    def _dispatch(self):
+        """Hand waiting jobs to the pool while it has idle workers."""
+        while self._waiting and len(self._dispatched) < self.workers and not self._closed:
+            job = self._waiting.popleft()
+            fn, args, kwargs = self._calls[job.id]
+            future = None
+            for _ in range(2):
+                try:
+                    future = self._ensure_pool().submit(_run, job.id, fn, args, kwargs, job.timeout, job.memory_mb)
+                    break
+                except BrokenProcessPool:
+                    self._replace_pool(self._generation)
+                except RuntimeError:  # interpreter shutting down
+                    break
+            if future is None:
+                self._finish(job, FAILED, error="Worker pool could not be started")
+                continue
+            job.started, job.pid = None, None
+            job._future = future
+            self._dispatched.add(job.id)
+            future.add_done_callback(functools.partial(self._done_callback, job, self._generation))
+
+    def _done_callback(self, job, generation, future):
+        with self._lock:
+            self._dispatched.discard(job.id)
+            self._doomed.discard(job.id)
+            if not job.done():
+                self._settle(job, generation, future)
+            self._dispatch()
+
+    def _settle(self, job, generation, future):
+        exc = future.exception()
+        if exc is None:
+            value, timings, usage = future.result()
+            for name, seconds in timings:
+                metrics.record(name, seconds)
+            memory.record_job(job._session, usage)
+            if job._memo is not None:
+                job._memo[0].store(job._memo[1], value)
+            self._finish(job, DONE, value=value)
+        elif isinstance(exc, BrokenProcessPool):
+            # The worker died: killed for another job, or crashed (e.g. out of memory).
+            self._replace_pool(generation)
+            if job.started is not None:
+                job.attempts += 1
+            if job.attempts < MAX_ATTEMPTS and not self._closed:
+                job.state = QUEUED
+                self._waiting.appendleft(job)
+            else:
+                self._finish(job, FAILED, error="Worker process died while running the job")
+        elif isinstance(exc, JobTimeout):
+            self._finish(job, TIMEOUT, error=str(exc))
+        elif isinstance(exc, JobMemoryError):
+            self._finish(job, FAILED, error=str(exc))
+        else:
+            self._finish(job, FAILED, error=f"{type(exc).__name__}: {exc}")
+
+    def _finish(self, job, state, value=None, error=None):
+        job.state, job.error, job._value = state, error, value
+        job.finished = time.time()
+        if state == DONE:
+            job.progress = 1.0
+            if job.started is not None:
+                metrics.record(f"job.{job.name.rsplit('.', 1)[-1]}", job.finished - job.started)
+        if self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+        self._calls.pop(job.id, None)
+        job._done.set()
+
+    def _kill(self, job, state, error):
+        """Stop a running job by killing its worker; other jobs on that pool are re-queued.
+
+        A job handed to the pool whose worker has not reported in yet is
+        withdrawn from the pool if possible, else its worker is killed as
+        soon as the "start" event names it.
+        """
+        pid = job.pid
+        self._finish(job, state, error=error)
+        if pid is not None:
+            _kill_worker(pid)
+        elif job._future is not None and not job._future.cancel():
+            self._doomed.add(job.id)
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done()]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED)]:
+            del self._jobs[job_id]
+
+    def _drain_events(self, events, generation):
+        """Apply the events of the pool of ``generation`` until that pool is gone."""
+        while True:
+            try:
+                event = events.get(timeout=1.0)
+            except queue.Empty:
+                event = None
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                if self._pool is None or generation != self._generation:
+                    return
+                if event is None:
+                    continue
+                if event[0] == "start" and event[1] in self._doomed:
+                    self._doomed.discard(event[1])
+                    _kill_worker(event[2])
+                    continue
+                job = self._jobs.get(event[1])
+                if job is None or job.done():
+                    continue
+                if event[0] == "start":
+                    job.state, job.pid, job.started = RUNNING, event[2], event[3]
+                else:
+                    job.progress, job.message = event[2], event[3]
+
+    def _watch(self):
+        while not self._closed:
+            time.sleep(0.25)
+            now = time.time()
+            with self._lock:
+                for job in list(self._inflight.values()):
+                    if job.state == RUNNING and job.timeout and now - job.started > job.timeout + KILL_GRACE:
+                        self._kill(job, TIMEOUT, f"Job exceeded its time limit of {job.timeout:g} s")
+
+
+@functools.lru_cache(maxsize=1)
+def default_executor():
+    """The process-wide executor (``CIVIL_LAB_JOB_WORKERS`` workers, default CPU count)."""
+    executor = JobExecutor(workers=int(os.environ.get("CIVIL_LAB_JOB_WORKERS") or 0) or None)
+    atexit.register(executor.shutdown)
+    return executor
+
+
+def started_executor():
+    """The process-wide executor if it has been created, else ``None`` (without creating it)."""
+    return default_executor() if default_executor.cache_info().currsize else None
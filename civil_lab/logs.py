@@ -0,0 +1,59 @@
+"""Reading instrument logs (delimited text with a header row) in chunks.
+
+Shared by the CTM and bitumen apparatus log readers. Logs can be far larger
+than any one page needs, so they are only ever read ``chunk_rows`` rows and
+the chosen columns at a time.
+"""
+import io
+
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+
+
+def separator(content):
+    """Comma, tab or semicolon, judged from the header row."""
+    header = content[:content.find(b"\n")] if b"\n" in content else content
+    for sep in (b"\t", b";"):
+        if sep in header and b"," not in header:
+            return sep.decode()
+    return ","
+
+
+def columns(content):
+    """Column names in the log's header row."""
+    try:
+        return [str(c).strip() for c in pd.read_csv(io.BytesIO(content), sep=separator(content), nrows=0).columns]
+    except Exception:
+        raise ValueError("Could not read the log. Upload a CSV or tab-separated text file with a header row.")
+
+
+def guess_column(names, *hints, default=0):
+    """Index of the first column whose name contains one of ``hints`` (else ``default``)."""
+    for i, name in enumerate(names):
+        if any(h in name.lower() for h in hints):
+            return i
+    return default
+
+
+def read_chunks(content, wanted, chunk_rows=CHUNK_ROWS):
+    """DataFrames of the ``wanted`` columns (names as in ``columns``), ``chunk_rows`` rows each."""
+    wanted = set(wanted)
+    reader = pd.read_csv(io.BytesIO(content), sep=separator(content), usecols=lambda c: str(c).strip() in wanted,
+                         chunksize=chunk_rows, skipinitialspace=True)
+    try:
+        for chunk in reader:
+            chunk.columns = [str(c).strip() for c in chunk.columns]
+            yield chunk
+    except (ValueError, pd.errors.ParserError) as e:
+        raise ValueError(f"Could not read the log: {e}")
+
+
+def numbers(chunk, column):
+    """A chunk's column as floats (NaN where it is not a number)."""
+    return pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=float)
+
+
+def total_rows(content):
+    """Rough row count, for progress."""
+    return max(content.count(b"\n"), 1)
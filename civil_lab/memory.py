@@ -0,0 +1,202 @@
+"""Process memory and figure accounting for the operator panel.
+
+Figures made through ``charts.new_figure`` are tracked until they are
+released, so a chart that is never released shows up as a live figure
+instead of as slow memory growth. Each script run also samples the resident
+set size (RSS) before and after, per Streamlit session: the session table
+shows which sessions' reruns grow the process and how many figures each one
+still holds.
+
+Charts drawn by background jobs (``civil_lab.jobs``) are made in worker
+processes. Each job counts the figures it made and samples its worker's RSS,
+and the parent adds them to the submitting session as job figures and job
+peak RSS; worker figures never reach the process-wide live count.
+
+RSS is read from ``/proc`` (Linux); elsewhere only the peak is available.
+"""
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MAX_SESSIONS = 500
+
+_lock = threading.Lock()
+_local = threading.local()
+_figures = weakref.WeakSet()  # figures not yet released
+_sessions = OrderedDict()  # session id -> stats, least recently seen first
+_workers = {"figures_created": 0, "figures_unreleased": 0, "peak_rss": 0}  # reported by finished jobs
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    """Current resident set size of this process, or ``None`` if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def peak_rss_bytes():
+    """Highest resident set size this process has reached, or ``None``."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return None if ctx is None else ctx.session_id
+
+
+def _session(session_id):
+    stats = _sessions.get(session_id)
+    if stats is None:
+        stats = _sessions[session_id] = {"reruns": 0, "last_growth": 0, "max_growth": 0, "peak_rss": 0,
+                                         "figures_created": 0, "figures": weakref.WeakSet(), "last_seen": 0.0,
+                                         "job_figures": 0, "job_peak_rss": 0}
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    _sessions.move_to_end(session_id)
+    return stats
+
+
+# ---------------- Figures ----------------
+
+def track_figure(fig):
+    """Count ``fig`` as live (process-wide and for this session) until released."""
+    session_id = getattr(_local, "session", None)
+    collected = getattr(_local, "collected", None)
+    if collected is not None:
+        collected.append(weakref.ref(fig))
+    with _lock:
+        _figures.add(fig)
+        if session_id is not None:
+            stats = _session(session_id)
+            stats["figures_created"] += 1
+            stats["figures"].add(fig)
+
+
+def release_figure(fig):
+    with _lock:
+        _figures.discard(fig)
+        for stats in _sessions.values():
+            stats["figures"].discard(fig)
+
+
+def live_figures():
+    """Tracked figures not yet released or garbage collected."""
+    with _lock:
+        return len(_figures)
+
+
+def pyplot_figures():
+    """Figures held open by pyplot's global figure manager (0 if pyplot is unused)."""
+    helpers = sys.modules.get("matplotlib._pylab_helpers")
+    return 0 if helpers is None else helpers.Gcf.get_num_fig_managers()
+
+
+# ---------------- Jobs ----------------
+
+@contextmanager
+def collect():
+    """Measure the figures made on this thread and the RSS inside the block.
+
+    Used in worker processes; the dict it yields is filled in on exit and
+    sent back with the job's result for ``record_job``.
+    """
+    outer = getattr(_local, "collected", None)
+    _local.collected = made = []
+    usage = {}
+    before = rss_bytes()
+    try:
+        yield usage
+    finally:
+        _local.collected = outer
+        if outer is not None:
+            outer.extend(made)
+        with _lock:
+            unreleased = sum(1 for ref in made if ref() in _figures)
+        after = rss_bytes()
+        usage.update(figures_created=len(made), figures_unreleased=unreleased, rss=after,
+                     rss_growth=None if None in (before, after) else after - before)
+
+
+def current_session():
+    """Id of the session whose script run this thread is in, or ``None``."""
+    return getattr(_local, "session", None)
+
+
+def record_job(session_id, usage):
+    """Add a finished job's ``collect`` figures to the worker totals and to the session that submitted it."""
+    with _lock:
+        _workers["figures_created"] += usage["figures_created"]
+        _workers["figures_unreleased"] += usage["figures_unreleased"]
+        _workers["peak_rss"] = max(_workers["peak_rss"], usage["rss"] or 0)
+        stats = _sessions.get(session_id)  # not re-created once evicted
+        if stats is not None:
+            stats["job_figures"] += usage["figures_created"]
+            stats["job_peak_rss"] = max(stats["job_peak_rss"], usage["rss"] or 0)
+
+
+# ---------------- Runs ----------------
+
+def start_run():
+    """Sample RSS at the start of a script run on this thread."""
+    _local.session = _session_id()
+    _local.rss = rss_bytes()
+
+
+def finish_run():
+    """Attribute this run's RSS growth to its session."""
+    session_id = getattr(_local, "session", None)
+    before = getattr(_local, "rss", None)
+    _local.session = _local.rss = None
+    if session_id is None:
+        return
+    after = rss_bytes()
+    with _lock:
+        stats = _session(session_id)
+        stats["reruns"] += 1
+        stats["last_seen"] = time.time()
+        if after is not None:
+            stats["peak_rss"] = max(stats["peak_rss"], after)
+            if before is not None:
+                stats["last_growth"] = after - before
+                stats["max_growth"] = max(stats["max_growth"], after - before)
+
+
+def snapshot():
+    """Process totals and one row per recently seen session, most recent first."""
+    with _lock:
+        sessions = [{"session": sid[:8], "reruns": s["reruns"], "last_growth": s["last_growth"],
+                     "max_growth": s["max_growth"], "peak_rss": s["peak_rss"], "live_figures": len(s["figures"]),
+                     "figures_created": s["figures_created"], "job_figures": s["job_figures"],
+                     "job_peak_rss": s["job_peak_rss"], "last_seen": s["last_seen"]}
+                    for sid, s in reversed(_sessions.items())]
+        live = len(_figures)
+        workers = dict(_workers)
+    rss, peak = rss_bytes(), peak_rss_bytes()
+    if rss is not None and peak is not None:
+        peak = max(peak, rss)  # ru_maxrss can lag the current sample
+    return {"rss": rss, "peak_rss": peak, "live_figures": live,
+            "pyplot_figures": pyplot_figures(), "workers": workers, "sessions": sessions}
@@ -0,0 +1,147 @@
+"""Lightweight hot-path instrumentation.
+
+``timed(name)`` works as a context manager or decorator and records the
+elapsed time of a section in two places:
+
+* process-wide totals (count, sum, max per section), shared by every
+  session and exportable in Prometheus text format;
+* the current rerun, when the calling thread has called ``start_run``.
+  Streamlit runs each session's script on its own thread, so per-rerun
+  timings are kept thread-locally.
+
+If the ``CIVIL_LAB_METRICS_LOG`` environment variable names a file, every
+finished rerun is appended to it as one JSON line.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_totals = {}  # section -> [count, sum_s, max_s]
+_local = threading.local()
+
+
+def record(name, seconds):
+    with _lock:
+        entry = _totals.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+    run = getattr(_local, "run", None)
+    if run is not None:
+        run.append((name, seconds))
+
+
+@contextmanager
+def timed(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+@contextmanager
+def collect():
+    """Also collect the timings recorded on this thread inside the block, as ``[(section, seconds), ...]``.
+
+    Used in worker processes, whose timings are sent back with the result.
+    """
+    outer = getattr(_local, "run", None)
+    _local.run = timings = []
+    try:
+        yield timings
+    finally:
+        _local.run = outer
+        if outer is not None:
+            outer.extend(timings)
+
+
+def start_run():
+    """Begin collecting timings for a script run on this thread."""
+    _local.run = []
+    _local.started = time.perf_counter()
+
+
+def run_active():
+    """Whether this thread is collecting timings for a run."""
+    return getattr(_local, "run", None) is not None
+
+
+def finish_run(**labels):
+    """Close the current run; returns its ``[(section, seconds), ...]``.
+
+    The total run time is recorded as the ``rerun`` section.
+    """
+    run = getattr(_local, "run", None)
+    if run is None:
+        return []
+    record("rerun", time.perf_counter() - _local.started)
+    _local.run = None
+
+    path = os.environ.get("CIVIL_LAB_METRICS_LOG")
+    if path:
+        line = {"ts": time.time(), **labels, "timings_ms": {}}
+        for name, seconds in run:
+            line["timings_ms"][name] = line["timings_ms"].get(name, 0.0) + seconds * 1000
+        with _lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line) + "\n")
+    return run
+
+
+def snapshot():
+    """Process-wide totals as ``{section: {"count", "sum_s", "max_s"}}``."""
+    with _lock:
+        return {name: {"count": c, "sum_s": s, "max_s": m} for name, (c, s, m) in sorted(_totals.items())}
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Totals, cache counters and memory gauges in the Prometheus text exposition format."""
+    from civil_lab import cache, memory
+
+    lines = [
+        "# HELP civil_lab_section_seconds Time spent in instrumented sections.",
+        "# TYPE civil_lab_section_seconds summary",
+    ]
+    totals = snapshot()
+    for name, t in totals.items():
+        lines.append(f'civil_lab_section_seconds_count{{section="{_label(name)}"}} {t["count"]}')
+        lines.append(f'civil_lab_section_seconds_sum{{section="{_label(name)}"}} {t["sum_s"]:.6f}')
+    lines += [
+        "# HELP civil_lab_section_seconds_max Slowest observation per section.",
+        "# TYPE civil_lab_section_seconds_max gauge",
+    ]
+    for name, t in totals.items():
+        lines.append(f'civil_lab_section_seconds_max{{section="{_label(name)}"}} {t["max_s"]:.6f}')
+
+    stats = cache.all_stats()
+    for metric, key, kind in (("hits_total", "hits", "counter"), ("misses_total", "misses", "counter"),
+                              ("entries", "size", "gauge")):
+        lines.append(f"# TYPE civil_lab_cache_{metric} {kind}")
+        for name, s in stats.items():
+            lines.append(f'civil_lab_cache_{metric}{{cache="{_label(name)}"}} {s[key]}')
+
+    mem = memory.snapshot()
+    for metric, value, help_text in (
+            ("process_resident_bytes", mem["rss"], "Current resident set size."),
+            ("process_peak_resident_bytes", mem["peak_rss"], "Peak resident set size."),
+            ("worker_peak_resident_bytes", mem["workers"]["peak_rss"] or None,
+             "Peak resident set size reported by background job workers."),
+            ("figures_live", mem["live_figures"], "Tracked figures not yet released."),
+            ("pyplot_figures", mem["pyplot_figures"], "Figures held by pyplot's global manager."),
+            ("sessions_tracked", len(mem["sessions"]), "Sessions in the memory table.")):
+        if value is not None:
+            lines += [f"# HELP civil_lab_{metric} {help_text}", f"# TYPE civil_lab_{metric} gauge",
+                      f"civil_lab_{metric} {value}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,117 @@
+# ---------------- Area Converter ----------------
+import math
+
+import pandas as pd
+import streamlit as st
+
+from civil_lab import metrics
+from civil_lab.calc import area
+
+SHAPES = ["Rectangle", "Triangle", "Circle", "Polygon (coordinates)", "Parcels (CSV upload)"]
+
+# Accepted spellings of the CSV columns.
+CSV_ALIASES = {
+    "parcel": ("parcel", "parcel_id", "plot", "plot_no", "survey_no", "id"),
+    "x": ("x", "easting", "e"),
+    "y": ("y", "northing", "n"),
+}
+
+RESULT_COLUMNS = {"parcel": "Parcel", "vertices": "Vertices", "area_m2": "Area (m²)", "cents": "Cents",
+                  "sq_feet": "Area (ft²)", "acres": "Acres", "hectares": "Hectares"}
+
+
+def _show(area_m2):
+    units = area.convert(area_m2)
+    st.success(f"Area in m²: {area_m2:.2f} m²")
+    st.info(f"Area in cents: {units['cents']:.2f} cents")
+    st.info(f"Area in square feet: {units['sq_feet']:.2f} ft²")
+    st.info(f"Area in acres: {units['acres']:.4f} acres")
+    st.info(f"Area in hectares: {units['hectares']:.4f} ha")
+
+
+def _csv_columns(df):
+    """``parcel``/``x``/``y`` columns of an uploaded layout, matched by name."""
+    names = {str(c).strip().lower(): c for c in df.columns}
+    columns = {}
+    for key, aliases in CSV_ALIASES.items():
+        match = next((names[a] for a in aliases if a in names), None)
+        if match is not None:
+            column = df[match].astype(str) if key == "parcel" else df[match]
+            columns[key] = column.to_numpy()
+    return columns
+
+
+def _parcels(uploaded, unit):
+    with metrics.timed("area.read_csv"):
+        df = pd.read_csv(uploaded)
+    with metrics.timed("area.shoelace"):
+        result = area.evaluate(_csv_columns(df), unit)
+    return pd.DataFrame({label: result[key] for key, label in RESULT_COLUMNS.items()})
+
+
+def render():
+    st.header("Area Calculator and Converter")
+    shape = st.selectbox("Select Shape", SHAPES)
+
+    area_m2 = 0
+
+    with st.form("area_form"):
+        if shape == "Rectangle":
+            length = st.number_input("Enter Length (m)", min_value=0.0)
+            width = st.number_input("Enter Width (m)", min_value=0.0)
+            area_m2 = length * width
+
+        elif shape == "Triangle":
+            base = st.number_input("Enter Base (m)", min_value=0.0)
+            height = st.number_input("Enter Height (m)", min_value=0.0)
+            area_m2 = 0.5 * base * height
+
+        elif shape == "Circle":
+            radius = st.number_input("Enter Radius (m)", min_value=0.0)
+            area_m2 = math.pi * radius ** 2
+
+        elif shape == "Polygon (coordinates)":
+            unit = st.selectbox("Coordinate unit", list(area.COORDINATE_UNITS))
+            vertices = st.text_area("Vertices in traverse order (x, y per line)",
+                                    placeholder="0, 0\n25.4, 0\n25.4, 18.2\n0, 18.2", height=200)
+
+        else:
+            unit = st.selectbox("Coordinate unit", list(area.COORDINATE_UNITS))
+            uploaded = st.file_uploader("Layout CSV with parcel, x (easting) and y (northing) columns", type=["csv"])
+            st.caption("List each parcel's vertices on consecutive rows, in traverse order.")
+        submitted = st.form_submit_button("Convert Area")
+
+    if not submitted:
+        return
+
+    if shape == "Polygon (coordinates)":
+        try:
+            x, y = area.parse_coordinates(vertices)
+            if len(x) < 3:
+                raise ValueError("Enter at least three vertices.")
+            area_m2 = float(area.polygon_areas(x, y)[0]) * area.COORDINATE_UNITS[unit] ** 2
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.caption(f"{len(x)} vertices")
+
+    elif shape == "Parcels (CSV upload)":
+        if uploaded is None:
+            st.error("Upload a layout CSV.")
+            return
+        try:
+            df = _parcels(uploaded, unit)
+        except (ValueError, pd.errors.ParserError) as e:
+            st.error(str(e))
+            return
+        st.subheader(f"{len(df)} parcels")
+        st.dataframe(df, hide_index=True)
+        if df["Area (m²)"].isna().any():
+            st.warning("Parcels with fewer than three vertices have no area.")
+        st.markdown("**Layout total**")
+        _show(float(df["Area (m²)"].sum()))
+        st.download_button("Download Parcel Areas (CSV)", df.to_csv(index=False).encode("utf-8"),
+                           file_name="parcel_areas.csv", mime="text/csv")
+        return
+
+    _show(area_m2)
@@ -0,0 +1,138 @@
+# ---------------- Bitumen Analysis ----------------
+import pandas as pd
+import streamlit as st
+
+from civil_lab import background, bitumen_log, logs, results
+from civil_lab.calc import bitumen
+from civil_lab.calc import temperature_log
+
+NO_RUN_COLUMN = "(none: runs restart the clock)"
+RUN_COLUMNS = {
+    "Softness Test": {"run": "Run", "softening_point": "Softening point (°C)", "ball_1": "Ball 1 (°C)",
+                      "ball_2": "Ball 2 (°C)", "min_rate": "Min rate (°C/min)", "max_rate": "Max rate (°C/min)",
+                      "rate_ok": "Rate within 5 ± 0.5", "spread_ok": "Balls within 1 °C", "label": "Class"},
+    "Flash and Fire Point": {"run": "Run", "flash_point": "Flash point (°C)", "fire_point": "Fire point (°C)",
+                             "window_rate": "Rate before flash (°C/min)", "rate_ok": "Rate within 5-6",
+                             "label": "Class"},
+}
+
+
+def render():
+    st.markdown("""
+    ### 🛠 Bitumen Analysis
+    Select the test you conducted to analyze the properties of bitumen.
+    """)
+
+    test_conducted = st.selectbox(
+        "Select Test Conducted",
+        bitumen.TESTS
+    )
+
+    if test_conducted in bitumen_log.KINDS:
+        mode = st.radio("Input", ["Single Reading", "Apparatus Log"], horizontal=True)
+        if mode == "Apparatus Log":
+            render_log(test_conducted)
+            return
+
+    fire_point = None
+    with st.form("bitumen_form"):
+        if test_conducted == "Ductility":
+            value = st.number_input("Enter the Breaking Length (in cm):", min_value=0.0)
+        elif test_conducted == "Stripping Value":
+            value = st.number_input("Enter Stripping Value (percentage):", min_value=0.0)
+        elif test_conducted == "Softness Test":
+            value = st.number_input("Enter Softness Value (in °C):", min_value=0.0)
+        elif test_conducted == "Flash and Fire Point":
+            value = st.number_input("Enter Flash Point (in °C):", min_value=0.0)
+            fire_point = st.number_input("Enter Fire Point (in °C):", min_value=0.0)
+        submitted = st.form_submit_button("Analyze")
+
+    if submitted:
+        readings = (value,) if fire_point is None else (value, fire_point)
+        outcome = bitumen.TABLES[test_conducted].classify_one(*readings)
+        st.write(outcome.message)
+        results.save(test_conducted, value, label=outcome.label,
+                     inputs=None if fire_point is None else {"flash_point": value, "fire_point": fire_point})
+
+
+def render_log(test_conducted):
+    """Softening, or flash and fire, points of every run in an automated apparatus log."""
+    if test_conducted == "Softness Test":
+        st.markdown("Upload a ring-and-ball log: time, bath temperature and an event column marking each "
+                    "ball touching the base plate. The softening point of each run is the mean of its two "
+                    "ball temperatures; the heating rate is checked minute by minute after the first "
+                    f"{temperature_log.SETTLE_MINUTES} minutes.")
+    else:
+        st.markdown("Upload a Cleveland open cup log: time, cup temperature and an event column marking the "
+                    "flash and the fire (sustained burning). The heating rate is checked over the last "
+                    f"{temperature_log.FLASH_WINDOW:g} °C before the flash.")
+    upload = st.file_uploader("Upload Apparatus Log", type=["csv", "txt", "tsv"])
+    if upload is None:
+        return
+    content = upload.getvalue()
+    try:
+        names = logs.columns(content)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    with st.form("bitumen_log_form"):
+        col1, col2 = st.columns(2)
+        time_column = col1.selectbox("Time column", names, index=logs.guess_column(names, "time", "sec"))
+        time_unit = col2.selectbox("Time unit", list(bitumen_log.TIME_UNITS))
+        temperature_column = col1.selectbox("Temperature column", names, index=logs.guess_column(names, "temp"))
+        event_column = col2.selectbox("Event column", names, index=logs.guess_column(names, "event", "status"))
+        run_column = st.selectbox("Run column", [NO_RUN_COLUMN] + names,
+                                  index=1 + logs.guess_column(names, "run", default=-1))
+        submitted = st.form_submit_button("Analyze Log")
+
+    if submitted:
+        job = background.submit("bitumen_log", bitumen_log.analyze, content, test_conducted, time_column,
+                                temperature_column, event_column, None if run_column == NO_RUN_COLUMN else run_column,
+                                time_unit)
+        if job is None:
+            st.session_state.pop("bitumen_log_request", None)
+            return
+        st.session_state.bitumen_log_request = {"test": test_conducted, "file": upload.name, "saved": False}
+
+    request = st.session_state.get("bitumen_log_request")
+    if request is None or request["test"] != test_conducted:
+        return
+    runs = background.result("bitumen_log", "Reading log...")
+    if runs is None:
+        return
+
+    columns = RUN_COLUMNS[test_conducted]
+    table = pd.DataFrame(runs)
+    st.success(f"{len(runs)} runs read from {request['file']}.")
+    st.dataframe(table[list(columns)].rename(columns=columns).round(2), hide_index=True)
+    value = "softening_point" if test_conducted == "Softness Test" else "flash_point"
+    missing = int(table[value].isna().sum())
+    if missing:
+        what = "both ball drops" if test_conducted == "Softness Test" else "a flash"
+        st.warning(f"{missing} runs have no {what} in the log and were not classified.")
+    off_rate = int(table["rate_ok"].eq(False).sum())  # None: rate not checked
+    if off_rate:
+        st.warning(f"{off_rate} runs were heated outside the specified rate; repeat them.")
+    if test_conducted == "Softness Test":
+        spread = int((table["spread_ok"].eq(False) & table[value].notna()).sum())
+        if spread:
+            st.warning(f"{spread} runs have ball temperatures more than {temperature_log.BALL_SPREAD:g} °C apart; "
+                       "repeat them.")
+
+    # Saved once per analysis: further clicks must not store the runs again.
+    if st.button("Save Results", disabled=request["saved"]) and not request["saved"]:
+        request["saved"] = results.save_many(_log_records(test_conducted, request["file"], runs)) is not None
+
+
+def _log_records(test_conducted, filename, runs):
+    value = "softening_point" if test_conducted == "Softness Test" else "flash_point"
+    for run in runs:
+        if run[value] != run[value]:  # NaN: no event in the log
+            continue
+        inputs = {"log": filename, "run": run["run"]}
+        if test_conducted == "Flash and Fire Point":
+            inputs.update(flash_point=run["flash_point"], fire_point=run["fire_point"])
+        outputs = {k: v for k, v in run.items() if k not in ("run", "label", "message")}
+        yield {"test": test_conducted, "value": run[value], "label": run["label"], "specimen": str(run["run"]),
+               "inputs": inputs, "outputs": outputs}
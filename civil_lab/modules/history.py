@@ -0,0 +1,75 @@
+# ---------------- Results History ----------------
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from civil_lab import background, report, results
+
+PAGE_SIZE = 50
+REPORT_TIMEOUT = 1800  # seconds
+
+
+def render():
+    st.header("Results History")
+    st.markdown("Results saved from the other modules (switch saving on under **Record Results** in the sidebar).")
+
+    db = results.results_store()
+    with st.form("history_search"):
+        col1, col2 = st.columns(2)
+        with col1:
+            project = st.selectbox("Project", ["All"] + db.distinct("project"))
+            specimen = st.text_input("Specimen / Sample ID")
+        with col2:
+            test = st.selectbox("Test", ["All"] + db.distinct("test"))
+            dates = st.date_input("Test date range", value=())
+        applied = st.form_submit_button("Search")
+
+    filters = {
+        "project": None if project == "All" else project,
+        "test": None if test == "All" else test,
+        "specimen": specimen.strip() or None,
+        "since": dates[0] if len(dates) > 0 else None,
+        "until": dates[1] if len(dates) > 1 else None,
+    }
+    # Keyset pages: remember the cursor that opened each page so Previous works.
+    if applied or st.session_state.get("history_filters") != filters:
+        st.session_state.history_filters = filters
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+
+    page = db.query(**filters, limit=PAGE_SIZE, cursor=cursors[-1])
+    total = db.count(**filters)
+    first = (len(cursors) - 1) * PAGE_SIZE
+    st.caption(f"Showing {first + 1 if page['rows'] else 0}-{first + len(page['rows'])} of {total} results")
+
+    df = pd.DataFrame(page["rows"], columns=["id", "tested_on", "project", "specimen", "source", "test", "value",
+                                             "unit", "label", "outputs", "inputs"])
+    st.dataframe(df, hide_index=True)
+
+    col1, col2, _ = st.columns([1, 1, 4])
+    col1.button("Previous", disabled=len(cursors) == 1, on_click=cursors.pop)
+    col2.button("Next", disabled=page["next"] is None, on_click=cursors.append, args=(page["next"],))
+
+    st.download_button("Download Page (CSV)", df.to_csv(index=False).encode("utf-8"),
+                       file_name="results_page.csv", mime="text/csv")
+
+    with st.expander("Batch report (PDF + XLSX)"):
+        st.markdown("Every result matching the filters above: tables per test, plus a chart page for each "
+                    "sieve analysis and liquid limit.")
+        if st.button("Build report"):
+            if background.submit("report", report.build, db.pool.path, filters, timeout=REPORT_TIMEOUT):
+                st.session_state.history_report_filters = filters
+        built = None
+        if st.session_state.get("history_report_filters") == filters:
+            built = background.result("report", "Rendering report pages...")
+        if built:
+            summary, pdf_path, xlsx_path = built
+            st.caption(f"{summary['results']} results, {summary['pages']} pages.")
+            col1, col2, _ = st.columns([1, 1, 2])
+            # The files are only read from disk when a download is clicked.
+            col1.download_button("Download PDF", Path(pdf_path).read_bytes, file_name="civil_lab_report.pdf",
+                                 mime="application/pdf", on_click="ignore")
+            col2.download_button("Download XLSX", Path(xlsx_path).read_bytes, file_name="civil_lab_report.xlsx",
+                                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                 on_click="ignore")
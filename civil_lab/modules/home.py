@@ -0,0 +1,37 @@
+# ---------------- Home ----------------
+import streamlit as st
+
+
+def render():
+    st.markdown("""
+    This web application is designed to assist students, educators, and professionals in performing common civil engineering lab computations and visualizations with ease.
+
+    ### 💡 Features:
+    - Calculate Various Strengths from Applied Load Data
+    - Analyze **Soil Properties** from index limits
+    - Calculate **Consistency Limits** for classification
+    - Calculate **Specific Gravity** of cement using Le Chatlier Apparatus
+    - Perform **Sieve Analysis** and plot **Particle Size Distribution**
+    - Calculate and Convert Area of a plot
+    - Get instant insights and basic soil classification
+
+     ### 🔍 How to Use:
+    1. Select a module from the left sidebar.
+    2. Enter your data in the provided fields.
+    3. View results instantly with charts or classifications.
+    4. Use sample values (if unsure) to try out the modules.
+
+    👉 Explore each section using the dropdown bar above. Happy Testing!  
+    """)
+
+    st.markdown("""
+    <div style="text-align: center; margin-top: 30px;">
+        <a href="mailto:aathiftt@gmail.com?subject=Issue%20Report%20-%20Civil%20Lab%20Web%20App&body=Please%20describe%20the%20issue%20you%20faced%20in%20detail%20below:"
+           style="display: inline-block; padding: 0.6em 1.2em; font-size: 16px; background-color: #ff4b4b; color: white; border-radius: 5px; text-decoration: none;">
+            🐞 Report an Issue
+        </a>
+    </div>
+    <div style="text-align: center; margin-top: 10px; font-size: 14px; color: #ff4b4b;">
+        <p><strong>Note:</strong> This button works only with Android/iOS devices.</p>
+    </div>
+    """, unsafe_allow_html=True)
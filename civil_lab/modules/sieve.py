@@ -0,0 +1,220 @@
+# ---------------- Sieve Analysis ----------------
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from civil_lab import background, cache, charts, metrics, results
+from civil_lab.calc import sieve as psd
+
+
+@cache.memoize(maxsize=256)
+def analyze_sample(sieve_sizes, retained_percents, hydrometer_sizes=(), hydrometer_finer=(), basis="total"):
+    """PSD result, tables and rendered chart (PNG bytes) for one sample.
+
+    With hydrometer readings the gradation (Dxx, Cu, Cc) is read off the
+    merged sieve + hydrometer curve using monotone interpolation.
+    """
+    with metrics.timed("sieve.psd"):
+        result = psd.analyze(sieve_sizes, [retained_percents])
+        curve_sizes, curve_passing = result["sizes"], result["passing"]
+        if hydrometer_sizes:
+            curve_sizes, curve_passing = psd.combine(result["sizes"], result["passing"],
+                                                     hydrometer_sizes, hydrometer_finer, basis)
+            result.update(psd.grading(curve_sizes, curve_passing, method="pchip"))
+
+    with metrics.timed("sieve.dataframe"):
+        df = pd.DataFrame({
+            "Sieve Size (mm)": result["sizes"],
+            "% Retained": result["retained"][0],
+            "Cumulative Retained": result["cumulative_retained"][0],
+            "% Passing": result["passing"][0],
+        })
+        combined = None
+        if hydrometer_sizes:
+            n_sieves = len(result["sizes"])
+            combined = pd.DataFrame({
+                "Particle Size (mm)": curve_sizes,
+                "% Finer": curve_passing[0],
+                "Source": ["Sieve"] * n_sieves + ["Hydrometer"] * (len(curve_sizes) - n_sieves),
+            })
+
+    # Plotting PSD curve
+    with metrics.timed("sieve.figure"):
+        fig = charts.new_figure()
+        n_sieves = len(result["sizes"]) if hydrometer_sizes else None
+        charts.psd_curve(fig.subplots(), curve_sizes, curve_passing[0], n_sieves)
+    with metrics.timed("sieve.savefig"):
+        chart_png = charts.to_png(fig, bbox_inches="tight")
+
+    return result, df, combined, chart_png
+
+
+def _mm(size):
+    # Hydrometer-extended curves reach microns; keep their Dxx readable.
+    return f"{size:.2f}" if size >= 0.1 else f"{size:.4f}"
+
+
+# Starting grids; set st.session_state["sieve_rows"] / ["hydrometer_rows"] to preload others.
+DEFAULT_ROWS = pd.DataFrame({"Sieve": ['4.75 mm', '2.36 mm', '1.18 mm', '600 µm', '300 µm'],
+                             "% Retained": [0.0] * 5})
+EMPTY_HYDROMETER = pd.DataFrame({"Diameter (mm)": pd.Series(dtype=float), "% Finer": pd.Series(dtype=float)})
+HYDROMETER_BASES = {"Whole sample": "total", "Fraction passing the finest sieve": "fines"}
+
+
+def render():
+    st.header("Sieve Analysis and PSD Chart")
+
+    # The whole sample is one form: editing the grid does not rerun anything
+    # until Analyze is pressed.
+    with st.form("sieve_form"):
+        # Select whether it's soil or aggregates
+        material_type = st.selectbox("Select Material Type", ["Soil", "Aggregates"])
+
+        st.subheader("Enter sieve details")
+        st.caption("Add or remove rows for each sieve in the stack.")
+        rows = st.data_editor(
+            st.session_state.get("sieve_rows", DEFAULT_ROWS),
+            num_rows="dynamic",
+            hide_index=True,
+            key="sieve_table",
+            column_config={
+                "Sieve": st.column_config.SelectboxColumn("Sieve", options=psd.SIEVE_LABELS, required=True),
+                "% Retained": st.column_config.NumberColumn("% Retained", min_value=0.0, max_value=100.0,
+                                                            default=0.0, required=True),
+            },
+        )
+
+        with st.expander("Hydrometer readings (optional, soil)"):
+            st.caption("Particle diameter and % finer from the hydrometer test, merged with the sieve "
+                       "curve below the finest sieve.")
+            basis = st.selectbox("% finer is relative to", list(HYDROMETER_BASES))
+            hydrometer = st.data_editor(
+                st.session_state.get("hydrometer_rows", EMPTY_HYDROMETER),
+                num_rows="dynamic",
+                hide_index=True,
+                key="hydrometer_table",
+                column_config={
+                    "Diameter (mm)": st.column_config.NumberColumn("Diameter (mm)", min_value=0.0, format="%.4f"),
+                    "% Finer": st.column_config.NumberColumn("% Finer", min_value=0.0, max_value=100.0),
+                },
+            )
+        submitted = st.form_submit_button("Analyze")
+
+    if submitted:
+        rows = rows.dropna()
+        if len(rows) < 2:
+            st.error("Enter at least two sieves.")
+            return
+        if rows["Sieve"].duplicated().any():
+            st.error("Each sieve can appear only once in the stack.")
+            return
+        hydrometer = hydrometer.dropna()
+        hydrometer = hydrometer[hydrometer["Diameter (mm)"] > 0]
+        if hydrometer["Diameter (mm)"].duplicated().any():
+            st.error("Each hydrometer diameter can appear only once.")
+            return
+        sieve_sizes = [psd.SIEVE_BY_LABEL[label] for label in rows["Sieve"]]
+        retained_percents = [float(r) for r in rows["% Retained"]]
+
+        # Sort before hashing so the same stack entered in any order hits the cache.
+        pairs = sorted(zip(sieve_sizes, retained_percents), reverse=True)
+        readings = sorted(zip(hydrometer["Diameter (mm)"].astype(float), hydrometer["% Finer"].astype(float)),
+                          reverse=True)
+        # Interpolation and the chart run in a worker process unless this
+        # sample is already in the cache; the output below is shown (and
+        # saved, once) when the job is done.
+        job = background.submit("sieve", analyze_sample, tuple(p[0] for p in pairs), tuple(p[1] for p in pairs),
+                                 tuple(r[0] for r in readings), tuple(r[1] for r in readings),
+                                 HYDROMETER_BASES[basis])
+        if job is None:
+            st.session_state.pop("sieve_request", None)
+            return
+        st.session_state.sieve_request = {"material_type": material_type, "pairs": pairs, "readings": readings,
+                                          "basis": basis, "saved": False}
+
+    request = st.session_state.get("sieve_request")
+    if request is None:
+        return
+    output = background.result("sieve", "Analysing sample...")
+    if output is None:
+        return
+    result, df, combined, chart_png = output
+    material_type, pairs, readings, basis = (request[k] for k in ("material_type", "pairs", "readings", "basis"))
+
+    with metrics.timed("sieve.output"):
+        st.subheader("Sieve Analysis Table")
+        st.dataframe(df)
+        if combined is not None:
+            st.subheader("Combined Particle Size Distribution")
+            st.dataframe(combined)
+        st.image(chart_png)
+
+    label = "Soil" if material_type == "Soil" else "Aggregates"
+    percent_passing_4_75 = result["passing_4_75"][0]
+    D10, D30, D60 = (float(result["d"][pct][0]) for pct in (10, 30, 60))
+    gradation_known = np.isfinite([D10, D30, D60]).all()
+    if gradation_known:
+        Cu = round(float(result["cu"][0]), 2)
+        Cc = round(float(result["cc"][0]), 2)
+
+    # Classification as fine or coarse
+    if not np.isnan(percent_passing_4_75):
+        verb = "appears to be" if material_type == "Soil" else "appear to be"
+        if percent_passing_4_75 > 50:
+            st.info(f"{label} {verb} fine-grained (more than 50% passing through 4.75 mm sieve).")
+        else:
+            st.info(f"{label} {verb} coarse-grained (less than 50% passing through 4.75 mm sieve).")
+    else:
+        kind = "soil type" if material_type == "Soil" else "material type"
+        st.warning(f"4.75 mm sieve not included in input. Cannot determine basic {kind}.")
+
+    if material_type == "Soil":
+        # Gradation parameters
+        if gradation_known:
+            st.subheader("Soil Gradation Parameters")
+            st.markdown(f"- D10 (Effective Size): **{_mm(D10)} mm**")
+            st.markdown(f"- D30: **{_mm(D30)} mm**")
+            st.markdown(f"- D60: **{_mm(D60)} mm**")
+            st.markdown(f"- Uniformity Coefficient (Cu): **{Cu}**")
+            st.markdown(f"- Coefficient of Curvature (Cc): **{Cc}**")
+
+            if psd.is_well_graded(Cu, Cc):
+                st.info("Soil appears to be well graded.")
+            else:
+                st.info("Soil appears to be poorly graded.")
+        else:
+            st.warning("Not enough data to calculate D10, D30, D60. Ensure data covers relevant passing percentages.")
+
+    elif material_type == "Aggregates":
+        # Fineness Modulus (FM)
+        st.subheader("Fineness Modulus Calculation")
+        st.markdown(f"- Fineness Modulus (FM): **{result['fm'][0]:.2f}**")
+        st.markdown(f"- Aggregate Zone: **{result['zone'][0]}**")
+
+        # Gradation parameters for aggregates
+        if gradation_known:
+            st.subheader("Grain Size Parameters")
+            st.markdown(f"- D10 (Effective Size): **{_mm(D10)} mm**")
+            st.markdown(f"- D30: **{_mm(D30)} mm**")
+            st.markdown(f"- D60: **{_mm(D60)} mm**")
+
+            st.subheader("Uniformity and Curvature Coefficients")
+            st.markdown(f"- Uniformity Coefficient : **{Cu}**")
+            st.markdown(f"- Coefficient of Curvature : **{Cc}**")
+        else:
+            st.warning("Not enough data to calculate D10, D30, D60 for aggregates.")
+
+    if request["saved"]:
+        return
+    request["saved"] = True
+    fm = float(result["fm"][0])
+    results.save(
+        "Sieve Analysis",
+        value=fm if material_type == "Aggregates" else None,
+        label=result["zone"][0] if material_type == "Aggregates" else None,
+        inputs={"material": material_type, "sizes_mm": [p[0] for p in pairs], "retained": [p[1] for p in pairs],
+                "hydrometer": [list(r) for r in readings] or None,
+                "hydrometer_basis": HYDROMETER_BASES[basis] if readings else None},
+        outputs={"D10": D10, "D30": D30, "D60": D60, "Cu": result["cu"][0], "Cc": result["cc"][0], "FM": fm,
+                 "zone": result["zone"][0], "passing_4_75": percent_passing_4_75},
+    )
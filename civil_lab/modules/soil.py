@@ -0,0 +1,201 @@
+# ---------------- Soil Classification ----------------
+import numpy as np
+import streamlit as st
+
+from civil_lab import cache, charts, classifier, metrics, results
+from civil_lab.calc import consistency, soil_class
+
+# Saved results whose inputs carry a liquid and plastic limit.
+PLASTICITY_TESTS = ("Indices", "Soil Group")
+ALL_PROJECTS = "All projects"
+
+
+def render():
+    st.header("Soil Classification Tools")
+
+    consistency_option = st.selectbox("Choose Consistency Limit Type", ["None", "Liquid Limit", "Plastic Limit", "Shrinkage Limit"])
+
+    liquid_limit = plastic_limit = shrinkage_limit = None
+
+    if consistency_option == "Liquid Limit":
+        st.subheader("Liquid Limit - Casagrande Method")
+        st.markdown("**Description:** The Casagrande method determines the moisture content at which soil changes from plastic to liquid state.")
+
+        st.markdown("Enter two or more trials; the liquid limit is read off the least-squares flow curve at 25 blows.")
+        num_trials = st.number_input("Number of trials", min_value=2, max_value=10, value=2, step=1, key="ll_trials")
+
+        masses, blows = [], []
+        with st.form("liquid_limit_form"):
+            for i in range(1, int(num_trials) + 1):
+                st.markdown(f"### Sample {i}")
+                m1 = st.number_input(f"Sample {i} - Mass of container (g)", key=f"ll_m1_{i}")
+                m2 = st.number_input(f"Sample {i} - Mass of container + wet soil (g)", key=f"ll_m2_{i}")
+                m3 = st.number_input(f"Sample {i} - Mass of container + dry soil (g)", key=f"ll_m3_{i}")
+                n = st.number_input(f"Sample {i} - Number of blows", key=f"ll_n{i}")
+                masses.append((m1, m2, m3))
+                blows.append(n)
+            submitted = st.form_submit_button("Calculate Liquid Limit")
+
+        if submitted:
+            m1s, m2s, m3s = zip(*masses)
+            water = consistency.water_content(m1s, m2s, m3s)
+            liquid_limit, flow_index, _ = consistency.flow_curve(water, blows)
+            liquid_limit, flow_index = float(liquid_limit[0]), float(flow_index[0])
+
+            if np.isfinite(water).all() and np.isfinite([liquid_limit, flow_index]).all():
+                for i, w in enumerate(water, start=1):
+                    st.success(f"Water content Sample {i} = {w:.2f}%")
+                st.success(f"Liquid Limit = {liquid_limit:.2f}%")
+                st.success(f"Flow Index = {flow_index:.2f}")
+                results.save("Liquid Limit", liquid_limit, "%",
+                             inputs={"masses_g": masses, "blows": blows},
+                             outputs={"water_content": water, "flow_index": flow_index})
+            else:
+                st.error("Check that none of the denominators are zero, the blow counts differ between "
+                         "samples and all values are entered correctly.")
+
+    elif consistency_option == "Plastic Limit":
+        st.subheader("Plastic Limit")
+        st.markdown("**Description:** The plastic limit is the water content at which soil changes from plastic to semi-solid state.")
+
+        with st.form("plastic_limit_form"):
+            m1 = st.number_input("Mass of container (g)", key="pl_m1")
+            m2 = st.number_input("Mass of container + wet soil (g)", key="pl_m2")
+            m3 = st.number_input("Mass of container + dry soil (g)", key="pl_m3")
+            submitted = st.form_submit_button("Calculate Plastic Limit")
+
+        if submitted:
+            plastic_limit = float(consistency.plastic_limit(m1, m2, m3))
+            if np.isfinite(plastic_limit):
+                st.success(f"Plastic Limit = {plastic_limit:.2f}%")
+                results.save("Plastic Limit", plastic_limit, "%", inputs={"m1": m1, "m2": m2, "m3": m3})
+            else:
+                st.error("Invalid input values.")
+
+    elif consistency_option == "Shrinkage Limit":
+        st.subheader("Shrinkage Limit")
+        st.markdown("**Description:** The shrinkage limit is the maximum water content at which a reduction in water content does not cause a decrease in the volume of a soil sample.")
+
+        with st.form("shrinkage_limit_form"):
+            m1 = st.number_input("Mass of shrinkage dish (g)", key="sl_m1")
+            m2 = st.number_input("Mass of shrinkage dish + wet soil (g)", key="sl_m2")
+            m3 = st.number_input("Mass of shrinkage dish + dry soil (g)", key="sl_m3")
+            mercury_dish = st.number_input("Mass of dish filled with mercury (g)", key="sl_mercury_dish")
+            mercury_displaced = st.number_input("Weight of mercury after displacement (g)", key="sl_mercury_disp")
+            submitted = st.form_submit_button("Calculate Shrinkage Limit")
+
+        if submitted:
+            shrinkage_limit = float(consistency.shrinkage_limit(m1, m2, m3, mercury_dish, mercury_displaced))
+            if np.isfinite(shrinkage_limit):
+                st.success(f"Shrinkage Limit = {shrinkage_limit:.2f}%")
+                results.save("Shrinkage Limit", shrinkage_limit, "%",
+                             inputs={"m1": m1, "m2": m2, "m3": m3, "mercury_dish": mercury_dish,
+                                     "mercury_displaced": mercury_displaced})
+            else:
+                st.error("Invalid input values.")
+
+    # ---------------- Additional Indices ----------------
+    st.subheader("Calculate Other Indices")
+    st.markdown("Please input the values for Liquid Limit (LL), Plastic Limit (PL), Shrinkage Limit (SL), and Natural Water Content (WC) to calculate the indices:")
+
+    # One form for both sections: the soil group uses the LL and PL entered here.
+    with st.form("indices_form"):
+        LL = st.number_input("Enter Liquid Limit (LL) (%)", min_value=0.0)
+        PL = st.number_input("Enter Plastic Limit (PL) (%)", min_value=0.0)
+        SL = st.number_input("Enter Shrinkage Limit (SL) (%)", min_value=0.0)
+        WC = st.number_input("Enter Natural Water Content (WC) (%)", min_value=0.0)
+
+        if st.form_submit_button("Calculate Indices"):
+            if LL <= PL:
+                st.error("Liquid Limit must be greater than Plastic Limit.")
+            else:
+                result = consistency.indices(LL, PL, SL, WC)
+                PI, LI, CI, SI = (float(result[k]) for k in ("pi", "li", "ci", "si"))
+
+                st.success(f"Plasticity Index (PI) = {PI:.2f}")
+                st.success(f"Liquidity Index (LI) = {LI:.2f}")
+                st.success(f"Consistency Index (CI) = {CI:.2f}")
+                st.success(f"Shrinkage Index (SI) = {SI:.2f}")
+                results.save("Indices", PI, inputs={"ll": LL, "pl": PL, "sl": SL, "wc": WC},
+                             outputs={"pi": PI, "li": LI, "ci": CI, "si": SI})
+
+        # ---------------- IS Soil Group ----------------
+        st.subheader("Predict IS Soil Group")
+        st.markdown("Uses the Liquid Limit and Plastic Limit entered above together with the gradation below.")
+
+        fines = st.number_input("% Passing 75 µm sieve", min_value=0.0, max_value=100.0, value=0.0)
+        passing_4_75 = st.number_input("% Passing 4.75 mm sieve", min_value=0.0, max_value=100.0, value=100.0)
+        cu = st.number_input("Uniformity Coefficient (Cu), 0 if unknown", min_value=0.0)
+        cc = st.number_input("Coefficient of Curvature (Cc), 0 if unknown", min_value=0.0)
+
+        if st.form_submit_button("Predict Soil Group"):
+            if passing_4_75 < fines:
+                st.error("% passing 4.75 mm cannot be less than % passing 75 µm.")
+            else:
+                rule_group = soil_class.classify(LL, PL, fines, passing_4_75, cu or np.nan, cc or np.nan)[()]
+                bundle = soil_model()
+                if bundle is None:
+                    st.warning("Trained model not found; showing the IS rule-based classification only.")
+                else:
+                    model_group = classifier.predict(bundle, LL, PL, fines, passing_4_75, cu or np.nan, cc or np.nan)[0]
+                    st.success(f"Predicted Soil Group (model) = {model_group}")
+                st.info(f"IS 1498 rule-based group = {rule_group}")
+                results.save("Soil Group", label=rule_group,
+                             inputs={"ll": LL, "pl": PL, "fines": fines, "passing_4_75": passing_4_75,
+                                     "cu": cu or None, "cc": cc or None},
+                             outputs={"model_group": None if bundle is None else model_group})
+
+    # ---------------- Plasticity Chart ----------------
+    st.subheader("Plasticity Chart")
+    render_plasticity_chart((LL, LL - PL) if LL > PL else None)
+
+
+def render_plasticity_chart(highlight=None):
+    """LL against PI of every saved sample, with the IS 1498 zones."""
+    st.markdown("Liquid limit and plasticity index of the saved **Indices** and **Soil Group** results. "
+                "The sample entered above is marked with a star.")
+    db = results.results_store()
+    col1, col2 = st.columns(2)
+    project = col1.selectbox("Samples from", [ALL_PROJECTS] + db.distinct("project"), key="plasticity_project")
+    hexbin_above = col2.number_input("Bin the chart above this many samples", min_value=0,
+                                     value=charts.HEXBIN_ABOVE, step=1000, key="plasticity_bin_above")
+    project = None if project == ALL_PROJECTS else project
+    # Grows whenever an Indices or Soil Group result is saved (in any project),
+    # so the cached chart is redrawn.
+    version = db.last_id(PLASTICITY_TESTS)
+    with metrics.timed("soil.plasticity_chart"):
+        layer, zones, above_u = plasticity_chart(project, version, int(hexbin_above), highlight is not None)
+        # The saved samples are drawn once per version; only the marker is added per entry.
+        png = charts.layer_png(layer, highlight)
+    st.image(png)
+    if zones:
+        total = sum(zones.values())
+        st.dataframe([{"Zone": zone, "Samples": n, "Share (%)": round(100 * n / total, 1)}
+                      for zone, n in sorted(zones.items(), key=lambda kv: -kv[1])], hide_index=True)
+    if above_u:
+        st.warning(f"{above_u} samples plot above the U-line; check their limits.")
+
+
+@cache.memoize(maxsize=16)
+def plasticity_chart(project, version, hexbin_above, star_legend=False):
+    """Chart layer (``charts.to_layer``), samples per zone and the number above the U-line.
+
+    ``version`` tracks the saved results; ``star_legend`` lists the
+    highlighted sample's marker in the legend.
+    """
+    rows = results.results_store().input_values(PLASTICITY_TESTS, ("ll", "pl"), project)
+    limits = np.array(rows, dtype=float).reshape(-1, 2)
+    ll, pi = limits[:, 0], limits[:, 0] - limits[:, 1]
+    keep = np.isfinite(pi) & (pi >= 0)
+    ll, pi = ll[keep], pi[keep]
+    zones, counts = np.unique(soil_class.plasticity_zone(ll, pi), return_counts=True)
+    fig = charts.new_figure(figsize=(8, 5.5), layout="tight")
+    ax = fig.subplots()
+    charts.plasticity_chart(ax, ll, pi, hexbin_above=hexbin_above, star_legend=star_legend)
+    layer = charts.to_layer(fig, ax)
+    return layer, dict(zip(zones.tolist(), counts.tolist())), int(soil_class.above_u_line(ll, pi).sum())
+
+
+@st.cache_resource
+def soil_model():
+    return classifier.load()
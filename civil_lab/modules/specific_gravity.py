@@ -0,0 +1,31 @@
+# ---------------- Specific Gravity of Cement ----------------
+import math
+
+import streamlit as st
+
+from civil_lab import results
+from civil_lab.calc.specific_gravity import MEDIUM_SG, specific_gravity
+
+
+def render():
+    st.header("Specific Gravity of Cement")
+    st.markdown("All weights must be entered in grams (g). Result unit: g/cc")
+
+    with st.form("specific_gravity_form"):
+        medium = st.selectbox("Select Medium", list(MEDIUM_SG))
+        sg_medium = MEDIUM_SG[medium]
+
+        w1 = st.number_input("Weight of empty flask (g)")
+        w2 = st.number_input("Weight of flask + cement (g)")
+        w3 = st.number_input("Weight of flask + cement + medium (g)")
+        w4 = st.number_input("Weight of flask + medium (g)")
+        submitted = st.form_submit_button("Calculate Specific Gravity")
+
+    if submitted:
+        sg = float(specific_gravity(w1, w2, w3, w4, sg_medium))
+        if math.isnan(sg):
+            st.error("Ensure all weights are entered and denominator is not zero.")
+        else:
+            st.success(f"Specific Gravity = {sg:.2f} g/cc")
+            results.save("Specific Gravity", sg, "g/cc",
+                         inputs={"w1": w1, "w2": w2, "w3": w3, "w4": w4, "medium": medium})
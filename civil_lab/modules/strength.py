@@ -0,0 +1,364 @@
+# ---------------- Strength of Materials Calculator ----------------
+import io
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from civil_lab import background, cache, ctm, logs, metrics, qc, results
+from civil_lab.calc import cube_qc
+from civil_lab.calc import strength as kernels
+
+NO_GRADE = "Not specified"
+
+QC_COLUMNS = {"project": "Project", "grade": "Grade", "results": "Results", "mean": "Mean (N/mm²)",
+              "sd": "Std. dev. (N/mm²)", "characteristic": "Characteristic (N/mm²)", "min": "Min (N/mm²)",
+              "max": "Max (N/mm²)", "groups": "Groups", "failed_groups": "Non-conforming groups"}
+FLAG_COLUMNS = {"project": "Project", "grade": "Grade", "group": "Group", "first_id": "First result",
+                "last_id": "Last result", "mean": "Group mean", "required_mean": "Required mean",
+                "min": "Lowest result", "required_min": "Required minimum"}
+# Batch column the peak of a machine log goes into, and its units per tonne.
+LOG_LOAD = {"Compressive Strength": ("ctm_tonnes", 1), "Tensile Strength": ("load_tonnes", 1),
+            "Transverse Strength of Tile": ("load_kg", 1000)}
+# Specimen dimensions asked for with a machine log, per test: batch column -> label.
+LOG_DIMENSIONS = {
+    "Compressive Strength": {"length_mm": "Length (mm)", "breadth_mm": "Breadth (mm)",
+                             "radius_mm": "Radius (mm, cylinders; 0 for cubes/prisms)"},
+    "Tensile Strength": {"diameter_mm": "Diameter of Cylinder (mm)", "length_mm": "Length of Cylinder (mm)"},
+    "Transverse Strength of Tile": {"lever_arm_mm": "Length of Lever Arm (mm)", "length_mm": "Length of Specimen (mm)",
+                                    "breadth_mm": "Breadth (mm)", "thickness_mm": "Thickness (mm)"},
+}
+
+
+def render():
+    st.header("Strength of Materials")
+
+    strength_type = st.selectbox("Select Type of Strength",
+                                 ["Compressive Strength", "Tensile Strength", "Transverse Strength of Tile"])
+
+    modes = ["Single Specimen", "Batch Upload", "Machine Log"]
+    if strength_type == "Compressive Strength":
+        modes.append("Acceptance (QC)")
+    mode = st.radio("Input Mode", modes, horizontal=True)
+    if mode == "Batch Upload":
+        render_batch(strength_type)
+        return
+    if mode == "Acceptance (QC)":
+        render_qc()
+        return
+    if mode == "Machine Log":
+        render_log(strength_type)
+        return
+
+    if strength_type == "Compressive Strength":
+        shape = st.selectbox("Choose Shape of Specimen", ["Rectangle", "Circle"])
+
+        with st.form("compressive_form"):
+            if shape == "Rectangle":
+                length = st.number_input("Enter Length (mm)", min_value=0.0)
+                breadth = st.number_input("Enter Breadth (mm)", min_value=0.0)
+                area = float(kernels.rectangle_area(length, breadth))
+            elif shape == "Circle":
+                radius = st.number_input("Enter Radius (mm)", min_value=0.0)
+                area = float(kernels.circle_area(radius))
+
+            ctm = st.number_input("Enter CTM Reading (Tonnes)", min_value=0.0)
+            grade = st.selectbox("Concrete Grade", [NO_GRADE] + cube_qc.GRADES)
+            submitted = st.form_submit_button("Calculate Strength")
+
+        if submitted:
+            if area > 0:
+                strength = float(kernels.compressive_strength(ctm, area))
+                st.success(f"Compressive Strength = {strength:.2f} N/mm²")
+                results.save(strength_type, strength, "N/mm²", label=None if grade == NO_GRADE else grade,
+                             inputs={"ctm_tonnes": ctm, "area_mm2": area})
+            else:
+                st.error("Area must be greater than 0.")
+
+    elif strength_type == "Tensile Strength":
+        with st.form("tensile_form"):
+            p = st.number_input("Enter Load from CTM (Tonnes)", min_value=0.0)
+            d = st.number_input("Enter Diameter of Cylinder (mm)", min_value=0.0)
+            l = st.number_input("Enter Length of Cylinder (mm)", min_value=0.0)
+            submitted = st.form_submit_button("Calculate Strength")
+
+        if submitted:
+            if d > 0 and l > 0:
+                strength = float(kernels.tensile_strength(p, d, l))
+                st.success(f"Tensile Strength = {strength:.2f} N/mm²")
+                results.save(strength_type, strength, "N/mm²",
+                             inputs={"load_tonnes": p, "diameter_mm": d, "length_mm": l})
+            else:
+                st.error("Diameter and Length must be greater than 0.")
+
+    elif strength_type == "Transverse Strength of Tile":
+        with st.form("transverse_form"):
+            p = st.number_input("Enter Breaking Load (kg)", min_value=0.0)
+            f = st.number_input("Enter Length of Lever Arm (mm)", min_value=0.0)
+            l = st.number_input("Enter Length of Specimen (mm)", min_value=0.0)
+            b = st.number_input("Enter Breadth (mm)", min_value=0.0)
+            t = st.number_input("Enter Thickness (mm)", min_value=0.0)
+            submitted = st.form_submit_button("Calculate Strength")
+
+        if submitted:
+            if b > 0 and t > 0:
+                strength = float(kernels.transverse_strength(p, f, l, b, t))
+                st.success(f"Transverse Strength = {strength:.2f} N/mm²")
+                results.save(strength_type, strength, "N/mm²",
+                             inputs={"load_kg": p, "lever_arm_mm": f, "length_mm": l, "breadth_mm": b,
+                                     "thickness_mm": t})
+            else:
+                st.error("Breadth and Thickness must be greater than 0.")
+
+
+def render_batch(strength_type):
+    columns = kernels.BATCH_COLUMNS[strength_type]
+    st.markdown("Upload a CSV or Excel sheet with one specimen per row and these columns: "
+                + ", ".join(f"`{c}`" for c in columns))
+    if strength_type == "Compressive Strength":
+        st.caption("Give `radius_mm` for cylinders, or `length_mm` and `breadth_mm` for cubes/prisms. "
+                   "An optional `grade` column (M20, M25, ...) and `sample` column (cubes of one sample "
+                   "share an ID) enable the IS 456 acceptance check.")
+        default_grade = st.selectbox("Grade for rows without one", [NO_GRADE] + cube_qc.GRADES)
+
+    upload = st.file_uploader("Upload Specimen Sheet", type=["csv", "xlsx", "xls"])
+    if upload is None:
+        return
+
+    try:
+        df = evaluate_sheet(strength_type, upload.name, upload.getvalue())
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    invalid = int(df["Strength (N/mm²)"].isna().sum())
+    st.success(f"Computed {len(df) - invalid} of {len(df)} specimens.")
+    if invalid:
+        st.warning(f"{invalid} rows have missing or non-positive dimensions and were left blank.")
+    st.dataframe(df)
+    grades = None
+    if strength_type == "Compressive Strength":
+        grades = _sheet_grades(df, None if default_grade == NO_GRADE else default_grade)
+        _sheet_qc(df, grades)
+    # Saved once per sheet: further clicks (or reruns) must not store the rows again.
+    sheet = cache.make_key(strength_type, upload.name, upload.getvalue(), default_grade)
+    saved = st.session_state.get("strength_sheet_saved") == sheet
+    if st.button("Save Results", disabled=saved) and not saved:
+        if results.save_many(_batch_records(strength_type, df, columns, grades)) is not None:
+            st.session_state.strength_sheet_saved = sheet
+    st.download_button("Download Results (CSV)", df.to_csv(index=False).encode("utf-8"),
+                       file_name="strength_results.csv", mime="text/csv")
+
+
+def render_log(strength_type):
+    """Peak load (and stress-strain curve) read from a digital CTM's load-displacement log."""
+    st.markdown("Upload the load-displacement log of one test from a digital compression testing machine "
+                "(CSV or tab-separated text with a header row). The peak load in the log replaces the "
+                "typed CTM reading.")
+    upload = st.file_uploader("Upload Machine Log", type=["csv", "txt", "tsv"])
+    if upload is None:
+        return
+    content = upload.getvalue()
+    try:
+        names = logs.columns(content)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    with st.form("log_form"):
+        col1, col2 = st.columns(2)
+        load_column = col1.selectbox("Load column", names, index=logs.guess_column(names, "load", "force"))
+        load_unit = col2.selectbox("Load unit", list(ctm.LOAD_UNITS))
+        displacement_column = col1.selectbox("Displacement column", names,
+                                             index=logs.guess_column(names, "disp", "stroke", "deform"))
+        displacement_unit = col2.selectbox("Displacement unit", list(ctm.DISPLACEMENT_UNITS))
+        dims = {c: st.number_input(f"Enter {label}", min_value=0.0)
+                for c, label in LOG_DIMENSIONS[strength_type].items()}
+        gauge, grade = 0.0, NO_GRADE
+        if strength_type == "Compressive Strength":
+            gauge = st.number_input("Enter Specimen Height / Gauge Length (mm, for the stress-strain curve)",
+                                    min_value=0.0)
+            grade = st.selectbox("Concrete Grade", [NO_GRADE] + cube_qc.GRADES)
+        submitted = st.form_submit_button("Analyze Log")
+
+    if submitted:
+        area = None
+        if strength_type == "Compressive Strength":
+            area = float(kernels.specimen_area(dims["length_mm"], dims["breadth_mm"], dims["radius_mm"] or np.nan))
+            if not area > 0:
+                st.error("Area must be greater than 0.")
+                return
+        elif not all(v > 0 for c, v in dims.items() if c != "lever_arm_mm"):
+            st.error("Specimen dimensions must be greater than 0.")
+            return
+        job = background.submit("strength_log", ctm.analyze, content, load_column, displacement_column, load_unit,
+                                displacement_unit, area_mm2=area, gauge_length_mm=gauge or None)
+        if job is None:
+            st.session_state.pop("strength_log_request", None)
+            return
+        st.session_state.strength_log_request = {"test": strength_type, "file": upload.name, "dims": dims,
+                                                 "gauge": gauge, "grade": grade, "saved": False}
+
+    request = st.session_state.get("strength_log_request")
+    if request is None or request["test"] != strength_type:
+        return
+    out = background.result("strength_log", "Reading log...")
+    if out is None:
+        return
+
+    peak_t = out["peak_tonnes"]
+    load_column, per_tonne = LOG_LOAD[strength_type]
+    load = peak_t * per_tonne
+    strength = float(kernels.evaluate(strength_type, {load_column: [load],
+                                                      **{c: [v] for c, v in request["dims"].items()}})[0])
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Peak Load (kN)", f"{out['peak_load']:.2f}")
+    col2.metric("Peak Load (Tonnes)", f"{peak_t:.3f}")
+    col3.metric("Samples", f"{out['samples']:,}")
+    if strength == strength:
+        st.success(f"{strength_type} = {strength:.2f} N/mm²")
+    if out["failure_index"] is None:
+        st.warning("No failure found: the load never fell more than 30% below its peak. "
+                   "The log may have stopped before the specimen failed.")
+    else:
+        st.info(f"Failure at sample {out['failure_index']:,} ({out['failure_displacement']:.3f} mm, "
+                f"{out['failure_load']:.2f} kN).")
+    if "secant_modulus" in out:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Peak Stress (N/mm²)", f"{out['peak_stress']:.2f}")
+        col2.metric("Strain at Peak", f"{out['strain_at_peak']:.5f}")
+        modulus = out["secant_modulus"]
+        col3.metric("Secant Modulus (N/mm²)", f"{modulus:,.0f}" if modulus == modulus else "n/a")
+        st.caption("Strain from platen displacement (includes seating and machine compliance). Secant modulus "
+                   "from the origin to 40% of the peak stress.")
+    st.image(out["chart"])
+    st.caption(f"Chart drawn from {out['points']:,} of {out['samples']:,} samples (lowest and highest of each run).")
+
+    if request["saved"]:
+        return
+    request["saved"] = True
+    outputs = {k: out[k] for k in ("peak_load", "failure_index", "failure_load", "failure_displacement",
+                                    "secant_modulus", "strain_at_peak") if k in out}
+    results.save(strength_type, strength if strength == strength else None, "N/mm²",
+                 label=None if request["grade"] == NO_GRADE else request["grade"],
+                 inputs={"log": request["file"], load_column: load, **request["dims"],
+                         "gauge_length_mm": request["gauge"] or None, "samples": out["samples"]},
+                 outputs=outputs)
+
+
+def _batch_records(strength_type, df, columns, grades=None):
+    # Saved under the sample ID when there is one, so the saved cubes group into samples for QC.
+    specimens = next((df[c] for c in ("sample", "specimen") if c in df.columns), None)
+    for i, value in enumerate(df["Strength (N/mm²)"]):
+        if value != value:  # NaN: row was invalid
+            continue
+        record = {"test": strength_type, "value": value, "unit": "N/mm²",
+                  "inputs": {c: df[c].iloc[i] for c in columns if c in df.columns}}
+        if specimens is not None and specimens.iloc[i] == specimens.iloc[i]:
+            record["specimen"] = specimens.iloc[i]
+        if grades is not None and grades.iloc[i] is not None:
+            record["label"] = grades.iloc[i]
+        yield record
+
+
+def _sheet_grades(df, default_grade):
+    """Canonical grade of each row (``None`` where it has none)."""
+    if "grade" not in df.columns:
+        return pd.Series(default_grade, index=df.index, dtype=object)
+    known = {}
+    for label in df["grade"].dropna().unique():
+        try:
+            known[label] = cube_qc.parse_grade(label)
+        except ValueError:
+            pass
+    return df["grade"].map(known).astype(object).where(lambda g: g.notna(), default_grade)
+
+
+def _sheet_qc(df, grades):
+    """IS 456 acceptance of the uploaded results, grade by grade in sheet order."""
+    strength = df["Strength (N/mm²)"]
+    rows, flags = [], []
+    for grade in sorted(grades.dropna().unique(), key=cube_qc.grade_strength):
+        mine = df[grades == grade]
+        if "sample" in df.columns:
+            # One test result per sample: the mean of its cubes, in order of first appearance.
+            cubes = mine.assign(cube=mine.groupby("sample", sort=False).cumcount()).pivot_table(
+                index="sample", columns="cube", values="Strength (N/mm²)", aggfunc="first", sort=False)
+            values, valid = cube_qc.sample_strength(cubes.to_numpy())
+            ids = cubes.index.to_numpy()
+            invalid = np.isfinite(values) & ~valid
+            if invalid.any():
+                # IS 456 16.3: such a sample's result is invalid.
+                st.warning(f"{grade}: left out {int(invalid.sum())} samples with a cube more than 15% from "
+                           "the sample mean: " + ", ".join(map(str, ids[invalid][:20])))
+                values = np.where(invalid, np.nan, values)
+        else:
+            values = strength[grades == grade].to_numpy()
+            ids = (mine["specimen"] if "specimen" in mine.columns else mine.index.to_series() + 1).to_numpy()
+        engine = cube_qc.GradeQC(grade)
+        engine.update_many(values, ids)
+        rows.append(engine.summary())
+        flags += list(engine.flags)
+    if not rows:
+        return
+    st.subheader("Acceptance (IS 456)")
+    _qc_tables(rows, flags)
+
+
+def _qc_tables(rows, flags):
+    table = pd.DataFrame(rows)
+    st.dataframe(table.rename(columns=QC_COLUMNS), hide_index=True)
+    st.caption(f"Groups of {cube_qc.GROUP_SIZE} consecutive results. Characteristic strength is estimated as "
+               f"mean − 1.65 s, using the assumed standard deviation until {cube_qc.ESTABLISHED_AFTER} "
+               "results are in.")
+    if flags:
+        st.error(f"{int(table['failed_groups'].sum())} non-conforming groups (latest shown).")
+        st.dataframe(pd.DataFrame(flags)[[c for c in FLAG_COLUMNS if c in flags[0]]].rename(columns=FLAG_COLUMNS),
+                     hide_index=True)
+    elif table["groups"].sum():
+        st.success("Every complete group meets the acceptance criteria.")
+
+
+@st.cache_resource
+def qc_tracker():
+    return qc.QCTracker(results.results_store())
+
+
+def render_qc():
+    """Running acceptance statistics of the saved compressive strength results."""
+    st.caption("Compressive strength results saved with a concrete grade, per project and grade, "
+               "in the order they were recorded. Consecutive cubes saved under one Specimen / Sample ID "
+               f"(up to {cube_qc.CUBES_PER_SAMPLE}) form one test result, their mean; a sample is counted "
+               "once it is complete or the next sample is saved.")
+    tracker = qc_tracker()
+    with metrics.timed("strength.qc_refresh"):
+        tracker.refresh()
+    rows, flags = tracker.summary()
+    if not rows:
+        st.info("No graded compressive strength results saved yet.")
+        return
+    project = st.selectbox("Project", ["All projects"] + sorted({row["project"] for row in rows}))
+    if project != "All projects":
+        rows = [r for r in rows if r["project"] == project]
+        flags = [f for f in flags if f["project"] == project]
+    _qc_tables(rows, flags)
+
+
+@cache.memoize(maxsize=32)
+def evaluate_sheet(strength_type, filename, content):
+    """Read an uploaded sheet and append a strength column (cached on file bytes)."""
+    try:
+        with metrics.timed("strength.read_sheet"):
+            if filename.lower().endswith(".csv"):
+                df = pd.read_csv(io.BytesIO(content))
+            else:
+                df = pd.read_excel(io.BytesIO(content))
+    except Exception:
+        raise ValueError("Could not read the uploaded file. Check that it is a valid CSV or Excel sheet.")
+
+    columns = kernels.BATCH_COLUMNS[strength_type]
+    df.columns = [str(c).strip() for c in df.columns]
+    data = {c: pd.to_numeric(df[c], errors="coerce").to_numpy() for c in columns if c in df.columns}
+    with metrics.timed("strength.evaluate"):
+        df["Strength (N/mm²)"] = kernels.evaluate(strength_type, data)
+    return df
@@ -0,0 +1,77 @@
+# ---------------- Trends ----------------
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from civil_lab import charts, metrics, results, rollups
+
+# Trend -> metrics it charts, and what their dimension is called.
+VIEWS = {
+    "Compressive strength per grade": (["strength"], "Grade"),
+    "Fineness modulus per quarry": (["fm"], "Quarry"),
+    "LL / PI per site": (["ll", "pi"], "Site"),
+}
+PERIODS = {"Week": "week", "Month": "month", "Quarter": "quarter"}
+MAX_SERIES = 8  # lines per chart; the table lists every dimension
+UNSPECIFIED_LABEL = "Unspecified"
+
+
+def _label(dimension):
+    return dimension or UNSPECIFIED_LABEL
+
+
+def _summary(totals, dimension_name):
+    """One row of statistics per dimension over the whole range."""
+    table = pd.DataFrame([{dimension_name: _label(d), **rollups.stats(r)} for d, r in totals.items()])
+    return table.rename(columns={"n": "Results", "mean": "Mean", "sd": "Std. dev.", "min": "Min", "max": "Max"})
+
+
+def _chart(rows, ylabel, title, dimensions):
+    series = {}
+    for dimension in dimensions:
+        mine = [r for r in rows if r["dimension"] == dimension]
+        stats = [rollups.stats(r) for r in mine]
+        mean, sd = np.array([s["mean"] for s in stats]), np.nan_to_num([s["sd"] for s in stats])
+        series[_label(dimension)] = (np.array([r["bucket"] for r in mine], dtype="datetime64[D]"),
+                                     mean, mean - sd, mean + sd)
+    fig = charts.new_figure(figsize=(8, 4))
+    charts.trend_lines(fig.subplots(), series, ylabel, title)
+    return charts.to_png(fig, bbox_inches="tight")
+
+
+def render():
+    st.header("Trends")
+    st.markdown("Saved results summarised per week, month or quarter. Record the grade (Strength page), the "
+                "material source (sidebar) and the project (site) with each result to break them down.")
+
+    today = date.today()
+    with st.form("trends_form"):
+        view = st.selectbox("Trend", list(VIEWS))
+        col1, col2 = st.columns(2)
+        period = col1.selectbox("Period", list(PERIODS))
+        dates = col2.date_input("Test date range", value=(today - timedelta(days=365), today))
+        st.form_submit_button("Show")
+
+    since = dates[0] if len(dates) > 0 else None
+    until = dates[1] if len(dates) > 1 else None
+    metric_names, dimension_name = VIEWS[view]
+    db = results.results_store()
+    for metric in metric_names:
+        title = rollups.METRICS[metric][2]
+        with metrics.timed("trends.rollup"):
+            rows = db.rollup(metric, PERIODS[period], since, until)
+        st.subheader(title)
+        if not rows:
+            st.info("No results in this range.")
+            continue
+        # Dimensions with the most results first.
+        totals = dict(sorted(rollups.combine(rows, lambda r: r["dimension"]).items(), key=lambda kv: -kv[1]["n"]))
+        with metrics.timed("trends.chart"):
+            png = _chart(rows, title.split(" by ")[0], f"{title} ({period.lower()}ly mean ± s.d.)",
+                         list(totals)[:MAX_SERIES])
+        st.image(png)
+        if len(totals) > MAX_SERIES:
+            st.caption(f"Chart shows the {MAX_SERIES} {dimension_name.lower()}s with the most results.")
+        st.dataframe(_summary(totals, dimension_name), hide_index=True)
@@ -0,0 +1,35 @@
+# ---------------- Workability ----------------
+import streamlit as st
+
+from civil_lab import results
+from civil_lab.calc import workability
+
+
+def render():
+    st.header("Workability of Concrete")
+
+    test_type = st.selectbox(
+        "Select Workability Test",
+        workability.TESTS
+    )
+
+    with st.form("workability_form"):
+        if test_type == "Slump Test":
+            value = st.number_input("Enter Slump Value (mm)", min_value=0.0)
+            heading = f"### Slump Value: **{value:.1f} mm**"
+        elif test_type == "Compaction Factor":
+            value = st.number_input("Enter Compaction Factor", min_value=0.0, max_value=1.0, step=0.01)
+            heading = f"### Compaction Factor: **{value:.2f}**"
+        elif test_type == "Flow Table":
+            value = st.number_input("Enter Flow Value (%)", min_value=0.0, max_value=150.0, step=0.1)
+            heading = f"### Flow Value: **{value:.1f}%**"
+        elif test_type == "Vee Bee":
+            value = st.number_input("Enter Vee Bee Time (seconds)", min_value=0.0)
+            heading = f"### Vee Bee Time: **{value:.1f} seconds**"
+        submitted = st.form_submit_button("Analyze")
+
+    if submitted:
+        st.markdown(heading)
+        outcome = workability.TABLES[test_type].classify_one(value)
+        getattr(st, outcome.alert)(outcome.message)
+        results.save(test_type, value, label=outcome.label)
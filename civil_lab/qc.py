@@ -0,0 +1,118 @@
+"""Cube acceptance tracking over the results store.
+
+Compressive strength results saved with a grade label (``M20``, ``M25``,
+...) are folded, in the order they were recorded, into one
+``cube_qc.GradeQC`` per project and grade. The engines and the id of the
+last result folded in are kept in the store's ``state`` table, so
+``refresh`` reads only the results recorded since the previous refresh,
+whichever process made it, however long the history is.
+
+Each saved result is one cube, but an IS 456 test result is the mean of a
+sample's cubes. Consecutive cubes of a project and grade saved under the
+same specimen (sample) ID form one sample, closed once it has
+``cube_qc.CUBES_PER_SAMPLE`` cubes or a cube of another sample arrives; its
+mean (``cube_qc.sample_strength``) is the test result, and a sample whose
+cubes disagree by more than 15% is left out. Cubes saved without an ID
+count as test results of their own. The sample still being filled is kept
+in the state with the engines.
+"""
+import threading
+
+from civil_lab import metrics
+from civil_lab.calc import cube_qc
+
+TEST = "Compressive Strength"
+STATE_KEY = "cube_qc_samples"
+CHUNK = 20000  # results folded in per step while catching up
+
+
+class QCTracker:
+    def __init__(self, db, group_size=cube_qc.GROUP_SIZE, overlapping=False):
+        self.db = db
+        self.group_size = group_size
+        self.overlapping = overlapping
+        self._lock = threading.Lock()
+
+    @property
+    def _key(self):
+        return f"{STATE_KEY}/{self.group_size}{'/rolling' if self.overlapping else ''}"
+
+    def _load(self):
+        state = self.db.get_state(self._key) or {"last_id": 0, "engines": []}
+        engines = {(e["project"], e["state"]["grade"]): cube_qc.GradeQC.from_dict(e["state"])
+                   for e in state["engines"]}
+        samples = {(e["project"], e["state"]["grade"]): e["sample"] for e in state["engines"] if e.get("sample")}
+        return state["last_id"], engines, samples
+
+    @staticmethod
+    def _close(pending, key, sample):
+        """Queue a finished sample's mean as one test result (NaN, i.e. skipped, if its cubes disagree)."""
+        mean, valid = cube_qc.sample_strength([sample["cubes"]])
+        values, ids = pending.setdefault(key, ([], []))
+        values.append(float(mean[0]) if valid[0] else float("nan"))
+        ids.append(sample["id"])
+
+    def _fold(self, engines, pending):
+        for key, (values, ids) in pending.items():
+            if key not in engines:
+                engines[key] = cube_qc.GradeQC(key[1], self.group_size, self.overlapping)
+            engines[key].update_many(values, ids)
+        pending.clear()
+
+    def refresh(self, batch_size=CHUNK):
+        """Fold in results recorded since the last refresh; returns how many were read."""
+        with self._lock, metrics.timed("qc.refresh"):
+            last_id, engines, samples = self._load()
+            read = 0
+            pending = {}  # (project, grade) -> ([values], [ids]) of the current chunk
+            # samples: (project, grade) -> {"id", "cubes"} of the sample being filled
+            grades = {}  # label -> grade, or None
+            for row in self.db.iter_after(last_id, test=TEST, batch_size=batch_size):
+                read += 1
+                last_id = row["id"]
+                label = row["label"]
+                if label not in grades:
+                    try:
+                        grades[label] = cube_qc.parse_grade(label)
+                    except ValueError:
+                        grades[label] = None  # no grade recorded
+                grade = grades[label]
+                if grade is None:
+                    continue
+                key = (row["project"], grade)
+                value = float("nan") if row["value"] is None else row["value"]
+                sample = samples.get(key)
+                if sample is not None and sample["id"] != row["specimen"]:
+                    self._close(pending, key, samples.pop(key))
+                if row["specimen"] is None:
+                    values, ids = pending.setdefault(key, ([], []))
+                    values.append(value)
+                    ids.append(row["id"])
+                else:
+                    sample = samples.setdefault(key, {"id": row["specimen"], "cubes": []})
+                    sample["cubes"].append(value)
+                    if len(sample["cubes"]) == cube_qc.CUBES_PER_SAMPLE:
+                        self._close(pending, key, samples.pop(key))
+                if read % batch_size == 0:
+                    self._fold(engines, pending)
+            if not read:
+                return 0
+            self._fold(engines, pending)
+            for key in samples:
+                if key not in engines:
+                    engines[key] = cube_qc.GradeQC(key[1], self.group_size, self.overlapping)
+            self.db.put_state(self._key, {"last_id": last_id, "engines": [
+                {"project": key[0], "state": qc.to_dict(), "sample": samples.get(key)}
+                for key, qc in engines.items()]})
+            return read
+
+    def summary(self, project=None):
+        """``(rows, flags)``: one statistics row per project and grade, and their latest flagged groups."""
+        _, engines, _ = self._load()
+        rows, flags = [], []
+        for (p, grade), qc in sorted(engines.items(), key=lambda kv: (kv[0][0], cube_qc.grade_strength(kv[0][1]))):
+            if project is not None and p != project:
+                continue
+            rows.append({"project": p, **qc.summary()})
+            flags += [{"project": p, **flag} for flag in qc.flags]
+        return rows, flags
@@ -0,0 +1,57 @@
+"""Module registry for the lab assistant.
+
+Each entry maps the name shown in the module dropdown to the import path of
+the page that renders it. Pages are imported only when selected, so heavy
+dependencies (pandas, matplotlib) are paid for by the modules that use them
+rather than on every script run.
+
+Each page renders inside a Streamlit fragment: a widget change inside a page
+reruns only that page, not the app header, styling and module selector.
+"""
+import importlib
+import sys
+
+import streamlit as st
+
+from civil_lab import memory, metrics
+
+MODULES = {
+    "Home": "civil_lab.modules.home",
+    "Strength of Materials": "civil_lab.modules.strength",
+    "Soil Classification": "civil_lab.modules.soil",
+    "Workability": "civil_lab.modules.workability",
+    "Specific Gravity of Cement": "civil_lab.modules.specific_gravity",
+    "Sieve Analysis": "civil_lab.modules.sieve",
+    "Area Converter": "civil_lab.modules.area",
+    "Bitumen Analysis": "civil_lab.modules.bitumen",
+    "Results History": "civil_lab.modules.history",
+    "Trends": "civil_lab.modules.trends",
+}
+
+
+def load(name):
+    """Import (or fetch from ``sys.modules``) the page for ``name``."""
+    path = MODULES[name]
+    if path in sys.modules:
+        return sys.modules[path]
+    with metrics.timed(f"import.{name}"):
+        return importlib.import_module(path)
+
+
+def render(name):
+    _render_page(name)
+
+
+@st.fragment
+def _render_page(name):
+    # A fragment-only rerun skips app.py, so it opens and closes its own run.
+    own_run = not metrics.run_active()
+    if own_run:
+        metrics.start_run()
+        memory.start_run()
+    page = load(name)
+    with metrics.timed(f"module.{name}"):
+        page.render()
+    if own_run:
+        memory.finish_run()
+        metrics.finish_run(module=name, scope="fragment")
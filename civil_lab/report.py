@@ -0,0 +1,429 @@
+"""Batch reports: a multi-page PDF of charts and tables plus an XLSX workbook.
+
+Results are read from the results store one page at a time and grouped by
+test. Each test gets table pages (one row per sample) and, for sieve analyses
+and liquid limits, one chart page per sample.
+
+Pages are rendered to PNG in a process pool, because matplotlib is not
+thread-safe and separate processes also draw in parallel. The main process
+keeps at most ``2 * workers`` pages in flight and writes each one into the PDF
+as soon as it is its turn, while the tables go straight into a write-only
+workbook. Memory use therefore depends on the number of workers, not on the
+size of the batch.
+
+    python -m civil_lab.report --project "NH-66 Package 3" --pdf report.pdf --xlsx report.xlsx
+"""
+import argparse
+import functools
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.lines import Line2D
+
+from civil_lab import charts, jobs, metrics, store as result_store
+from civil_lab.calc import consistency, sieve as psd
+
+PAGE_SIZE = (8.27, 11.69)  # A4 portrait, inches
+DPI = 150
+ROWS_PER_PAGE = 40
+MAX_TABLE_COLUMNS = 10
+LINE_PITCH = 1.45  # table row height in multiples of the font size
+CHART_TESTS = ("Sieve Analysis", "Liquid Limit")
+KEEP_BUILT = 24 * 3600  # seconds a report built by ``build`` stays on disk
+
+
+def _scalar(value):
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+def _fmt(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return "" if value != value else f"{value:.4g}"
+    return str(value)
+
+
+def _record_fields(record):
+    """Scalar inputs and outputs of a stored result, outputs taking precedence."""
+    fields = {}
+    for part in ("inputs", "outputs"):
+        if isinstance(record.get(part), dict):
+            fields.update((k, v) for k, v in record[part].items() if _scalar(v))
+    return fields
+
+
+def _columns(record):
+    """Table columns for a test, taken from its first record."""
+    value = "Value" if not record.get("unit") else f"Value ({record['unit']})"
+    return ["Specimen", "Date", value, "Label"] + [k for k in _record_fields(record) if k not in ("value", "label")]
+
+
+def _row(record, columns):
+    fields = _record_fields(record)
+    return [record.get("specimen"), record["tested_on"], record.get("value"), record.get("label")] + \
+        [fields.get(k) for k in columns[4:]]
+
+
+# ---------------- Page rendering (worker processes) ----------------
+
+def _page(title, subtitle):
+    fig = charts.new_figure(figsize=PAGE_SIZE)
+    fig.text(0.08, 0.95, title, fontsize=15, weight="bold")
+    fig.text(0.08, 0.925, subtitle, fontsize=10, color="dimgrey")
+    return fig
+
+
+def _table(fig, rect, columns, rows):
+    """Ruled table in ``rect`` (figure fraction).
+
+    Each column is drawn as one multi-line text block: matplotlib's own
+    ``table`` lays out every cell separately and takes seconds per page.
+    """
+    # Drop columns that are empty on this page and keep the rest readable.
+    keep = [j for j in range(len(columns)) if any(_fmt(r[j]) for r in rows)][:MAX_TABLE_COLUMNS]
+    left, bottom, width, height = rect
+    # Shrink the font when the rows would not fit (e.g. 50-sieve stacks).
+    size = min(8.0, height * PAGE_SIZE[1] * 72 / ((len(rows) + 2) * LINE_PITCH))
+    pitch = size * LINE_PITCH / 72 / PAGE_SIZE[1]
+    top = bottom + height
+    step = width / max(len(keep), 1)
+    for c, j in enumerate(keep):
+        x = left + (c + 0.5) * step
+        fig.text(x, top - 0.3 * pitch, columns[j], ha="center", va="top", fontsize=size, weight="bold")
+        fig.text(x, top - 1.5 * pitch, "\n".join(_fmt(r[j]) for r in rows), ha="center", va="top",
+                 fontsize=size, linespacing=LINE_PITCH / 1.2)
+    for y in (top, top - 1.3 * pitch):
+        fig.add_artist(Line2D([left, left + width], [y, y], color="black", linewidth=0.6))
+
+
+def _meta(record):
+    parts = [record["project"], record.get("specimen") or "", record["tested_on"]]
+    return "  ·  ".join(p for p in parts if p)
+
+
+def _sieve_page(record):
+    inputs = record.get("inputs") or {}
+    result = psd.analyze(inputs["sizes_mm"], [inputs["retained"]])
+    sizes, passing = result["sizes"], result["passing"]
+    readings = inputs.get("hydrometer") or []
+    if readings:
+        sizes, passing = psd.combine(sizes, passing, [r[0] for r in readings], [r[1] for r in readings],
+                                     inputs.get("hydrometer_basis") or "total")
+
+    material = inputs.get("material")
+    fig = _page(f"Sieve Analysis — {material}" if material else "Sieve Analysis", _meta(record))
+    charts.psd_curve(fig.add_axes([0.12, 0.5, 0.8, 0.38]), sizes, passing[0],
+                     len(result["sizes"]) if readings else None)
+    outputs = record.get("outputs") or {}
+    names = [k for k in ("D10", "D30", "D60", "Cu", "Cc", "FM", "zone") if k in outputs]
+    _table(fig, [0.08, 0.08, 0.84, 0.34], ["Sieve (mm)", "% Retained", "% Passing"],
+           [[s, r, p] for s, r, p in zip(result["sizes"], result["retained"][0], result["passing"][0])])
+    if names:
+        fig.text(0.08, 0.44, "   ".join(f"{k}: {_fmt(outputs[k])}" for k in names), fontsize=10)
+    return fig
+
+
+def _liquid_limit_page(record):
+    inputs, outputs = record.get("inputs") or {}, record.get("outputs") or {}
+    blows = inputs.get("blows") or []
+    water = outputs.get("water_content")
+    if water is None:
+        m1, m2, m3 = zip(*inputs["masses_g"])
+        water = consistency.water_content(m1, m2, m3)
+    flow_index = outputs.get("flow_index")
+    fig = _page("Liquid Limit — Casagrande Method", _meta(record))
+    charts.flow_curve(fig.add_axes([0.12, 0.5, 0.8, 0.38]), blows, water,
+                      np.nan if record.get("value") is None else record["value"],
+                      np.nan if flow_index is None else flow_index)
+    _table(fig, [0.08, 0.08, 0.84, 0.34], ["Trial", "Blows", "Water content (%)"],
+           [[i, b, w] for i, (b, w) in enumerate(zip(blows, water), start=1)])
+    return fig
+
+
+def _table_page(test, project, columns, rows, part):
+    fig = _page(test if part == 1 else f"{test} (continued)", project or "All projects")
+    _table(fig, [0.06, 0.05, 0.88, 0.85], columns, rows)
+    return fig
+
+
+PAGES = {"table": _table_page, "Sieve Analysis": _sieve_page, "Liquid Limit": _liquid_limit_page}
+
+
+def render_page(job, dpi=DPI):
+    """Render one page job to ``(width, height, zlib-compressed RGB pixels)``.
+
+    Top-level so it can be shipped to a worker process; compressing here
+    keeps that work in the pool as well.
+    """
+    kind, args = job
+    fig = PAGES[kind](*args)
+    fig.set_dpi(dpi)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    pixels = np.ascontiguousarray(np.asarray(canvas.buffer_rgba())[:, :, :3])
+    charts.release(fig)
+    height, width = pixels.shape[:2]
+    return width, height, zlib.compress(pixels.tobytes(), 6)
+
+
+# ---------------- Report assembly (main process) ----------------
+
+class _Workbook:
+    """Write-only workbook with one sheet per test, created on first use."""
+
+    def __init__(self, target):
+        from openpyxl import Workbook
+
+        self._target = target
+        self._wb = Workbook(write_only=True)
+        self._sheets = {}
+
+    def append(self, test, columns, row):
+        if test not in self._sheets:
+            # Sheet titles are limited to 31 characters.
+            self._sheets[test] = self._wb.create_sheet(test[:31])
+            self._sheets[test].append(columns)
+        self._sheets[test].append(row)
+
+    def close(self):
+        if not self._sheets:
+            self._wb.create_sheet("Results").append(["No results match the filters."])
+        self._wb.save(self._target)
+
+
+def _jobs(db, filters, workbook, chart_pages=True):
+    """Page jobs for the whole report, in page order.
+
+    Table rows are written to the workbook as the records stream past, so
+    the workbook and the PDF are built in the same pass over the store.
+    """
+    tests = [filters["test"]] if filters.get("test") else db.distinct("test")
+    for test in tests:
+        query = dict(filters, test=test)
+        columns, rows, part = None, [], 0
+        for record in db.iter_results(**query):
+            if columns is None:
+                columns = _columns(record)
+            row = _row(record, columns)
+            if workbook is not None:
+                workbook.append(test, ["Project"] + columns, [record["project"]] + row)
+            rows.append(row)
+            if len(rows) == ROWS_PER_PAGE:
+                part += 1
+                yield "table", (test, filters.get("project"), columns, rows, part)
+                rows = []
+        if rows:
+            yield "table", (test, filters.get("project"), columns, rows, part + 1)
+        if chart_pages and test in CHART_TESTS and columns is not None:
+            for record in db.iter_results(**query):
+                yield test, (record,)
+
+
+def _page_total(db, filters, chart_pages):
+    """Estimated number of pages (table pages assume one test fills them all)."""
+    total = -(-db.count(**filters) // ROWS_PER_PAGE)
+    if chart_pages:
+        total += sum(db.count(**dict(filters, test=test)) for test in CHART_TESTS
+                     if filters.get("test") in (None, test))
+    return max(total, 1)
+
+
+def _reporting(jobs, progress, total):
+    for done, job in enumerate(jobs):
+        progress(min(done / total, 1.0), f"page {done + 1} of ~{total}")
+        yield job
+
+
+def _bounded_map(pool, fn, items, window):
+    """``pool.map`` that keeps at most ``window`` tasks submitted at a time."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class _PdfWriter:
+    """Minimal PDF writer with one full-page image per page.
+
+    Pages go to the file as they arrive; only the byte offset of each object
+    is kept until the cross-reference table is written on ``close``.
+    (matplotlib's ``PdfPages`` holds every embedded image until the end.)
+    """
+
+    def __init__(self, target, title):
+        self._own = isinstance(target, (str, os.PathLike))
+        self._f = open(target, "wb") if self._own else target
+        self._pos = 0
+        self._offsets = {}
+        self._pages = []
+        self._next = 4  # 1: catalog, 2: page tree, 3: info
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        title = title.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        self._object(3, f"<< /Title ({title}) /Producer (Civil Lab Assistant) >>".encode())
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def _write(self, data):
+        self._f.write(data)
+        self._pos += len(data)
+
+    def _object(self, number, body, stream=None):
+        self._offsets[number] = self._pos
+        self._write(f"{number} 0 obj\n".encode() + body)
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_page(self, width, height, pixels, dpi):
+        image, content, page = self._next, self._next + 1, self._next + 2
+        self._next += 3
+        w, h = width * 72 / dpi, height * 72 / dpi
+        self._object(image, (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                             f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode "
+                             f"/Length {len(pixels)} >>").encode(), pixels)
+        draw = f"q {w:.2f} 0 0 {h:.2f} 0 0 cm /Im0 Do Q".encode()
+        self._object(content, f"<< /Length {len(draw)} >>".encode(), draw)
+        self._object(page, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {w:.2f} {h:.2f}] "
+                            f"/Resources << /XObject << /Im0 {image} 0 R >> >> /Contents {content} 0 R >>").encode())
+        self._pages.append(page)
+
+    def close(self):
+        kids = " ".join(f"{p} 0 R" for p in self._pages)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>".encode())
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._pos
+        self._write(f"xref\n0 {self._next}\n0000000000 65535 f \n".encode())
+        self._write("".join(f"{self._offsets[n]:010d} 00000 n \n" for n in range(1, self._next)).encode())
+        self._write(f"trailer\n<< /Size {self._next} /Root 1 0 R /Info 3 0 R >>\n"
+                    f"startxref\n{xref}\n%%EOF\n".encode())
+        if self._own:
+            self._f.close()
+
+
+def _write_pdf(target, pages, dpi):
+    pdf = _PdfWriter(target, "Civil Lab batch report")
+    for width, height, pixels in pages:
+        pdf.add_page(width, height, pixels, dpi)
+    pdf.close()
+    return pdf.page_count
+
+
+def export(pdf=None, xlsx=None, project=None, test=None, specimen=None, since=None, until=None,
+           workers=None, dpi=DPI, db=None, progress=None):
+    """Write the report for the matching results to ``pdf`` and/or ``xlsx``.
+
+    Targets are paths or binary file objects. ``workers=0`` renders pages in
+    this process. ``progress(fraction, message)`` is called as each page is
+    started. Returns ``{"pages": n, "results": n}``.
+    """
+    if pdf is None and xlsx is None:
+        raise ValueError("Nothing to export: give a PDF and/or XLSX target")
+    db = db or result_store.default_store()
+    filters = {"project": project, "test": test, "specimen": specimen, "since": since, "until": until}
+    workbook = _Workbook(xlsx) if xlsx is not None else None
+    workers = (os.cpu_count() or 1) if workers is None else workers
+
+    with metrics.timed("report.export"):
+        work = _jobs(db, filters, workbook, chart_pages=pdf is not None)
+        if progress is not None:
+            work = _reporting(work, progress, _page_total(db, filters, pdf is not None))
+        if pdf is None:
+            pages = 0
+            for _ in work:
+                pass
+        elif workers == 0:
+            pages = _write_pdf(pdf, (render_page(job, dpi) for job in work), dpi)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=jobs.pool_context()) as pool:
+                render = functools.partial(render_page, dpi=dpi)
+                pages = _write_pdf(pdf, _bounded_map(pool, render, work, 2 * workers), dpi)
+        if workbook is not None:
+            workbook.close()
+    return {"pages": pages, "results": db.count(**filters)}
+
+
+def _built_dir():
+    return os.path.join(tempfile.gettempdir(), "civil_lab_reports")
+
+
+def _prune(parent, keep=KEEP_BUILT):
+    """Remove reports built more than ``keep`` seconds ago."""
+    cutoff = time.time() - keep
+    try:
+        entries = list(os.scandir(parent))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            old = entry.stat().st_mtime < cutoff
+        except FileNotFoundError:
+            continue
+        if old:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def build(db_path, filters, workers=None, dpi=DPI):
+    """Write the PDF and XLSX report to files: ``(summary, pdf_path, xlsx_path)``.
+
+    Meant to run as a background job (``civil_lab.jobs``): it opens its own
+    connection to the store at ``db_path``, renders pages in a pool of
+    ``workers`` processes and reports progress per page. Nothing but the
+    pages in flight is held in memory; the caller streams the files from
+    disk. Each build gets a fresh temporary directory, and reports older
+    than ``KEEP_BUILT`` are removed by later builds.
+    """
+    parent = _built_dir()
+    os.makedirs(parent, exist_ok=True)
+    _prune(parent)
+    directory = tempfile.mkdtemp(prefix="report_", dir=parent)
+    pdf, xlsx = os.path.join(directory, "report.pdf"), os.path.join(directory, "report.xlsx")
+    db = result_store.ResultStore(db_path)
+    try:
+        summary = export(pdf, xlsx, **filters, workers=workers, dpi=dpi, db=db, progress=jobs.report_progress)
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    finally:
+        db.close()
+    return summary, pdf, xlsx
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a batch report of stored Civil Lab results.")
+    parser.add_argument("--pdf", help="multi-page PDF of tables and charts")
+    parser.add_argument("--xlsx", help="workbook with one sheet per test")
+    parser.add_argument("--project")
+    parser.add_argument("--test")
+    parser.add_argument("--specimen")
+    parser.add_argument("--since", help="first test date, YYYY-MM-DD")
+    parser.add_argument("--until", help="last test date, YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--dpi", type=int, default=DPI)
+    args = parser.parse_args(argv)
+
+    if not args.pdf and not args.xlsx:
+        parser.error("give --pdf and/or --xlsx")
+    summary = export(args.pdf, args.xlsx, args.project, args.test, args.specimen, args.since, args.until,
+                     args.workers, args.dpi)
+    print(f"Exported {summary['results']} results ({summary['pages']} PDF pages)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
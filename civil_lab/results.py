@@ -0,0 +1,73 @@
+"""Saving results from the Streamlit pages to the results store.
+
+The sidebar holds the project (site), specimen, material source (quarry,
+borrow area) and test date that every saved result is filed under. Pages call ``save`` (or ``save_many`` for batch
+uploads) after showing a result; nothing is written unless saving is
+switched on in the sidebar.
+"""
+import sqlite3
+from datetime import date
+
+import streamlit as st
+
+from civil_lab import metrics, store
+
+
+def sidebar():
+    with st.sidebar.expander("🗂 Record Results"):
+        st.checkbox("Save results", key="record_enabled")
+        st.text_input("Project", key="record_project")
+        st.text_input("Specimen / Sample ID", key="record_specimen")
+        st.text_input("Material Source (quarry / borrow area)", key="record_source")
+        st.date_input("Test Date", value=date.today(), key="record_date")
+
+
+def _context():
+    """``(project, specimen, source, tested_on)`` from the sidebar, or ``None`` if saving is off."""
+    if not st.session_state.get("record_enabled"):
+        return None
+    project = (st.session_state.get("record_project") or "").strip()
+    if not project:
+        st.warning("Enter a project in the sidebar to save this result.")
+        return None
+    specimen = (st.session_state.get("record_specimen") or "").strip() or None
+    source = (st.session_state.get("record_source") or "").strip() or None
+    return project, specimen, source, st.session_state.get("record_date")
+
+
+@st.cache_resource
+def results_store():
+    return store.default_store()
+
+
+def save(test, value=None, unit=None, label=None, inputs=None, outputs=None):
+    context = _context()
+    if context is None:
+        return
+    project, specimen, source, tested_on = context
+    try:
+        with metrics.timed("store.record"):
+            results_store().record(project, test, value=value, specimen=specimen, tested_on=tested_on,
+                                   unit=unit, label=label, inputs=inputs, outputs=outputs, source=source)
+    except sqlite3.Error as e:
+        st.warning(f"Result could not be saved: {e}")
+        return
+    st.caption(f"Saved to project **{project}**" + (f", specimen **{specimen}**." if specimen else "."))
+
+
+def save_many(records):
+    """Save batch results; each record may carry its own ``specimen``. Returns the number saved, or ``None``."""
+    context = _context()
+    if context is None:
+        return
+    project, specimen, source, tested_on = context
+    rows = ({"project": project, "specimen": specimen, "source": source, "tested_on": tested_on, **r}
+            for r in records)
+    try:
+        with metrics.timed("store.insert_many"):
+            n = results_store().insert_many(rows)
+    except sqlite3.Error as e:
+        st.warning(f"Results could not be saved: {e}")
+        return
+    st.caption(f"Saved {n} results to project **{project}**.")
+    return n
@@ -0,0 +1,151 @@
+"""Pre-aggregated trend rollups kept next to the results.
+
+Every metric in ``METRICS`` maps one test to the column it is broken down
+by. For each metric, period (week or month), bucket (the period's first
+day) and dimension value, the ``rollups`` table holds the count, sum, sum of
+squares, minimum and maximum of the results' values. The store updates the
+affected rows in the same transaction that writes the results, so the trends
+dashboard reads a few rows per bucket instead of the raw history and its
+cost does not grow with the number of results.
+
+Quarters are combined from months when read; weeks start on Monday.
+"""
+import math
+from datetime import date, timedelta
+
+# metric -> (test, column it is broken down by, label)
+METRICS = {
+    "strength": ("Compressive Strength", "label", "Compressive strength (N/mm²) by grade"),
+    "fm": ("Sieve Analysis", "source", "Fineness modulus by quarry"),
+    "ll": ("Liquid Limit", "project", "Liquid limit (%) by site"),
+    "pi": ("Indices", "project", "Plasticity index (%) by site"),
+}
+PERIODS = ("week", "month", "quarter")
+STORED_PERIODS = ("week", "month")
+UNSPECIFIED = ""  # dimension of results without one
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    metric      TEXT NOT NULL,
+    period      TEXT NOT NULL,          -- 'week' or 'month'
+    bucket      TEXT NOT NULL,          -- ISO date the period starts on
+    dimension   TEXT NOT NULL,
+    n           INTEGER NOT NULL,
+    total       REAL NOT NULL,
+    total_sq    REAL NOT NULL,
+    min         REAL NOT NULL,
+    max         REAL NOT NULL,
+    PRIMARY KEY (metric, period, bucket, dimension)
+) WITHOUT ROWID;
+"""
+
+UPSERT = """
+INSERT INTO rollups (metric, period, bucket, dimension, n, total, total_sq, min, max)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (metric, period, bucket, dimension) DO UPDATE SET
+    n = n + excluded.n, total = total + excluded.total, total_sq = total_sq + excluded.total_sq,
+    min = MIN(min, excluded.min), max = MAX(max, excluded.max)
+"""
+
+# SQL bucket expressions matching ``bucket_start``.
+_SQL_BUCKET = {"week": "date(tested_on, 'weekday 0', '-6 days')", "month": "date(tested_on, 'start of month')"}
+
+_BY_TEST = {}
+for _metric, (_test, _column, _) in METRICS.items():
+    _BY_TEST.setdefault(_test, []).append((_metric, _column))
+
+
+def version():
+    """Changes whenever ``METRICS`` does, so stored rollups can be rebuilt."""
+    return repr(sorted((m, t, c) for m, (t, c, _) in METRICS.items()))
+
+
+def bucket_start(day, period):
+    """First day of the week (Monday) or month containing ``day``."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def quarter_of(month_bucket):
+    """Quarter bucket (its first day) of a month bucket."""
+    year, month = int(month_bucket[:4]), int(month_bucket[5:7])
+    return f"{year:04d}-{(month - 1) // 3 * 3 + 1:02d}-01"
+
+
+def deltas(rows, fields):
+    """Rollup increments for result rows (tuples with ``fields``), one ``UPSERT`` parameter tuple each."""
+    test_at, day_at, value_at = fields.index("test"), fields.index("tested_on"), fields.index("value")
+    column_at = {column: fields.index(column) for _, column, _ in METRICS.values()}
+    buckets = {}  # tested_on -> bucket per stored period, or None if it is not a date
+    acc = {}
+    for row in rows:
+        metrics = _BY_TEST.get(row[test_at])
+        value = row[value_at]
+        if metrics is None or value is None or value != value:
+            continue
+        day = row[day_at]
+        if day not in buckets:
+            try:
+                start = date.fromisoformat(day)
+                buckets[day] = [(p, bucket_start(start, p).isoformat()) for p in STORED_PERIODS]
+            except (TypeError, ValueError):
+                buckets[day] = None
+        if buckets[day] is None:
+            continue
+        for metric, column in metrics:
+            dimension = row[column_at[column]] or UNSPECIFIED
+            for period, bucket in buckets[day]:
+                key = (metric, period, bucket, dimension)
+                a = acc.get(key)
+                if a is None:
+                    acc[key] = [1, value, value * value, value, value]
+                else:
+                    a[0] += 1
+                    a[1] += value
+                    a[2] += value * value
+                    if value < a[3]:
+                        a[3] = value
+                    elif value > a[4]:
+                        a[4] = value
+    return [key + tuple(a) for key, a in acc.items()]
+
+
+def rebuild_sql():
+    """``(sql, params)`` statements that recompute every rollup from the results."""
+    statements = [("DELETE FROM rollups", ())]
+    for metric, (test, column, _) in METRICS.items():
+        for period in STORED_PERIODS:
+            bucket = _SQL_BUCKET[period]
+            statements.append((
+                f"INSERT INTO rollups (metric, period, bucket, dimension, n, total, total_sq, min, max) "
+                f"SELECT ?, ?, {bucket}, COALESCE(NULLIF({column}, ''), ?), COUNT(*), SUM(value), "
+                f"SUM(value * value), MIN(value), MAX(value) FROM results "
+                f"WHERE test = ? AND value IS NOT NULL AND {bucket} IS NOT NULL GROUP BY 3, 4",
+                (metric, period, UNSPECIFIED, test)))
+    return statements
+
+
+def combine(rows, key):
+    """Merge rollup rows that share ``key(row)``; returns ``{key: row}`` in first-seen order."""
+    merged = {}
+    for row in rows:
+        k = key(row)
+        m = merged.get(k)
+        if m is None:
+            merged[k] = dict(row)
+        else:
+            m["n"] += row["n"]
+            m["total"] += row["total"]
+            m["total_sq"] += row["total_sq"]
+            m["min"] = min(m["min"], row["min"])
+            m["max"] = max(m["max"], row["max"])
+    return merged
+
+
+def stats(row):
+    """Count, mean, sample standard deviation, minimum and maximum of a rollup row."""
+    n = row["n"]
+    mean = row["total"] / n
+    var = max(row["total_sq"] - row["total"] * mean, 0.0) / (n - 1) if n > 1 else float("nan")
+    return {"n": n, "mean": mean, "sd": math.sqrt(var), "min": row["min"], "max": row["max"]}
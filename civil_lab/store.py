@@ -0,0 +1,444 @@
+"""Local results store backed by SQLite.
+
+Every recorded test is one row with its project, specimen, test date and
+test type, the headline value (strength, liquid limit, FM, ...), an optional
+label (zone, rating, soil group) and the full inputs/outputs as JSON.
+
+The database runs in WAL mode so readers never block the single writer, and
+connections come from a small pool shared by every Streamlit session and API
+thread in the process. Lookups by project, test type or specimen use
+indexes that end in ``(tested_on, id)``, and pages are fetched with keyset
+pagination, so reading page N of a multi-million-row history costs the same
+as reading page 1.
+
+Trend rollups (see ``civil_lab.rollups``) are updated in the same
+transaction as the results they summarise.
+
+Incremental consumers (such as the cube QC tracker) read new rows in id
+order with ``iter_after`` and keep their running state in the ``state``
+table next to the results. The same table keeps the latest id written per
+test (``last_id``), so caches of derived views can tell cheaply whether
+results of their tests were added.
+
+The database lives at ``data/civil_lab.sqlite3`` unless the
+``CIVIL_LAB_DB`` environment variable names another file.
+"""
+import base64
+import functools
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+
+from civil_lab import rollups
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "data", "civil_lab.sqlite3")
+
+FIELDS = ["project", "specimen", "tested_on", "test", "value", "unit", "label", "inputs", "outputs", "source"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id          INTEGER PRIMARY KEY,
+    project     TEXT NOT NULL,
+    specimen    TEXT,
+    tested_on   TEXT NOT NULL,          -- ISO date, YYYY-MM-DD
+    test        TEXT NOT NULL,
+    value       REAL,
+    unit        TEXT,
+    label       TEXT,
+    inputs      TEXT,                   -- JSON
+    outputs     TEXT,                   -- JSON
+    created_at  TEXT NOT NULL,
+    source      TEXT                    -- material source: quarry, borrow area, ...
+);
+CREATE INDEX IF NOT EXISTS results_date ON results (tested_on, id);
+CREATE INDEX IF NOT EXISTS results_project ON results (project, tested_on, id);
+CREATE INDEX IF NOT EXISTS results_test ON results (test, tested_on, id);
+CREATE INDEX IF NOT EXISTS results_project_test ON results (project, test, tested_on, id);
+CREATE INDEX IF NOT EXISTS results_specimen ON results (specimen, tested_on, id);
+CREATE TABLE IF NOT EXISTS state (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,          -- JSON
+    updated_at  TEXT NOT NULL
+);
+"""
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections usable from any thread."""
+
+    def __init__(self, path, size=4, timeout=30.0):
+        self.path = path
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._size = size
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self._timeout, check_same_thread=False,
+                               isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self._timeout * 1000)}")
+        # A larger page cache keeps index pages hot during bulk imports.
+        conn.execute("PRAGMA cache_size=-32768")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = len(self._all) < self._size
+                if grow:
+                    conn = self._connect()
+                    self._all.append(conn)
+            if not grow:
+                conn = self._idle.get(timeout=self._timeout)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        self._idle = queue.LifoQueue()
+
+
+def _json(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=_json_default)
+
+
+def _json_default(value):
+    if hasattr(value, "item"):  # NumPy scalars
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def _date(value):
+    if value is None:
+        return date.today().isoformat()
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def _float(value):
+    if value is None:
+        return None
+    value = float(value)
+    return None if value != value else value  # NaN -> NULL
+
+
+def _row(record):
+    """Column values for one record mapping, in ``FIELDS`` order."""
+    if not record.get("project") or not record.get("test"):
+        raise ValueError("Each result needs a project and a test")
+    return (str(record["project"]), None if record.get("specimen") in (None, "") else str(record["specimen"]),
+            _date(record.get("tested_on")), str(record["test"]), _float(record.get("value")),
+            record.get("unit"), None if record.get("label") is None else str(record["label"]),
+            _json(record.get("inputs")), _json(record.get("outputs")),
+            None if record.get("source") in (None, "") else str(record["source"]))
+
+
+def _encode_cursor(tested_on, row_id):
+    return base64.urlsafe_b64encode(f"{tested_on}|{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        tested_on, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return tested_on, int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid page cursor")
+
+
+def _rebuild_rollups(conn):
+    for sql, params in rollups.rebuild_sql():
+        conn.execute(sql, params)
+    conn.execute("INSERT OR REPLACE INTO state (key, value, updated_at) VALUES ('rollups', ?, ?)",
+                 (json.dumps(rollups.version()), _now()))
+
+
+def _put_last_ids(conn, last_ids):
+    conn.execute("INSERT OR REPLACE INTO state (key, value, updated_at) VALUES ('last_ids', ?, ?)",
+                 (json.dumps(last_ids), _now()))
+
+
+_TEST = FIELDS.index("test")
+_INSERT = f"INSERT INTO results ({', '.join(FIELDS)}, created_at) VALUES ({', '.join('?' * len(FIELDS))}, ?)"
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_PATH, pool_size=4):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.pool = ConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(_SCHEMA + rollups.SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn):
+        """Bring a database made by an older version up to date."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(results)")}
+            if "source" not in columns:
+                conn.execute("ALTER TABLE results ADD COLUMN source TEXT")
+            # (Re)build the rollups if they were made for other metrics, or never.
+            row = conn.execute("SELECT value FROM state WHERE key = 'rollups'").fetchone()
+            if row is None or json.loads(row[0]) != rollups.version():
+                _rebuild_rollups(conn)
+            if conn.execute("SELECT 1 FROM state WHERE key = 'last_ids'").fetchone() is None:
+                _put_last_ids(conn, dict(conn.execute("SELECT test, MAX(id) FROM results GROUP BY test").fetchall()))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def record(self, project, test, value=None, specimen=None, tested_on=None, unit=None, label=None,
+               inputs=None, outputs=None, source=None):
+        """Store one result; returns its id."""
+        row = _row({"project": project, "test": test, "value": value, "specimen": specimen,
+                    "tested_on": tested_on, "unit": unit, "label": label, "inputs": inputs, "outputs": outputs,
+                    "source": source})
+        with self.pool.connection() as conn:
+            return self._write_batch(conn, _INSERT, [row + (_now(),)])
+
+    def insert_many(self, records, batch_size=5000):
+        """Bulk path for batch imports: store an iterable of record mappings.
+
+        Records are consumed lazily and written in one transaction per batch,
+        so an import of any length holds at most ``batch_size`` rows in
+        memory. A record that fails validation stops the import with every
+        earlier batch already committed; pass a ``batch_size`` of at least
+        the number of records for all or nothing. Returns the number of rows
+        written.
+        """
+        created = _now()
+        total = 0
+        batch = []
+        with self.pool.connection() as conn:
+            for record in records:
+                batch.append(_row(record) + (created,))
+                if len(batch) >= batch_size:
+                    self._write_batch(conn, _INSERT, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                self._write_batch(conn, _INSERT, batch)
+                total += len(batch)
+        return total
+
+    @staticmethod
+    def _write_batch(conn, sql, batch):
+        """Insert ``batch`` with its rollups and last ids in one transaction; returns the last row id."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, batch)
+            last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.executemany(rollups.UPSERT, rollups.deltas(batch, FIELDS))
+            row = conn.execute("SELECT value FROM state WHERE key = 'last_ids'").fetchone()
+            last_ids = json.loads(row[0]) if row else {}
+            last_ids.update(dict.fromkeys({r[_TEST] for r in batch}, last))
+            _put_last_ids(conn, last_ids)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return last
+
+    @staticmethod
+    def _where(project, test, specimen, since, until):
+        clauses, params = [], []
+        for column, value in (("project", project), ("test", test), ("specimen", specimen)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("tested_on >= ?")
+            params.append(_date(since))
+        if until is not None:
+            clauses.append("tested_on <= ?")
+            params.append(_date(until))
+        return clauses, params
+
+    def query(self, project=None, test=None, specimen=None, since=None, until=None, limit=50, cursor=None):
+        """One page of results, newest test date first.
+
+        Returns ``{"rows": [...], "next": cursor or None}``; pass ``next``
+        back as ``cursor`` for the following page. Dates are inclusive ISO
+        dates.
+        """
+        limit = max(1, min(int(limit), 1000))
+        clauses, params = self._where(project, test, specimen, since, until)
+        if cursor:
+            tested_on, row_id = _decode_cursor(cursor)
+            clauses.append("(tested_on, id) < (?, ?)")
+            params += [tested_on, row_id]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT id, {', '.join(FIELDS)}, created_at FROM results {where} "
+               f"ORDER BY tested_on DESC, id DESC LIMIT ?")
+        with self.pool.connection() as conn:
+            rows = [dict(r) for r in conn.execute(sql, params + [limit + 1])]
+        more = len(rows) > limit
+        rows = rows[:limit]
+        for r in rows:
+            for key in ("inputs", "outputs"):
+                if r[key] is not None:
+                    r[key] = json.loads(r[key])
+        return {"rows": rows, "next": _encode_cursor(rows[-1]["tested_on"], rows[-1]["id"]) if more else None}
+
+    def iter_results(self, project=None, test=None, specimen=None, since=None, until=None, page_size=500):
+        """Every matching result, newest first, fetched one page at a time."""
+        cursor = None
+        while True:
+            page = self.query(project, test, specimen, since, until, limit=page_size, cursor=cursor)
+            yield from page["rows"]
+            cursor = page["next"]
+            if cursor is None:
+                return
+
+    def rollup(self, metric, period="week", since=None, until=None, dimensions=None):
+        """Trend rollup rows of ``metric`` for buckets starting between ``since`` and ``until``.
+
+        Each row has ``bucket``, ``dimension``, ``n``, ``total``, ``total_sq``,
+        ``min`` and ``max`` (see ``rollups.stats``), oldest bucket first.
+        """
+        if metric not in rollups.METRICS:
+            raise ValueError(f"Unknown metric {metric!r}")
+        if period not in rollups.PERIODS:
+            raise ValueError(f"Unknown period {period!r}; expected one of {', '.join(rollups.PERIODS)}")
+        stored = "month" if period == "quarter" else period
+        clauses, params = ["metric = ?", "period = ?"], [metric, stored]
+        if since is not None:
+            day = date.fromisoformat(_date(since))
+            clauses.append("bucket >= ?")
+            params.append(rollups.bucket_start(day, stored).isoformat())
+        if until is not None:
+            clauses.append("bucket <= ?")
+            params.append(_date(until))
+        if dimensions:
+            clauses.append(f"dimension IN ({', '.join('?' * len(dimensions))})")
+            params += list(dimensions)
+        sql = (f"SELECT bucket, dimension, n, total, total_sq, min, max FROM rollups "
+               f"WHERE {' AND '.join(clauses)} ORDER BY bucket, dimension")
+        with self.pool.connection() as conn:
+            rows = [dict(r) for r in conn.execute(sql, params)]
+        if period == "quarter":
+            for r in rows:
+                r["bucket"] = rollups.quarter_of(r["bucket"])
+            rows = list(rollups.combine(rows, lambda r: (r["bucket"], r["dimension"])).values())
+        return rows
+
+    def rebuild_rollups(self):
+        """Recompute every trend rollup from the stored results."""
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                _rebuild_rollups(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def iter_after(self, after_id, test=None, batch_size=10000):
+        """Results with id above ``after_id`` in id (arrival) order, without inputs/outputs.
+
+        Walks the primary key, so the cost depends only on the number of new
+        rows.
+        """
+        # ``+test`` keeps SQLite on the rowid range instead of the test index,
+        # which would sort every row of that test to find the new ones.
+        sql = (f"SELECT id, project, specimen, tested_on, test, value, label, source FROM results "
+               f"WHERE id > ?{' AND +test = ?' if test is not None else ''} ORDER BY id LIMIT ?")
+        while True:
+            params = [after_id] + ([test] if test is not None else []) + [batch_size]
+            with self.pool.connection() as conn:
+                rows = [dict(r) for r in conn.execute(sql, params)]
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1]["id"]
+
+    def input_values(self, tests, keys, project=None):
+        """``(inputs[key] for key in keys)`` tuples of every result of the given tests.
+
+        Missing inputs come back as ``None``.
+        """
+        for key in keys:
+            if not key.isidentifier():
+                raise ValueError(f"Invalid input name {key!r}")
+        columns = ", ".join(f"json_extract(inputs, '$.{key}')" for key in keys)
+        clauses = [f"test IN ({', '.join('?' * len(tests))})"]
+        params = list(tests)
+        if project is not None:
+            clauses.append("project = ?")
+            params.append(project)
+        with self.pool.connection() as conn:
+            return conn.execute(f"SELECT {columns} FROM results WHERE {' AND '.join(clauses)}",
+                                params).fetchall()
+
+    def get_state(self, key):
+        """JSON state stored under ``key``, or ``None``."""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_state(self, key, value):
+        with self.pool.connection() as conn:
+            conn.execute("INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) "
+                         "ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                         (key, json.dumps(value, default=_json_default), _now()))
+
+    def last_id(self, tests):
+        """Id of the latest write that stored results of any of ``tests`` (0 if none).
+
+        Grows whenever such a result is added, and costs one state lookup.
+        """
+        last_ids = self.get_state("last_ids") or {}
+        return max((last_ids.get(test, 0) for test in tests), default=0)
+
+    def count(self, project=None, test=None, specimen=None, since=None, until=None):
+        clauses, params = self._where(project, test, specimen, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.pool.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM results {where}", params).fetchone()[0]
+
+    def distinct(self, column):
+        """Sorted distinct values of ``project`` or ``test``."""
+        if column not in ("project", "test"):
+            raise ValueError(f"Cannot list distinct values of {column!r}")
+        # Hop from one value to the next through the index instead of scanning it.
+        sql = (f"WITH RECURSIVE v(x) AS (SELECT MIN({column}) FROM results UNION ALL "
+               f"SELECT (SELECT MIN({column}) FROM results WHERE {column} > v.x) FROM v WHERE v.x IS NOT NULL) "
+               f"SELECT x FROM v WHERE x IS NOT NULL")
+        with self.pool.connection() as conn:
+            return [r[0] for r in conn.execute(sql)]
+
+    def close(self):
+        self.pool.close()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+@functools.lru_cache(maxsize=1)
+def default_store():
+    """The store at ``CIVIL_LAB_DB`` (or ``DEFAULT_PATH``), opened once per process."""
+    return ResultStore(os.environ.get("CIVIL_LAB_DB") or DEFAULT_PATH)
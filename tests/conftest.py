@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Run from a checkout: make ``civil_lab`` importable without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from civil_lab.store import ResultStore  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite3"), pool_size=2)
+    yield store
+    store.close()
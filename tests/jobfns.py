@@ -0,0 +1,24 @@
+"""Job functions for test_jobs: workers import them by module name."""
+import os
+import signal
+import time
+
+
+def double(n, delay=0.0):
+    time.sleep(delay)
+    return 2 * n
+
+
+def sleep_then_touch(path, seconds):
+    """Sleep, then create ``path``; the file shows the job ran to the end."""
+    time.sleep(seconds)
+    with open(path, "w") as f:
+        f.write(str(os.getpid()))
+    return path
+
+
+def stubborn(seconds):
+    """Ignore the soft time limit, so only the hard kill stops this job."""
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+    return "finished"
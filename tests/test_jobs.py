@@ -0,0 +1,83 @@
+import os
+import time
+
+import pytest
+
+import jobfns
+from civil_lab import jobs
+
+
+@pytest.fixture
+def executor():
+    ex = jobs.JobExecutor(workers=1, max_pending=4, timeout=30)
+    yield ex
+    ex.shutdown()
+
+
+def _wait_running(job, timeout=30):
+    deadline = time.time() + timeout
+    while job.state != jobs.RUNNING:
+        assert time.time() < deadline, f"job still {job.state}"
+        time.sleep(0.05)
+
+
+def test_identical_jobs_share_one_run(executor):
+    a = executor.submit(jobfns.double, 21, 0.5)
+    assert executor.submit(jobfns.double, 21, 0.5) is a
+    b = executor.submit(jobfns.double, 4)
+    assert b is not a
+    assert (a.result(30), b.result(30)) == (42, 8)
+    # Finished jobs are no longer in flight: the same call runs again.
+    c = executor.submit(jobfns.double, 21)
+    assert c is not a and c.result(30) == 42
+
+
+def test_soft_time_limit(executor):
+    job = executor.submit(jobfns.sleep_then_touch, os.devnull, 5, timeout=0.5)
+    assert job.wait(30)
+    assert job.state == jobs.TIMEOUT
+    with pytest.raises(jobs.JobTimeout):
+        job.result()
+    assert executor.submit(jobfns.double, 1).result(30) == 2
+
+
+def test_hard_kill_when_the_job_ignores_its_time_limit(executor, monkeypatch):
+    monkeypatch.setattr(jobs, "KILL_GRACE", 0.5)
+    job = executor.submit(jobfns.stubborn, 30, timeout=0.5)
+    assert job.wait(30)
+    assert job.state == jobs.TIMEOUT and job.elapsed < 10
+    # The killed worker is replaced.
+    assert executor.submit(jobfns.double, 2).result(30) == 4
+
+
+def test_cancel_waiting_job(executor, tmp_path):
+    first = executor.submit(jobfns.double, 1, 1.0)
+    waiting = executor.submit(jobfns.sleep_then_touch, str(tmp_path / "waiting"), 0)
+    assert executor.cancel(waiting.id)
+    assert waiting.state == jobs.CANCELLED
+    with pytest.raises(jobs.JobError):
+        waiting.result()
+    assert first.result(30) == 2
+    time.sleep(0.5)
+    assert not (tmp_path / "waiting").exists()
+    assert not executor.cancel(waiting.id)
+
+
+def test_cancel_running_job(executor, tmp_path):
+    job = executor.submit(jobfns.sleep_then_touch, str(tmp_path / "running"), 2)
+    _wait_running(job)
+    assert executor.cancel(job.id)
+    assert job.state == jobs.CANCELLED
+    time.sleep(3)
+    assert not (tmp_path / "running").exists()
+    assert executor.submit(jobfns.double, 3).result(30) == 6
+
+
+def test_cancel_job_before_its_worker_starts_it(executor, tmp_path):
+    job = executor.submit(jobfns.sleep_then_touch, str(tmp_path / "early"), 1)
+    assert job.pid is None  # handed to the pool, worker not started yet
+    assert executor.cancel(job.id)
+    assert job.state == jobs.CANCELLED
+    time.sleep(4)
+    assert not (tmp_path / "early").exists()
+    assert executor.submit(jobfns.double, 5).result(30) == 10
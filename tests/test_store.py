@@ -0,0 +1,105 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from civil_lab import rollups
+
+TESTS = ["Compressive Strength", "Sieve Analysis", "Liquid Limit", "Indices", "Slump Test"]
+
+
+def _records(n, seed=0):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    return [{"project": rng.choice(["North", "South"]), "test": rng.choice(TESTS),
+             "tested_on": start + timedelta(days=rng.randrange(120)),
+             "value": None if rng.random() < 0.1 else round(rng.uniform(2, 45), 2),
+             "label": rng.choice(["M20", "M25", None]), "source": rng.choice(["Quarry A", "", None]),
+             "specimen": f"S{i % 7}"}
+            for i in range(n)]
+
+
+def _all_rollups(db):
+    return {(metric, period): db.rollup(metric, period) for metric in rollups.METRICS for period in rollups.PERIODS}
+
+
+def test_query_pages_cover_every_row_once_newest_first(db):
+    db.insert_many(_records(230))
+    expected = sorted(((r["tested_on"], r["id"]) for r in db.iter_after(0)), reverse=True)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = db.query(limit=17, cursor=cursor)
+        seen += [(r["tested_on"], r["id"]) for r in page["rows"]]
+        pages += 1
+        cursor = page["next"]
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == -(-230 // 17)
+
+
+def test_query_pages_respect_filters(db):
+    db.insert_many(_records(200))
+    since, until = "2024-02-01", "2024-03-15"
+    rows = list(db.iter_results(project="North", test="Indices", since=since, until=until, page_size=5))
+    assert rows
+    assert all(r["project"] == "North" and r["test"] == "Indices" and since <= r["tested_on"] <= until
+               for r in rows)
+    assert len(rows) == db.count(project="North", test="Indices", since=since, until=until)
+    assert len({r["id"] for r in rows}) == len(rows)
+
+
+def test_query_rejects_a_bad_cursor(db):
+    with pytest.raises(ValueError):
+        db.query(cursor="not-a-cursor")
+
+
+def test_iter_after_walks_new_rows_in_id_order(db):
+    db.insert_many(_records(100))
+    ids = [r["id"] for r in db.iter_after(0, batch_size=7)]
+    assert ids == sorted(ids) and len(ids) == 100
+
+    mark = ids[39]
+    assert [r["id"] for r in db.iter_after(mark, batch_size=7)] == ids[40:]
+    liquid = [r for r in db.iter_after(mark, test="Liquid Limit", batch_size=3)]
+    assert [r["id"] for r in liquid] == [r["id"] for r in db.iter_after(mark) if r["test"] == "Liquid Limit"]
+
+    db.record("North", "Liquid Limit", 31.0)
+    assert [r["value"] for r in db.iter_after(ids[-1])] == [31.0]
+
+
+def test_rollups_after_insert_many_match_a_rebuild(db):
+    # Several batches, so rows of one bucket are added to it in more than one transaction.
+    db.insert_many(_records(500, seed=1), batch_size=37)
+    db.record("South", "Compressive Strength", 28.5, label="M25", tested_on="2024-02-05")
+    incremental = _all_rollups(db)
+
+    db.rebuild_rollups()
+    rebuilt = _all_rollups(db)
+    assert incremental.keys() == rebuilt.keys()
+    for key, rows in incremental.items():
+        assert [(r["bucket"], r["dimension"], r["n"]) for r in rows] == \
+               [(r["bucket"], r["dimension"], r["n"]) for r in rebuilt[key]], key
+        for a, b in zip(rows, rebuilt[key]):
+            for field in ("total", "total_sq", "min", "max"):
+                assert a[field] == pytest.approx(b[field]), (key, field)
+
+
+def test_rollups_match_the_raw_results(db):
+    records = _records(300, seed=2)
+    db.insert_many(records, batch_size=50)
+    values = [r["value"] for r in records if r["test"] == "Liquid Limit" and r["value"] is not None]
+    rows = db.rollup("ll", "month")
+    assert sum(r["n"] for r in rows) == len(values)
+    assert sum(r["total"] for r in rows) == pytest.approx(sum(values))
+    assert min(r["min"] for r in rows) == min(values)
+    assert max(r["max"] for r in rows) == max(values)
+
+
+def test_insert_many_in_one_batch_is_all_or_nothing(db):
+    records = _records(20)
+    with pytest.raises(ValueError):
+        db.insert_many(records[:10] + [{"project": "North"}] + records[10:], batch_size=21)
+    assert db.count() == 0
+    assert not any(_all_rollups(db).values())